@@ -0,0 +1,27 @@
+"""add indexed public prefix to api keys
+
+Revision ID: 20261016_0003
+Revises: 20251005_0002
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261016_0003'
+down_revision = '20251005_0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing keys keep key_prefix NULL: their raw value is unknown to the server, so they
+    # are resolved through the legacy lookup path until users rotate them.
+    # New keys are issued as "<key_prefix>.<secret>" and looked up by this column.
+    op.add_column('api_keys', sa.Column('key_prefix', sa.String(length=32), nullable=True))
+    op.create_index('ix_api_keys_key_prefix', 'api_keys', ['key_prefix'], unique=True)
+
+
+def downgrade():
+    op.drop_index('ix_api_keys_key_prefix', table_name='api_keys')
+    op.drop_column('api_keys', 'key_prefix')
@@ -0,0 +1,24 @@
+"""record pre-rendered thumbnail derivatives on data instances
+
+Revision ID: 20261016_0004
+Revises: 20261016_0003
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '20261016_0004'
+down_revision = '20261016_0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Map of max edge size (px) -> object storage key; NULL until derivatives are generated
+    op.add_column('data_instances', sa.Column('derivative_keys', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+
+
+def downgrade():
+    op.drop_column('data_instances', 'derivative_keys')
@@ -0,0 +1,25 @@
+"""store object ETag/Last-Modified on data instances
+
+Revision ID: 20261016_0005
+Revises: 20261016_0004
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261016_0005'
+down_revision = '20261016_0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # NULL for images uploaded before this revision; the content endpoint then reads validators from storage
+    op.add_column('data_instances', sa.Column('storage_etag', sa.String(length=128), nullable=True))
+    op.add_column('data_instances', sa.Column('storage_last_modified', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade():
+    op.drop_column('data_instances', 'storage_last_modified')
+    op.drop_column('data_instances', 'storage_etag')
@@ -0,0 +1,23 @@
+"""composite indexes for keyset pagination of project images
+
+Revision ID: 20261016_0006
+Revises: 20261016_0005
+Create Date: 2026-10-16
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '20261016_0006'
+down_revision = '20261016_0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_data_instances_project_deleted_created', 'data_instances', ['project_id', 'deleted_at', 'created_at', 'id'])
+    op.create_index('ix_data_instances_project_deleted_filename', 'data_instances', ['project_id', 'deleted_at', 'filename', 'id'])
+
+
+def downgrade():
+    op.drop_index('ix_data_instances_project_deleted_filename', table_name='data_instances')
+    op.drop_index('ix_data_instances_project_deleted_created', table_name='data_instances')
@@ -0,0 +1,39 @@
+"""jsonb metadata with GIN and trigram indexes
+
+Revision ID: 20261016_0007
+Revises: 20261016_0006
+Create Date: 2026-10-16
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '20261016_0007'
+down_revision = '20261016_0006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # Databases created through create_all may still have a plain json column
+    op.execute("ALTER TABLE data_instances ALTER COLUMN metadata TYPE jsonb USING metadata::jsonb")
+    # Containment (@>) and jsonpath (@?, @@) predicates of the metadata filters
+    op.create_index(
+        'ix_data_instances_metadata_path_ops', 'data_instances', ['metadata'],
+        postgresql_using='gin', postgresql_ops={'metadata': 'jsonb_path_ops'},
+    )
+    # Substring search across all metadata values and on filenames
+    op.execute(
+        "CREATE INDEX ix_data_instances_metadata_trgm ON data_instances "
+        "USING gin ((metadata::text) gin_trgm_ops)"
+    )
+    op.create_index(
+        'ix_data_instances_filename_trgm', 'data_instances', ['filename'],
+        postgresql_using='gin', postgresql_ops={'filename': 'gin_trgm_ops'},
+    )
+
+
+def downgrade():
+    op.drop_index('ix_data_instances_filename_trgm', table_name='data_instances')
+    op.drop_index('ix_data_instances_metadata_trgm', table_name='data_instances')
+    op.drop_index('ix_data_instances_metadata_path_ops', table_name='data_instances')
@@ -0,0 +1,65 @@
+"""incrementally maintained project statistics
+
+Revision ID: 20261016_0008
+Revises: 20261016_0007
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '20261016_0008'
+down_revision = '20261016_0007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('project_stats',
+        sa.Column('project_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('projects.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('image_count', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('total_bytes', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('comment_count', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('classification_count', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('deleted_image_count', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('NOW()')),
+    )
+    op.create_table('project_stat_counts',
+        sa.Column('project_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('projects.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('dimension', sa.String(length=32), primary_key=True),
+        sa.Column('key', sa.String(length=255), primary_key=True),
+        sa.Column('count', sa.BigInteger(), nullable=False, server_default='0'),
+    )
+
+    # Backfill from existing rows; afterwards the application keeps both tables current
+    op.execute("""
+        INSERT INTO project_stats (project_id, image_count, total_bytes, comment_count, classification_count, deleted_image_count)
+        SELECT p.id,
+               (SELECT count(*) FROM data_instances d WHERE d.project_id = p.id AND d.deleted_at IS NULL),
+               (SELECT coalesce(sum(d.size_bytes), 0) FROM data_instances d WHERE d.project_id = p.id AND d.deleted_at IS NULL),
+               (SELECT count(*) FROM image_comments c JOIN data_instances d ON d.id = c.image_id
+                 WHERE d.project_id = p.id AND d.deleted_at IS NULL),
+               (SELECT count(*) FROM image_classifications ic JOIN data_instances d ON d.id = ic.image_id
+                 WHERE d.project_id = p.id AND d.deleted_at IS NULL),
+               (SELECT count(*) FROM data_instances d WHERE d.project_id = p.id AND d.deleted_at IS NOT NULL)
+        FROM projects p
+    """)
+    op.execute("""
+        INSERT INTO project_stat_counts (project_id, dimension, key, count)
+        SELECT project_id, 'content_type', coalesce(content_type, 'unknown'), count(*)
+        FROM data_instances WHERE deleted_at IS NULL
+        GROUP BY project_id, coalesce(content_type, 'unknown')
+    """)
+    op.execute("""
+        INSERT INTO project_stat_counts (project_id, dimension, key, count)
+        SELECT d.project_id, 'class', ic.class_id::text, count(*)
+        FROM image_classifications ic JOIN data_instances d ON d.id = ic.image_id
+        WHERE d.deleted_at IS NULL
+        GROUP BY d.project_id, ic.class_id
+    """)
+
+
+def downgrade():
+    op.drop_table('project_stat_counts')
+    op.drop_table('project_stats')
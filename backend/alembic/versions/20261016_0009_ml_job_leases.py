@@ -0,0 +1,35 @@
+"""lease columns and queue indexes for pull-based ML job claiming
+
+Revision ID: 20261016_0009
+Revises: 20261016_0008
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261016_0009'
+down_revision = '20261016_0008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('ml_analyses', sa.Column('lease_owner', sa.String(length=255), nullable=True))
+    op.add_column('ml_analyses', sa.Column('lease_expires_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('ml_analyses', sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'))
+    op.create_index(
+        'ix_ml_analyses_queue',
+        'ml_analyses',
+        ['model_name', sa.text('priority DESC'), 'created_at'],
+        postgresql_where=sa.text("status = 'queued'"),
+    )
+    op.create_index('ix_ml_analyses_lease', 'ml_analyses', ['status', 'lease_expires_at'])
+
+
+def downgrade():
+    op.drop_index('ix_ml_analyses_lease', table_name='ml_analyses')
+    op.drop_index('ix_ml_analyses_queue', table_name='ml_analyses')
+    op.drop_column('ml_analyses', 'attempts')
+    op.drop_column('ml_analyses', 'lease_expires_at')
+    op.drop_column('ml_analyses', 'lease_owner')
@@ -0,0 +1,68 @@
+"""typed bounding-box columns and search indexes on ml_annotations
+
+Revision ID: 20261016_0010
+Revises: 20261016_0009
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from utils.annotation_geometry import BBOX_COLUMNS, bbox_columns
+
+# revision identifiers, used by Alembic.
+revision = '20261016_0010'
+down_revision = '20261016_0009'
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH = 1000
+
+
+def _backfill():
+    bind = op.get_bind()
+    annotations = sa.table(
+        'ml_annotations',
+        sa.column('id', postgresql.UUID(as_uuid=True)),
+        sa.column('data', sa.JSON()),
+        *[sa.column(name) for name in BBOX_COLUMNS],
+    )
+    last_id = None
+    while True:
+        stmt = sa.select(annotations.c.id, annotations.c.data).order_by(annotations.c.id).limit(BACKFILL_BATCH)
+        if last_id is not None:
+            stmt = stmt.where(annotations.c.id > last_id)
+        rows = bind.execute(stmt).all()
+        if not rows:
+            break
+        for row in rows:
+            values = bbox_columns(row.data)
+            if any(v is not None for v in values.values()):
+                bind.execute(annotations.update().where(annotations.c.id == row.id).values(**values))
+        last_id = rows[-1].id
+
+
+def upgrade():
+    for name in ('bbox_x', 'bbox_y', 'bbox_w', 'bbox_h'):
+        op.add_column('ml_annotations', sa.Column(name, sa.Float(), nullable=True))
+    op.add_column('ml_annotations', sa.Column('image_width', sa.Integer(), nullable=True))
+    op.add_column('ml_annotations', sa.Column('image_height', sa.Integer(), nullable=True))
+    for name in ('norm_x_min', 'norm_y_min', 'norm_x_max', 'norm_y_max'):
+        op.add_column('ml_annotations', sa.Column(name, sa.Float(), nullable=True))
+    _backfill()
+    op.create_index('ix_ml_annotations_class_confidence', 'ml_annotations', ['class_name', 'confidence'])
+    if op.get_bind().dialect.name == 'postgresql':
+        # Region overlap (&&) on the normalised box
+        op.execute(
+            "CREATE INDEX ix_ml_annotations_norm_box ON ml_annotations USING gist "
+            "(box(point(norm_x_min, norm_y_min), point(norm_x_max, norm_y_max))) "
+            "WHERE norm_x_min IS NOT NULL"
+        )
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_index('ix_ml_annotations_norm_box', table_name='ml_annotations')
+    op.drop_index('ix_ml_annotations_class_confidence', table_name='ml_annotations')
+    for name in reversed(BBOX_COLUMNS):
+        op.drop_column('ml_annotations', name)
@@ -0,0 +1,23 @@
+"""index for the latest analysis per image and model
+
+Revision ID: 20261016_0011
+Revises: 20261016_0010
+Create Date: 2026-10-16
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '20261016_0011'
+down_revision = '20261016_0010'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        'ix_ml_analyses_image_model_created', 'ml_analyses', ['image_id', 'model_name', 'created_at'],
+    )
+
+
+def downgrade():
+    op.drop_index('ix_ml_analyses_image_model_created', table_name='ml_analyses')
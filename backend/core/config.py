@@ -32,6 +32,11 @@ class Settings(BaseSettings):
     S3_SECRET_KEY: str = "minioadminpassword"
     S3_BUCKET: str = "data-storage"
     S3_USE_SSL: bool = False
+    # Shared S3 connection pool; also the number of concurrent storage operations
+    S3_MAX_POOL_CONNECTIONS: int = 50
+    S3_CONNECT_TIMEOUT_SECONDS: int = 5
+    S3_READ_TIMEOUT_SECONDS: int = 60
+    S3_STREAM_CHUNK_BYTES: int = 256 * 1024
 
     # Frontend build path configuration
     FRONTEND_BUILD_PATH: str = "frontend/build"
@@ -48,16 +53,49 @@ class Settings(BaseSettings):
     # Cache configuration
     CACHE_SIZE_MB: int = 1000
 
+    # Project report export (GET /projects/{id}/report)
+    REPORT_BATCH_SIZE: int = 500  # Images loaded (with comments/classifications) per query round
+    REPORT_CACHE_MAX_BYTES: int = 32 * 1024 * 1024  # Larger generated reports are streamed but not cached
+
+    # Thumbnail derivatives generated at upload time and stored in object storage
+    THUMBNAIL_DERIVATIVES_ENABLED: bool = True
+    THUMBNAIL_DERIVATIVE_SIZES: str = "128,400,800,1600"  # Max edge in pixels
+    THUMBNAIL_DERIVATIVE_FORMAT: str = "WEBP"  # WEBP|JPEG
+    THUMBNAIL_DERIVATIVE_PREFIX: str = "derivatives"
+
+    # Compute executor for CPU-heavy work (thumbnail decode/resize)
+    COMPUTE_EXECUTOR_TYPE: str = "thread"  # thread|process
+    COMPUTE_MAX_WORKERS: int = 0  # 0 = os.cpu_count()
+    COMPUTE_MAX_QUEUE_DEPTH: int = 64  # Waiting tasks allowed before answering 503
+
+    # API key authentication
+    API_KEY_CACHE_TTL_SECONDS: int = 60  # How long a verified key digest is trusted in-process
+    API_KEY_LEGACY_LOOKUP_ENABLED: bool = True  # Scan prefix-less (pre-migration) keys; disable once rotated
+
     # ML Analysis settings
     ML_ANALYSIS_ENABLED: bool = True
     ML_MAX_ANALYSES_PER_IMAGE: int = 10
     ML_ALLOWED_MODELS: str = "resnet50_classifier,vgg16,inception_v3,efficientnet_b0,demo-model-detcls,yolo_v8"
     ML_DEFAULT_STATUS: str = "queued"
     ML_CALLBACK_HMAC_SECRET: Optional[str] = None
+    # Cap on bodies buffered for HMAC verification (JSON ML callbacks)
+    HMAC_MAX_BODY_BYTES: int = 32 * 1024 * 1024
     ML_PIPELINE_REQUIRE_HMAC: bool = True
     ML_HMAC_TIMESTAMP_SKEW_SECONDS: int = 300
     ML_MAX_BULK_ANNOTATIONS: int = 1000  # Lowered from 5000 to prevent memory/timeout issues
     ML_PRESIGNED_URL_EXPIRY_SECONDS: int = 3600  # 1 hour to allow slow uploads of large artifacts
+    ML_RESULTS_MAX_ARTIFACTS: int = 20  # Upload URLs one /analyses/{id}/results request can ask for
+    ML_NDJSON_BATCH_SIZE: int = 1000  # Annotations inserted per batch by the streamed NDJSON upload
+    ML_NDJSON_MAX_LINE_BYTES: int = 1024 * 1024  # Longest single NDJSON annotation line
+    ML_JOB_LEASE_SECONDS: int = 300  # Claimed jobs return to the queue unless heartbeated within this window
+    ML_JOB_MAX_CLAIM: int = 100  # Most jobs one claim request can take
+    ML_JOB_MAX_ATTEMPTS: int = 3  # Expired leases after this many claims mark the job failed
+    ML_BULK_STATUS_MAX: int = 1000  # Most analyses one bulk status request can change
+    ML_BULK_CREATE_MAX: int = 100000  # Most analyses one bulk create request can queue
+    ML_BULK_CREATE_MAX_IDS: int = 10000  # Longest explicit image_ids list for bulk create
+    ML_EVENTS_KEEPALIVE_SECONDS: float = 15.0  # Comment line sent on idle analysis event streams
+    ML_EVENTS_QUEUE_SIZE: int = 100  # Buffered events per stream before it is told to resync
+    ML_EVENTS_RETRY_MS: int = 5000  # Reconnect delay suggested to EventSource clients
 
     # Image deletion / retention settings
     IMAGE_DELETE_RETENTION_DAYS: int = 60  # Soft delete retention window (days)
@@ -74,6 +112,7 @@ class Settings(BaseSettings):
         'SECURITY_NOSNIFF_ENABLED', 'SECURITY_XFO_ENABLED',
         'SECURITY_REFERRER_POLICY_ENABLED', 'SECURITY_CSP_ENABLED',
         'ENABLE_IMAGE_PURGE', 'USE_ALEMBIC_MIGRATIONS',
+        'API_KEY_LEGACY_LOOKUP_ENABLED', 'THUMBNAIL_DERIVATIVES_ENABLED',
         mode='before'
     )
     @classmethod
@@ -94,6 +133,14 @@ class Settings(BaseSettings):
         import json
         return json.loads(self.MOCK_USER_GROUPS_JSON)
 
+    @property
+    def ML_ALLOWED_MODEL_SET(self):
+        return frozenset(m.strip() for m in self.ML_ALLOWED_MODELS.split(',') if m.strip())
+
+    @property
+    def THUMBNAIL_DERIVATIVE_SIZE_LIST(self):
+        return sorted({int(s) for s in self.THUMBNAIL_DERIVATIVE_SIZES.split(',') if s.strip()})
+
     def patch(self, updates: dict):
         """Return a shallow patched copy of settings with provided overrides.
 
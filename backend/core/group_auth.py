@@ -1,11 +1,11 @@
 """
 Core group authorization function.
 Single source of truth for group membership checks.
-Companies should replace the _check_group_membership function with their real auth system.
+Companies should replace the _get_user_groups function with their real auth system.
 """
 
 import logging
-from typing import Dict, List
+from typing import Dict, List, Optional
 from .config import settings
 
 logger = logging.getLogger(__name__)
@@ -14,7 +14,7 @@ logger = logging.getLogger(__name__)
 def is_user_in_group(user_email: str, group_id: str) -> bool:
     """
     Single source of truth for group membership checks.
-    Companies should customize the _check_group_membership function below.
+    Companies should customize the _get_user_groups function below.
     
     Args:
         user_email: The user's email address (already validated by middleware)
@@ -48,9 +48,53 @@ def is_user_in_group(user_email: str, group_id: str) -> bool:
     return is_member
 
 
+def get_groups_for_user(user_email: str) -> Optional[List[str]]:
+    """
+    Batch lookup of every group a user belongs to.
+
+    Lets callers filter by group in SQL (meta_group_id IN (...)) instead of
+    checking membership project by project.
+
+    Args:
+        user_email: The user's email address (already validated by middleware)
+
+    Returns:
+        List of group IDs, or None when the user may access every group
+        (debug/test mode, mirroring is_user_in_group)
+    """
+    if not user_email:
+        return []
+
+    if settings.DEBUG or settings.SKIP_HEADER_CHECK:
+        return None
+
+    user_email = user_email.lower().strip()
+    groups = _get_user_groups(user_email)
+
+    safe_user_email = user_email.replace('\n', '').replace('\r', '')
+    logger.info("Group lookup", extra={"user": safe_user_email, "group_count": len(groups)})
+    return groups
+
+
 def _check_group_membership(user_email: str, group_id: str) -> bool:
     """
     Internal method to check group membership.
+
+    Delegates to _get_user_groups so single checks and batch lookups agree.
+    
+    Args:
+        user_email: The user's email address (normalized)
+        group_id: The group ID to check membership for (normalized)
+        
+    Returns:
+        True if user is in the group, False otherwise
+    """
+    return group_id in _get_user_groups(user_email)
+
+
+def _get_user_groups(user_email: str) -> List[str]:
+    """
+    Internal method to list a user's groups.
     
     **COMPANIES SHOULD REPLACE THIS FUNCTION** with their actual auth system integration.
     
@@ -63,10 +107,9 @@ def _check_group_membership(user_email: str, group_id: str) -> bool:
     
     Args:
         user_email: The user's email address (normalized)
-        group_id: The group ID to check membership for (normalized)
         
     Returns:
-        True if user is in the group, False otherwise
+        List of group IDs the user is a member of
     """
     # TODO: Replace with actual auth system lookup
     # This is just a development/demo implementation
@@ -79,5 +122,4 @@ def _check_group_membership(user_email: str, group_id: str) -> bool:
         settings.MOCK_USER_EMAIL.lower(): settings.MOCK_USER_GROUPS,
     }
     
-    user_groups = user_group_mapping.get(user_email, [])
-    return group_id in user_groups
\ No newline at end of file
+    return list(user_group_mapping.get(user_email, []))
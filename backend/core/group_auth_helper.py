@@ -5,8 +5,9 @@ Provides performance optimizations and convenience wrappers around core auth.
 
 import time
 import logging
-from typing import Dict, Tuple, List
+from typing import Dict, Tuple, List, Optional
 from .group_auth import is_user_in_group as _core_is_user_in_group
+from .group_auth import get_groups_for_user as _core_get_groups_for_user
 from .config import settings
 
 logger = logging.getLogger(__name__)
@@ -14,6 +15,8 @@ logger = logging.getLogger(__name__)
 # Simple in-memory cache for group membership checks
 # Format: {(user_email, group_id, debug_mode): (is_member, timestamp)}
 _group_membership_cache: Dict[Tuple[str, str, bool], Tuple[bool, float]] = {}
+# Format: {(user_email, debug_mode): (group_ids or None for unrestricted, timestamp)}
+_user_groups_cache: Dict[Tuple[str, bool], Tuple[Optional[List[str]], float]] = {}
 _CACHE_TTL = 300  # 5 minutes
 
 
@@ -70,6 +73,34 @@ def is_user_in_group(user_email: str, group_id: str) -> bool:
     return is_member
 
 
+def get_groups_for_user(user_email: str) -> Optional[List[str]]:
+    """
+    Cached wrapper around the core batch group lookup.
+
+    Args:
+        user_email: The user's email address
+
+    Returns:
+        List of group IDs the user belongs to, or None if the user may
+        access every group (debug/test mode)
+    """
+    if not user_email:
+        return []
+
+    user_email = user_email.lower().strip()
+    debug_mode = settings.DEBUG or settings.SKIP_HEADER_CHECK
+    cache_key = (user_email, debug_mode)
+    current_time = time.time()
+
+    cached = _user_groups_cache.get(cache_key)
+    if cached is not None and current_time - cached[1] < _CACHE_TTL:
+        return cached[0]
+
+    groups = _core_get_groups_for_user(user_email)
+    _user_groups_cache[cache_key] = (groups, current_time)
+    return groups
+
+
 def is_user_in_any_group(user_email: str, group_ids: List[str]) -> bool:
     """
     Check if user is in any of the provided groups.
@@ -141,6 +172,7 @@ def clear_cache() -> None:
     """
     global _group_membership_cache
     _group_membership_cache.clear()
+    _user_groups_cache.clear()
     logger.info("Group membership cache cleared")
 
 
@@ -159,6 +191,8 @@ def clear_user_cache(user_email: str) -> None:
 
     for key in keys_to_remove:
         del _group_membership_cache[key]
+    for key in [key for key in _user_groups_cache.keys() if key[0] == user_email]:
+        del _user_groups_cache[key]
 
     logger.info(f"Cleared cache for user: {user_email}")
 
@@ -1,6 +1,7 @@
 import uuid
-from sqlalchemy import Column, String, Text, ForeignKey, DateTime, JSON, BigInteger, Boolean, UniqueConstraint, Numeric, Integer, Float
-from sqlalchemy.dialects.postgresql import UUID
+from datetime import datetime, timezone
+from sqlalchemy import Column, String, Text, ForeignKey, DateTime, JSON, BigInteger, Boolean, UniqueConstraint, Numeric, Integer, Float, Index
+from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from .database import Base
@@ -45,11 +46,18 @@ class DataInstance(Base):
     object_storage_key = Column(String(1024), nullable=False, unique=True)
     content_type = Column(String(100), nullable=True)
     size_bytes = Column(BigInteger, nullable=True)
-    metadata_json = Column("metadata", JSON, nullable=True)  # Clear naming to avoid confusion
+    # JSONB on PostgreSQL (GIN/trigram indexed, see migration 20261016_0007); plain JSON elsewhere
+    metadata_json = Column("metadata", JSON().with_variant(JSONB(astext_type=Text()), "postgresql"), nullable=True)  # Clear naming to avoid confusion
+    # Pre-rendered thumbnail sizes in object storage: {"<max_edge_px>": "<object key>"}
+    derivative_keys = Column(JSON().with_variant(JSONB(astext_type=Text()), "postgresql"), nullable=True)
+    # Validators of the stored object, captured at upload for conditional GETs
+    storage_etag = Column(String(128), nullable=True)
+    storage_last_modified = Column(DateTime(timezone=True), nullable=True)
     # Keep the original column for backward compatibility, but add a new foreign key
     uploaded_by_user_id = Column(String(255), nullable=False)
     uploader_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Set client-side too so the stored value round-trips exactly through keyset cursors
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), default=lambda: datetime.now(timezone.utc))
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     # Deletion / retention fields
@@ -68,6 +76,11 @@ class DataInstance(Base):
     classifications = relationship("ImageClassification", back_populates="image", cascade="all, delete-orphan")
     ml_analyses = relationship("MLAnalysis", back_populates="image", cascade="all, delete-orphan")
 
+    # Keyset pagination: project listings filter on deleted state and order by (sort key, id)
+    __table_args__ = (
+        Index('ix_data_instances_project_deleted_created', 'project_id', 'deleted_at', 'created_at', 'id'),
+        Index('ix_data_instances_project_deleted_filename', 'project_id', 'deleted_at', 'filename', 'id'),
+    )
 
 class ImageDeletionEvent(Base):
     __tablename__ = "image_deletion_events"
@@ -150,12 +163,37 @@ class ProjectMetadata(Base):
         UniqueConstraint('project_id', 'key', name='uix_project_metadata_project_id_key'),
     )
 
+class ProjectStats(Base):
+    """Per-project counters, kept current by the CRUD paths that change them."""
+    __tablename__ = "project_stats"
+
+    project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True)
+    # Live (not soft-deleted) images and their bytes, comments and classifications
+    image_count = Column(BigInteger, nullable=False, default=0, server_default='0')
+    total_bytes = Column(BigInteger, nullable=False, default=0, server_default='0')
+    comment_count = Column(BigInteger, nullable=False, default=0, server_default='0')
+    classification_count = Column(BigInteger, nullable=False, default=0, server_default='0')
+    deleted_image_count = Column(BigInteger, nullable=False, default=0, server_default='0')
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class ProjectStatCount(Base):
+    """Per-project breakdown counters, e.g. live images by content type or classifications by class."""
+    __tablename__ = "project_stat_counts"
+
+    project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True)
+    dimension = Column(String(32), primary_key=True)  # 'content_type' or 'class'
+    key = Column(String(255), primary_key=True)
+    count = Column(BigInteger, nullable=False, default=0, server_default='0')
+
 class ApiKey(Base):
     __tablename__ = "api_keys"
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     key_hash = Column(String(255), nullable=False, unique=True, index=True)
+    # Public key id embedded in the raw key ("<key_prefix>.<secret>") so lookups hit one indexed row.
+    # NULL for legacy keys issued before prefixes existed.
+    key_prefix = Column(String(32), nullable=True, unique=True, index=True)
     name = Column(String(255), nullable=False)
     is_active = Column(Boolean, default=True, nullable=False)
     last_used_at = Column(DateTime(timezone=True), nullable=True)
@@ -181,10 +219,15 @@ class MLAnalysis(Base):
     requested_by_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     external_job_id = Column(String(255), nullable=True, unique=True)
     priority = Column(Integer, nullable=False, default=0)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Python default keeps sub-second ordering for FIFO claiming on every backend
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), default=lambda: datetime.now(timezone.utc))
     started_at = Column(DateTime(timezone=True), nullable=True)
     completed_at = Column(DateTime(timezone=True), nullable=True)
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Pull-queue lease (POST /ml/jobs:claim): which worker holds the job and until when
+    lease_owner = Column(String(255), nullable=True)
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
 
     # Relationships
     image = relationship("DataInstance", back_populates="ml_analyses")
@@ -192,6 +235,17 @@ class MLAnalysis(Base):
     annotations = relationship("MLAnnotation", back_populates="analysis", cascade="all, delete-orphan")
 
 
+# Claim order for queued jobs of one model; partial on PostgreSQL so it only holds the backlog
+Index(
+    "ix_ml_analyses_queue",
+    MLAnalysis.model_name, MLAnalysis.priority.desc(), MLAnalysis.created_at,
+    postgresql_where=MLAnalysis.status == "queued",
+)
+Index("ix_ml_analyses_lease", MLAnalysis.status, MLAnalysis.lease_expires_at)
+# Latest analysis per (image, model) for the project ML summary
+Index("ix_ml_analyses_image_model_created", MLAnalysis.image_id, MLAnalysis.model_name, MLAnalysis.created_at)
+
+
 class MLAnnotation(Base):
     """Individual annotation output for an analysis (box, classification, heatmap ref, etc.)."""
     __tablename__ = "ml_annotations"
@@ -204,8 +258,23 @@ class MLAnnotation(Base):
     data = Column(JSON, nullable=False)  # dynamic payload: coordinates, arrays, etc.
     storage_path = Column(String(1024), nullable=True)  # pointer to artifact in object storage
     ordering = Column(Integer, nullable=True)
+    # Typed box columns, derived from data at ingest (utils.annotation_geometry)
+    bbox_x = Column(Float, nullable=True)  # pixels, top-left corner
+    bbox_y = Column(Float, nullable=True)
+    bbox_w = Column(Float, nullable=True)
+    bbox_h = Column(Float, nullable=True)
+    image_width = Column(Integer, nullable=True)
+    image_height = Column(Integer, nullable=True)
+    norm_x_min = Column(Float, nullable=True)  # 0..1 of the image size
+    norm_y_min = Column(Float, nullable=True)
+    norm_x_max = Column(Float, nullable=True)
+    norm_y_max = Column(Float, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     analysis = relationship("MLAnalysis", back_populates="annotations")
 
+    __table_args__ = (
+        Index('ix_ml_annotations_class_confidence', 'class_name', 'confidence'),
+    )
+
 
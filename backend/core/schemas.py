@@ -45,6 +45,19 @@ class Project(ProjectBase):
         "populate_by_name": True
     }
 
+class ProjectStats(BaseModel):
+    project_id: uuid.UUID
+    # Counts cover live images; soft-deleted images only count towards deleted_image_count
+    image_count: int
+    total_bytes: int
+    comment_count: int
+    classification_count: int
+    deleted_image_count: int
+    content_type_counts: Dict[str, int] = {}
+    # Keyed by image class id
+    class_counts: Dict[str, int] = {}
+    updated_at: Optional[datetime] = None
+
 # DataInstance schemas
 class DataInstanceBase(BaseModel):
     filename: str
@@ -57,6 +70,9 @@ class DataInstanceCreate(DataInstanceBase):
     object_storage_key: str
     uploaded_by_user_id: str
     uploader_id: Optional[uuid.UUID] = None
+    # Object validators captured after upload (used for conditional GETs)
+    storage_etag: Optional[str] = None
+    storage_last_modified: Optional[datetime] = None
 
 class DataInstance(DataInstanceBase):
     id: uuid.UUID
@@ -115,6 +131,19 @@ class DataInstance(DataInstanceBase):
     }
 
 # ImageClass schemas
+class DataInstancePage(BaseModel):
+    items: List[DataInstance]
+    # Pass back as ?cursor= to fetch the next page; None on the last page
+    next_cursor: Optional[str] = None
+
+class ImageNeighbors(BaseModel):
+    image_id: uuid.UUID
+    previous_id: Optional[uuid.UUID] = None
+    next_id: Optional[uuid.UUID] = None
+    # 1-based position in the listing; None unless requested or if the image itself is filtered out
+    position: Optional[int] = None
+    total: int
+
 class ImageClassBase(BaseModel):
     name: str = Field(..., min_length=1, max_length=255)
     description: Optional[str] = None
@@ -311,6 +340,48 @@ class MLAnalysisBase(BaseModel):
 
 class MLAnalysisCreate(MLAnalysisBase):
     image_id: uuid.UUID
+    # Higher values are claimed first from the job queue
+    priority: int = Field(0, ge=-1000, le=1000)
+
+class MLAnalysisBulkCreate(MLAnalysisBase):
+    # Explicit images (must belong to the project); all of the project's images when omitted
+    image_ids: Optional[List[uuid.UUID]] = None
+    # Same syntax as the ?filter= parameters of the image listing
+    filters: Optional[List[str]] = None
+    search_field: Optional[str] = None
+    search_value: Optional[str] = None
+    priority: int = Field(0, ge=-1000, le=1000)
+    # Leave out images that already have a queued, processing or completed run of this model and version
+    skip_existing: bool = True
+
+class MLAnalysisBulkCreateResult(BaseModel):
+    project_id: uuid.UUID
+    model_name: str
+    model_version: str
+    status: str
+    # Images selected by image_ids/filters/search
+    matched: int
+    created: int
+    skipped_existing: int = 0
+    # Images already at ML_MAX_ANALYSES_PER_IMAGE
+    skipped_limit: int = 0
+    # image_ids not found in the project
+    not_found: int = 0
+    # Eligible images left over because of ML_BULK_CREATE_MAX; repeat the request to queue them
+    remaining: int = 0
+
+class MLAnnotationClassCount(BaseModel):
+    class_name: str
+    count: int
+    max_confidence: Optional[float] = None
+
+class MLAnnotationSummary(BaseModel):
+    """Aggregates over an analysis' annotations, computed in SQL for list views."""
+    total: int = 0
+    by_type: Dict[str, int] = Field(default_factory=dict)
+    # Most frequent classes, largest first
+    top_classes: List[MLAnnotationClassCount] = Field(default_factory=list)
+    max_confidence: Optional[float] = None
 
 class MLAnalysis(MLAnalysisBase):
     id: uuid.UUID
@@ -326,6 +397,8 @@ class MLAnalysis(MLAnalysisBase):
     completed_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
     annotations: Optional[List[MLAnnotation]] = None
+    # Set by list endpoints, which leave annotations empty
+    annotation_summary: Optional[MLAnnotationSummary] = None
 
     model_config = {
         "from_attributes": True,
@@ -340,4 +413,89 @@ class MLAnnotationList(BaseModel):
     annotations: List[MLAnnotation]
     total: int
 
+class MLAnnotationBulkResult(BaseModel):
+    analysis_id: uuid.UUID
+    mode: str
+    inserted: int
+    # Annotations removed by mode=replace
+    deleted: int = 0
+    # Annotation count of the analysis after the upload
+    total: int
+    # Ids of the inserted annotations; None for streamed (NDJSON) uploads
+    ids: Optional[List[uuid.UUID]] = None
+    # Only with ?include_annotations=true; the annotations from this request
+    annotations: Optional[List[MLAnnotation]] = None
+
+# GET /projects/{id}/annotations/search
+class AnnotationSearchHit(BaseModel):
+    image_id: uuid.UUID
+    filename: str
+    # Annotations of the image that matched the query
+    match_count: int
+    max_confidence: float
+
+class AnnotationSearchPage(BaseModel):
+    items: List[AnnotationSearchHit]
+    # Pass back as ?cursor= to fetch the next page; None on the last page
+    next_cursor: Optional[str] = None
+
+# GET /projects/{id}/ml-summary
+class ImageModelStatus(BaseModel):
+    """The latest analysis of one model on one image."""
+    model_name: str
+    analysis_id: uuid.UUID
+    model_version: str
+    status: str
+    annotation_count: int
+    created_at: datetime
+    completed_at: Optional[datetime] = None
+
+class ImageMLSummary(BaseModel):
+    image_id: uuid.UUID
+    models: List[ImageModelStatus]
+
+class ProjectMLSummaryPage(BaseModel):
+    # Same images and order as /projects/{id}/images:page with the same parameters
+    items: List[ImageMLSummary]
+    # Pass back as ?cursor= to fetch the next page; None on the last page
+    next_cursor: Optional[str] = None
+
+# POST /projects/{id}/analyses:bulk-status
+class MLAnalysisBulkStatusResult(BaseModel):
+    status_from: str
+    status_to: str
+    dry_run: bool
+    # Analyses that matched; changed unless dry_run
+    matched: int
+    analyses: List[MLAnalysis]
+
+# Pull-based job queue (POST /ml/jobs:claim)
+class MLJob(BaseModel):
+    analysis: MLAnalysis
+    project_id: uuid.UUID
+    filename: str
+    content_type: Optional[str] = None
+    # Presigned GET for the original image; None if storage is unavailable
+    image_url: Optional[str] = None
+    lease_expires_at: datetime
+
+class MLJobClaim(BaseModel):
+    # Pass back as ?worker= when heartbeating
+    worker: str
+    lease_seconds: int
+    jobs: List[MLJob]
 
+class MLJobLease(BaseModel):
+    analysis_id: uuid.UUID
+    worker: str
+    lease_expires_at: datetime
+
+# Everything the image page needs in one response (GET /images/{id}/bundle)
+class ImageBundle(BaseModel):
+    image: DataInstance
+    user: User
+    # Sections that were not requested (or are disabled) are None
+    classifications: Optional[List[ImageClassification]] = None
+    comments: Optional[List[ImageComment]] = None
+    analyses: Optional[MLAnalysisList] = None
+    classes: Optional[List[ImageClass]] = None
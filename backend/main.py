@@ -15,7 +15,8 @@ from pathlib import Path
 from core.database import create_db_and_tables
 from core.migrations import run_migrations  # legacy no-op
 from core.config import settings as _app_settings
-from utils.boto3_client import boto3_client, ensure_bucket_exists
+from utils.boto3_client import boto3_client, ensure_bucket_exists, start_storage_pool, shutdown_storage_pool
+from utils.compute_executor import get_compute_stats, shutdown_compute_executor
 from middleware.cors_debug import add_cors_middleware, debug_exception_middleware
 from middleware.auth import auth_middleware
 from middleware.security_headers import SecurityHeadersMiddleware
@@ -106,11 +107,15 @@ async def lifespan(app: FastAPI):
                 logger.info(f"S3 bucket '{settings.S3_BUCKET}' is ready.")
         else:
             logger.warning("WARNING: Boto3 S3 client not initialized. Object storage operations will fail.")
+    # Shared pool for storage I/O so S3 calls never block the event loop
+    start_storage_pool()
     # Ensure a writable tmp dir exists for any runtime needs
     os.makedirs(os.path.join(os.getcwd(), "tmp"), exist_ok=True)
     logger.info("Application startup complete.")
     yield
     logger.info("Application shutdown...")
+    shutdown_compute_executor()
+    shutdown_storage_pool()
     logger.info("Application shutdown complete.")
 
 
@@ -230,7 +235,12 @@ def create_app() -> FastAPI:
     @app.get("/api/health")
     async def health_check():
         """Health check endpoint for container monitoring."""
-        return {"status": "healthy", "timestamp": datetime.utcnow().isoformat() + 'Z'}
+        # Compute executor queue-wait/exec timings and rejections (null until first use)
+        return {
+            "status": "healthy",
+            "timestamp": datetime.utcnow().isoformat() + 'Z',
+            "compute": get_compute_stats(),
+        }
 
     # Include all three API routers in the main app
     app.include_router(api_router)
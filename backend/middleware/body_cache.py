@@ -1,31 +1,127 @@
 """
-Middleware to cache request body for HMAC verification.
+Middleware to provide raw request bytes for HMAC verification.
 
-FastAPI consumes the request body when parsing Pydantic models,
-so we need to cache it early in the middleware stack.
+FastAPI consumes the request body when parsing Pydantic models, so routes that
+verify an HMAC over the raw body need it captured before that happens. Only
+those routes are touched; everything else (notably multipart image uploads
+under /api) streams through untouched.
+
+- JSON HMAC routes (bulk annotations, artifact presign, finalize, results,
+  and JSON bodies under /api-ml) are buffered into request.state.cached_body, up to
+  HMAC_MAX_BODY_BYTES. Buffering keeps the canonical-JSON fallback of
+  verify_hmac_signature_flexible working.
+- Other /api-ml bodies (e.g. uploads) are not buffered; the HMAC is computed
+  incrementally as chunks stream through and exposed as request.state.body_hmac.
+- Streamed NDJSON annotation uploads (STREAMED_HMAC_ROUTE_RE) pass through
+  untouched under every prefix; the endpoint digests the body as it parses it
+  and only commits once the signature verifies.
+
+Implemented as plain ASGI middleware so the body is never re-wrapped or
+materialised by BaseHTTPMiddleware.
 """
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
+import hashlib
+import hmac
+import json
+import re
+from typing import Optional
+from core.config import settings
+
+# Routes that verify an HMAC over the raw JSON body under any prefix
+RAW_BODY_ROUTE_RE = re.compile(r"/analyses/[^/]+/(annotations:bulk|artifacts/presign|finalize|results)$")
+# Routes that read and verify their own body incrementally (see the NDJSON annotation upload)
+STREAMED_HMAC_ROUTE_RE = re.compile(r"/analyses/[^/]+/annotations:ndjson$")
+HMAC_ROUTER_PREFIX = "/api-ml/"
+
+
+class StreamedBodyMAC:
+    """Incremental HMAC-SHA256 over "<timestamp>.<body>" for a streamed request body."""
+
+    def __init__(self, secret: str, timestamp: str):
+        self._mac = hmac.new(secret.encode("utf-8"), msg=timestamp.encode("utf-8") + b".", digestmod=hashlib.sha256)
+        self.hexdigest: Optional[str] = None  # Set once the whole body has been received
+
+    def update(self, chunk: bytes, more_body: bool):
+        self._mac.update(chunk)
+        if not more_body:
+            self.hexdigest = self._mac.hexdigest()
+
+
+def _header(scope, name: bytes) -> str:
+    for key, value in scope.get("headers", []):
+        if key == name:
+            return value.decode("latin-1")
+    return ""
+
+
+class BodyCacheMiddleware:
+    """Cache or digest request bodies for HMAC-protected routes only."""
+
+    def __init__(self, app, max_body_bytes: Optional[int] = None):
+        self.app = app
+        self.max_body_bytes = max_body_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("POST", "PATCH", "PUT"):
+            return await self.app(scope, receive, send)
+
+        path = scope["path"]
+        if STREAMED_HMAC_ROUTE_RE.search(path):
+            return await self.app(scope, receive, send)
+        is_json = "json" in _header(scope, b"content-type").lower()
+        if RAW_BODY_ROUTE_RE.search(path) or (path.startswith(HMAC_ROUTER_PREFIX) and is_json):
+            return await self._buffer(scope, receive, send)
+        if path.startswith(HMAC_ROUTER_PREFIX) and settings.ML_CALLBACK_HMAC_SECRET:
+            return await self._digest(scope, receive, send)
+        return await self.app(scope, receive, send)
+
+    async def _buffer(self, scope, receive, send):
+        limit = self.max_body_bytes or settings.HMAC_MAX_BODY_BYTES
+        chunks = []
+        size = 0
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > limit:
+                return await _send_json(send, 413, {"detail": "Request body too large"})
+            chunks.append(chunk)
+            more_body = message.get("more_body", False)
+        body = b"".join(chunks)
+        scope.setdefault("state", {})["cached_body"] = body
+
+        replayed = False
 
+        async def replay_receive():
+            nonlocal replayed
+            if not replayed:
+                replayed = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            # Later calls wait for disconnect, as the original receive would
+            return await receive()
 
-class BodyCacheMiddleware(BaseHTTPMiddleware):
-    """Cache request body in request.state for later access."""
+        await self.app(scope, replay_receive, send)
 
-    async def dispatch(self, request: Request, call_next):
-        # Only cache body for POST/PATCH/PUT requests
-        if request.method in ("POST", "PATCH", "PUT"):
-            # Read and cache the body
-            body = await request.body()
+    async def _digest(self, scope, receive, send):
+        body_mac = StreamedBodyMAC(settings.ML_CALLBACK_HMAC_SECRET, _header(scope, b"x-ml-timestamp") or "0")
+        scope.setdefault("state", {})["body_hmac"] = body_mac
 
-            # Create a new receive function that returns the cached body
-            async def receive():
-                return {"type": "http.request", "body": body}
+        async def digesting_receive():
+            message = await receive()
+            if message["type"] == "http.request" and body_mac.hexdigest is None:
+                body_mac.update(message.get("body", b""), message.get("more_body", False))
+            return message
 
-            # Replace the request's receive with our cached version
-            request._receive = receive
+        await self.app(scope, digesting_receive, send)
 
-            # Also store in request.state for easy access
-            request.state.cached_body = body
 
-        response = await call_next(request)
-        return response
+async def _send_json(send, status_code: int, content: dict):
+    body = json.dumps(content).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status_code,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+    })
+    await send({"type": "http.response.body", "body": body})
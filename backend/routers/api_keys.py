@@ -5,7 +5,7 @@ from typing import List
 import utils.crud as crud
 from core import schemas
 from core.database import get_db
-from utils.dependencies import get_current_user, generate_api_key, hash_api_key
+from utils.dependencies import get_current_user, generate_api_key, get_api_key_prefix, hash_api_key, clear_api_key_cache
 
 router = APIRouter(
     tags=["API Keys"],
@@ -28,6 +28,7 @@ async def create_api_key(
         api_key=api_key, 
         user_id=current_user.id, 
         key_hash=key_hash,
+        key_prefix=get_api_key_prefix(raw_key),
         created_by=current_user.email
     )
     
@@ -76,6 +77,8 @@ async def deactivate_api_key(
     
     # Deactivate the API key
     success = await crud.deactivate_api_key(db=db, api_key_id=api_key_id, deactivated_by=current_user.email)
+    # Stop honouring cached verifications of this key immediately
+    clear_api_key_cache(api_key_id)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
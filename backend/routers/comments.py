@@ -6,6 +6,7 @@ import utils.crud as crud
 from core import schemas
 from core.database import get_db
 from utils.dependencies import get_current_user, get_user_context, UserContext, get_image_or_403
+from utils.cache_manager import get_cache
 
 router = APIRouter(
     tags=["Comments"],
@@ -23,7 +24,7 @@ async def create_comment(
     print(f"Current user: {user_context.user}")
     
     # Check if the user has access to the image
-    await get_image_or_403(image_id, db, user_context.user)
+    db_image = await get_image_or_403(image_id, db, user_context.user)
     
     # Set up the comment create object - automatic user ID resolution handled by get_user_context
     comment_create = schemas.ImageCommentCreate(
@@ -35,7 +36,10 @@ async def create_comment(
     print(f"Created comment object: {comment_create}")
     
     # Create the comment with automatic user context
-    return await crud.create_comment(db=db, comment=comment_create, created_by=user_context.email)
+    db_comment = await crud.create_comment(db=db, comment=comment_create, created_by=user_context.email)
+    # Comments are part of the project report
+    get_cache().invalidate_project(db_image.project_id)
+    return db_comment
 
 @router.get("/images/{image_id}/comments", response_model=List[schemas.ImageComment])
 async def list_comments(
@@ -78,7 +82,7 @@ async def update_comment(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Comment not found")
     
     # Check if the user has access to the image
-    await get_image_or_403(db_comment.image_id, db, current_user)
+    db_image = await get_image_or_403(db_comment.image_id, db, current_user)
     
     # Only allow the author of the comment to update it (admin check removed since groups field is gone)
     if current_user.id and str(db_comment.author_id) != str(current_user.id):
@@ -94,6 +98,7 @@ async def update_comment(
         comment_data=comment_data.model_dump(exclude_unset=True),
         updated_by=current_user.email
     )
+    get_cache().invalidate_project(db_image.project_id)
     
     return updated_comment
 
@@ -109,7 +114,7 @@ async def delete_comment(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Comment not found")
     
     # Check if the user has access to the image
-    await get_image_or_403(db_comment.image_id, db, user_context.user)
+    db_image = await get_image_or_403(db_comment.image_id, db, user_context.user)
     
     # Only allow the author of the comment to delete it (admin check removed since groups field is gone)
     if user_context.id and str(db_comment.author_id) != str(user_context.id):
@@ -125,5 +130,6 @@ async def delete_comment(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to delete comment",
         )
+    get_cache().invalidate_project(db_image.project_id)
     
     return None
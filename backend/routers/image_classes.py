@@ -7,6 +7,7 @@ from core import schemas
 from core.database import get_db
 from core.group_auth_helper import is_user_in_group
 from utils.dependencies import get_current_user, get_project_or_403, get_image_or_403
+from utils.cache_manager import get_cache
 
 router = APIRouter(
     tags=["Image Classes"],
@@ -82,6 +83,8 @@ async def update_image_class(
         class_id=class_id, 
         image_class_data=image_class_data.model_dump(exclude_unset=True)
     )
+    # Class names appear in the project report
+    get_cache().invalidate_project(db_class.project_id)
     
     return updated_class
 
@@ -106,6 +109,7 @@ async def delete_image_class(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to delete image class",
         )
+    get_cache().invalidate_project(db_class.project_id)
     
     return None
 
@@ -169,7 +173,9 @@ async def classify_image(
     print(f"Final classification object to save: {classification}")
     
     # Create the classification
-    return await crud.create_image_classification(db=db, classification=classification)
+    db_classification = await crud.create_image_classification(db=db, classification=classification)
+    get_cache().invalidate_project(db_image.project_id)
+    return db_classification
 
 @router.get("/images/{image_id}/classifications", response_model=List[schemas.ImageClassification])
 async def list_image_classifications(
@@ -195,7 +201,7 @@ async def delete_classification(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Classification not found")
     
     # Check if the user has access to the image
-    await get_image_or_403(db_classification.image_id, db, current_user)
+    db_image = await get_image_or_403(db_classification.image_id, db, current_user)
     
     # Only allow the user who created the classification or admin users to delete it
     is_admin = is_user_in_group(current_user.email, "admin")
@@ -212,5 +218,6 @@ async def delete_classification(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to delete classification",
         )
+    get_cache().invalidate_project(db_image.project_id)
     
     return None
@@ -1,24 +1,33 @@
 import uuid
 import io
 import os
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Query, Body
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Query, Body, BackgroundTasks, Request, Response
+from botocore.exceptions import ClientError
 from sqlalchemy import update
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional, Dict, Any
 from pydantic import BaseModel
 import utils.crud as crud
 from core import schemas, models
-from core.database import get_db
+from core.database import get_db, AsyncSessionLocal
 from core.config import settings
 from core.group_auth_helper import is_user_in_group
 from utils.dependencies import get_current_user
-from utils.dependencies import get_project_or_403
-from utils.boto3_client import upload_file_to_s3, get_presigned_download_url, delete_file_from_s3
-from utils.serialization import to_data_instance_schema
+from utils.dependencies import get_project_or_403, get_image_or_403
+from utils.boto3_client import upload_file_to_s3, get_presigned_download_url, delete_file_from_s3, open_object_stream, head_object_s3, download_file_from_s3
+from utils.serialization import to_data_instance_schema, to_ml_analysis_summary_schema
 from utils.file_security import get_content_disposition_header
+from utils.http_conditional import http_date, is_not_modified, requested_range
+from utils.pagination import encode_cursor, decode_cursor
+from utils.image_filters import ImageFilter, parse_filters
 from utils.cache_manager import get_cache
+from utils.compute_executor import get_compute_executor, ComputeSaturatedError
+from utils.image_processing import make_thumbnail, snap_to_derivative
+from utils.derivatives import generate_image_derivatives, delete_image_derivatives, derivative_content_type
 import json as _json
-from PIL import Image
+import logging
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(
     tags=["Images"],
@@ -27,6 +36,7 @@ router = APIRouter(
 @router.post("/projects/{project_id}/images", response_model=schemas.DataInstance, status_code=status.HTTP_201_CREATED)
 async def upload_image_to_project(
     project_id: uuid.UUID,
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     metadata_json: Optional[str] = Form(None, alias="metadata"),
     db: AsyncSession = Depends(get_db),
@@ -68,6 +78,8 @@ async def upload_image_to_project(
     )
     if not success:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to upload file to object storage")
+    # Record the object's validators so conditional GETs can be answered from the database
+    object_head = await head_object_s3(settings.S3_BUCKET, object_storage_key) or {}
     data_instance_create = schemas.DataInstanceCreate(
         project_id=db_project.id,
         filename=file.filename,
@@ -76,16 +88,28 @@ async def upload_image_to_project(
         size_bytes=file_size,
         metadata=parsed_metadata,
         uploaded_by_user_id=current_user.email,
+        storage_etag=object_head.get("etag"),
+        storage_last_modified=object_head.get("last_modified"),
     )
     db_data_instance = await crud.create_data_instance(db=db, data_instance=data_instance_create)
-    
+
+    # Render the thumbnail pyramid after the response is sent
+    if settings.THUMBNAIL_DERIVATIVES_ENABLED and (file.content_type or "").startswith("image/"):
+        background_tasks.add_task(generate_image_derivatives, db_project.id, db_data_instance.id, object_storage_key)
+
     # Invalidate project images cache
     cache = get_cache()
-    cache.clear_pattern(f"project_images:{project_id}")
+    cache.invalidate_project(project_id)
     
     # Use utility function for consistent metadata serialization
     return to_data_instance_schema(db_data_instance)
 
+def _parse_image_filters(filters: Optional[List[str]]) -> List[ImageFilter]:
+    try:
+        return parse_filters(filters)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid filter: {e}")
+
 @router.get("/projects/{project_id}/images", response_model=List[schemas.DataInstance])
 async def list_images_in_project(
     project_id: uuid.UUID,
@@ -95,6 +119,7 @@ async def list_images_in_project(
     deleted_only: bool = Query(False),
     search_field: Optional[str] = Query(None),
     search_value: Optional[str] = Query(None),
+    filters: Optional[List[str]] = Query(None, alias="filter"),
     db: AsyncSession = Depends(get_db),
     current_user: schemas.User = Depends(get_current_user),
 ):
@@ -106,6 +131,8 @@ async def list_images_in_project(
     # Check cache first
     cache = get_cache()
     cache_key = f"project_images:{project_id}:skip:{skip}:limit:{limit}:include_deleted:{include_deleted}:deleted_only:{deleted_only}:search_field:{search_field}:search_value:{search_value}"
+    if filters:
+        cache_key += f":filter:{_json.dumps(filters)}"
     cached_images = cache.get(cache_key)
     
     if cached_images is not None:
@@ -120,31 +147,148 @@ async def list_images_in_project(
             return []
         # Re-raise other exceptions (like permission issues)
         raise
-        
-    # Get images for the project
-    if deleted_only:
-        images = await crud.get_deleted_images_for_project(db=db, project_id=project_id, skip=skip, limit=limit)
-    else:
-        images = await crud.get_data_instances_for_project(db=db, project_id=project_id, skip=skip, limit=limit, search_field=search_field, search_value=search_value)
-    
-    # Process images using utility function for consistent serialization
-    response_images = []
-    if images:
-        for img in images:
-            try:
-                # Skip deleted images unless explicitly requested
-                if img.deleted_at is not None and not include_deleted and not deleted_only:
-                    continue
-                response_images.append(to_data_instance_schema(img))
-            except Exception as e:
-                print(f"Error serializing image {img.id}: {e}")
-                # Skip this image but continue processing others
-                continue
-    
-    # Cache the result (30 minutes) - cache even if empty list
-    cache.set(cache_key, response_images, expire=30*60)
-    
-    return response_images
+
+    parsed_filters = _parse_image_filters(filters)
+
+    async def load_images():
+        # Shared by coalesced callers and may outlive this request, so it
+        # uses its own session rather than the request's
+        async with AsyncSessionLocal() as session:
+            if deleted_only:
+                images = await crud.get_deleted_images_for_project(db=session, project_id=project_id, skip=skip, limit=limit, filters=parsed_filters)
+            else:
+                # Deleted rows are filtered in SQL so pages stay full
+                images = await crud.get_data_instances_for_project(db=session, project_id=project_id, skip=skip, limit=limit, search_field=search_field, search_value=search_value, include_deleted=include_deleted, filters=parsed_filters)
+
+            # Process images using utility function for consistent serialization
+            response_images = []
+            if images:
+                for img in images:
+                    try:
+                        response_images.append(to_data_instance_schema(img))
+                    except Exception as e:
+                        print(f"Error serializing image {img.id}: {e}")
+                        # Skip this image but continue processing others
+                        continue
+            return response_images
+
+    # Concurrent cold requests share one query; cached for 30 minutes, even if empty
+    return await cache.get_or_compute(cache_key, load_images, expire=30*60)
+
+@router.get("/projects/{project_id}/images:page", response_model=schemas.DataInstancePage)
+async def list_images_page(
+    project_id: uuid.UUID,
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(100, ge=1, le=1000),
+    sort: str = Query("created_at"),
+    order: str = Query("asc", pattern="^(asc|desc)$"),
+    include_deleted: bool = Query(False),
+    deleted_only: bool = Query(False),
+    search_field: Optional[str] = Query(None),
+    search_value: Optional[str] = Query(None),
+    filters: Optional[List[str]] = Query(None, alias="filter"),
+    db: AsyncSession = Depends(get_db),
+    current_user: schemas.User = Depends(get_current_user),
+):
+    """
+    Lists a project's images one keyset page at a time.
+    Results are ordered by (sort, id); pass next_cursor back as cursor to continue.
+    Unlike skip/limit, deep pages cost the same as the first one.
+    """
+    if sort not in crud.IMAGE_SORT_KEYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported sort key. Use one of: {', '.join(sorted(crud.IMAGE_SORT_KEYS))}",
+        )
+    descending = order == "desc"
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor, sort, descending)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid cursor: {e}")
+    parsed_filters = _parse_image_filters(filters)
+
+    await get_project_or_403(project_id, db, current_user)
+
+    cache = get_cache()
+    cache_key = f"project_images:{project_id}:page:{sort}:{order}:cursor:{cursor}:limit:{limit}:include_deleted:{include_deleted}:deleted_only:{deleted_only}:search_field:{search_field}:search_value:{search_value}:filter:{_json.dumps(filters or [])}"
+
+    async def load_page():
+        # Own session: the computation is shared with coalesced callers
+        async with AsyncSessionLocal() as session:
+            images, has_more = await crud.get_data_instances_page(
+                session,
+                project_id,
+                sort=sort,
+                descending=descending,
+                after=after,
+                limit=limit,
+                include_deleted=include_deleted,
+                deleted_only=deleted_only,
+                search_field=search_field,
+                search_value=search_value,
+                filters=parsed_filters,
+            )
+            next_cursor = None
+            if has_more:
+                last = images[-1]
+                next_cursor = encode_cursor(sort, descending, getattr(last, sort), last.id)
+            return schemas.DataInstancePage(
+                items=[to_data_instance_schema(img) for img in images],
+                next_cursor=next_cursor,
+            )
+
+    return await cache.get_or_compute(cache_key, load_page, expire=30*60)
+
+@router.get("/images/{image_id}/neighbors", response_model=schemas.ImageNeighbors)
+async def get_image_neighbors(
+    image_id: uuid.UUID,
+    sort: str = Query("created_at"),
+    order: str = Query("asc", pattern="^(asc|desc)$"),
+    include_deleted: bool = Query(False),
+    search_field: Optional[str] = Query(None),
+    search_value: Optional[str] = Query(None),
+    filters: Optional[List[str]] = Query(None, alias="filter"),
+    include_position: bool = Query(False),
+    db: AsyncSession = Depends(get_db),
+    current_user: schemas.User = Depends(get_current_user),
+):
+    """
+    Returns the previous/next image ids within the image's project listing,
+    using the same sort, order and filters as images:page. Previous/next are
+    indexed seeks whose cost does not grow with the project. The 1-based
+    position is only returned with include_position, since it counts every
+    image before this one; the total is a count when filters are applied.
+    """
+    if sort not in crud.IMAGE_SORT_KEYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported sort key. Use one of: {', '.join(sorted(crud.IMAGE_SORT_KEYS))}",
+        )
+    parsed_filters = _parse_image_filters(filters)
+
+    db_image = await get_image_or_403(image_id, db, current_user)
+
+    cache = get_cache()
+    cache_key = f"project_images:{db_image.project_id}:neighbors:{image_id}:{sort}:{order}:position:{include_position}:include_deleted:{include_deleted}:search_field:{search_field}:search_value:{search_value}:filter:{_json.dumps(filters or [])}"
+
+    async def load_neighbors():
+        # Own session: the computation is shared with coalesced callers
+        async with AsyncSessionLocal() as session:
+            return schemas.ImageNeighbors(**await crud.get_data_instance_neighbors(
+                session,
+                db_image,
+                sort=sort,
+                descending=order == "desc",
+                include_deleted=include_deleted,
+                search_field=search_field,
+                search_value=search_value,
+                filters=parsed_filters,
+                with_position=include_position,
+            ))
+
+    return await cache.get_or_compute(cache_key, load_neighbors, expire=30*60)
 
 # Add trailing slash version to handle frontend requests
 @router.get("/projects/{project_id}/images/", response_model=List[schemas.DataInstance])
@@ -156,6 +300,7 @@ async def list_images_in_project_with_slash(
     deleted_only: bool = Query(False),
     search_field: Optional[str] = Query(None),
     search_value: Optional[str] = Query(None),
+    filters: Optional[List[str]] = Query(None, alias="filter"),
     db: AsyncSession = Depends(get_db),
     current_user: schemas.User = Depends(get_current_user),
 ):
@@ -165,7 +310,7 @@ async def list_images_in_project_with_slash(
     It ensures compatibility with various frontend routing configurations.
     """
     # Just call the main function to avoid code duplication
-    return await list_images_in_project(project_id, skip, limit, include_deleted, deleted_only, search_field, search_value, db, current_user)
+    return await list_images_in_project(project_id, skip, limit, include_deleted, deleted_only, search_field, search_value, filters, db, current_user)
 
 
 @router.get("/images/{image_id}", response_model=schemas.DataInstance)
@@ -206,7 +351,52 @@ async def get_image_metadata(
     
     return result
 
-import httpx
+IMAGE_BUNDLE_SECTIONS = ("classifications", "comments", "analyses", "classes")
+
+@router.get("/images/{image_id}/bundle", response_model=schemas.ImageBundle)
+async def get_image_bundle(
+    image_id: uuid.UUID,
+    include: Optional[str] = Query(None, description="Comma-separated sections; defaults to all"),
+    include_deleted: bool = Query(False),
+    db: AsyncSession = Depends(get_db),
+    current_user: schemas.User = Depends(get_current_user),
+):
+    """
+    Returns an image together with its classifications, comments, analyses,
+    the project's classes and the current user in one response.
+    Access is checked once and every section is read on the same session,
+    replacing the separate requests the image page would otherwise make.
+    """
+    sections = set(IMAGE_BUNDLE_SECTIONS)
+    if include is not None:
+        sections = {part.strip() for part in include.split(",") if part.strip()}
+        unknown = sections - set(IMAGE_BUNDLE_SECTIONS)
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown bundle sections: {', '.join(sorted(unknown))}. Use any of: {', '.join(IMAGE_BUNDLE_SECTIONS)}",
+            )
+
+    db_image = await get_image_or_403(image_id, db, current_user)
+    if db_image.deleted_at and not include_deleted:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Image not found")
+
+    bundle = {"image": to_data_instance_schema(db_image), "user": current_user}
+    if "classifications" in sections:
+        bundle["classifications"] = await crud.get_classifications_for_image(db=db, image_id=image_id)
+    if "comments" in sections:
+        bundle["comments"] = await crud.get_comments_for_image(db=db, image_id=image_id)
+    if "analyses" in sections and settings.ML_ANALYSIS_ENABLED:
+        analyses = await crud.list_ml_analyses_for_image(db, image_id)
+        total = await crud.count_ml_analyses_for_image(db, image_id)
+        summaries = await crud.get_ml_annotation_summaries(db, [o.id for o in analyses])
+        bundle["analyses"] = schemas.MLAnalysisList(
+            analyses=[to_ml_analysis_summary_schema(o, summaries[o.id]) for o in analyses], total=total
+        )
+    if "classes" in sections:
+        bundle["classes"] = await crud.get_image_classes_for_project(db=db, project_id=db_image.project_id)
+    return schemas.ImageBundle(**bundle)
+
 from fastapi.responses import StreamingResponse
 
 @router.get("/images/{image_id}/download", response_model=schemas.PresignedUrlResponse)
@@ -247,6 +437,7 @@ async def get_image_download_url(
 @router.get("/images/{image_id}/content", response_class=StreamingResponse)
 async def get_image_content(
     image_id: uuid.UUID,
+    request: Request,
     include_deleted: bool = Query(False),
     db: AsyncSession = Depends(get_db),
     current_user: schemas.User = Depends(get_current_user),
@@ -254,7 +445,8 @@ async def get_image_content(
     """
     Streams the content of an image from object storage.
     This endpoint acts as a proxy, ensuring proper access control.
-    It returns the image data with appropriate headers for inline display.
+    It returns the image data with appropriate headers for inline display,
+    honours single byte ranges (206) and answers revalidations with 304.
     """
     db_image = await crud.get_data_instance(db=db, image_id=image_id)
     if db_image is None or (db_image.deleted_at and not include_deleted):
@@ -267,40 +459,75 @@ async def get_image_content(
             status_code=status.HTTP_403_FORBIDDEN,
             detail=f"User '{current_user.email}' does not have access to image '{image_id}'",
         )
-    
-    # Get the presigned URL for internal use
-    internal_url = get_presigned_download_url(
-        bucket_name=settings.S3_BUCKET,
-        object_name=db_image.object_storage_key
+
+    # Objects are never overwritten, so validators recorded at upload let us
+    # answer revalidations without touching storage
+    etag = db_image.storage_etag
+    last_modified = db_image.storage_last_modified
+    if etag and is_not_modified(request.headers, etag, last_modified):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=_validator_headers(etag, last_modified))
+
+    byte_range = requested_range(request.headers, etag)
+    try:
+        stream = await open_object_stream(settings.S3_BUCKET, db_image.object_storage_key, byte_range=byte_range)
+    except ClientError as e:
+        error_code = e.response.get('Error', {}).get('Code')
+        if error_code == 'InvalidRange':
+            headers = {"Content-Range": f"bytes */{db_image.size_bytes}"} if db_image.size_bytes else None
+            raise HTTPException(status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE, detail="Requested range not satisfiable", headers=headers)
+        if error_code in ('NoSuchKey', '404'):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Image content not found in storage")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error fetching image from storage: {error_code}"
+        )
+    except Exception as e:
+        # Ensure any unexpected exception is returned as 500 per tests
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Unexpected error fetching image: {str(e)}"
+        )
+
+    # Rows uploaded before validators were recorded: use the object's own
+    if not etag:
+        etag, last_modified = stream.etag, stream.last_modified
+        if is_not_modified(request.headers, etag, last_modified):
+            await stream.aclose()
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=_validator_headers(etag, last_modified))
+
+    headers = {
+        "Content-Disposition": get_content_disposition_header(db_image.filename, "inline"),
+        "Accept-Ranges": "bytes",
+        **_validator_headers(etag, last_modified),
+    }
+    if stream.content_length is not None:
+        headers["Content-Length"] = str(stream.content_length)
+    if byte_range and stream.content_range:
+        headers["Content-Range"] = stream.content_range
+    return StreamingResponse(
+        content=stream.iter_chunks(),
+        status_code=status.HTTP_206_PARTIAL_CONTENT if byte_range and stream.content_range else status.HTTP_200_OK,
+        media_type=db_image.content_type or stream.content_type,
+        headers=headers,
     )
-    if not internal_url:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Could not generate download URL")
-    
-    # Use httpx to fetch the image from s3
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(internal_url)
-            response.raise_for_status()
-            
-            # Create a streaming response with the same content type
-            return StreamingResponse(
-                content=response.iter_bytes(),
-                media_type=db_image.content_type or "application/octet-stream",
-                headers={
-                    "Content-Disposition": get_content_disposition_header(db_image.filename, "inline")
-                }
-            )
-        except httpx.HTTPError as e:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Error fetching image from storage: {str(e)}"
-            )
-        except Exception as e:
-            # Ensure any unexpected exception is returned as 500 per tests
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Unexpected error fetching image: {str(e)}"
-            )
+
+def _validator_headers(etag: Optional[str], last_modified) -> Dict[str, str]:
+    headers = {}
+    if etag:
+        headers["ETag"] = etag
+    if last_modified:
+        headers["Last-Modified"] = http_date(last_modified)
+    return headers
+
+async def _fetch_object_bytes(object_key: str) -> bytes:
+    """Read a whole object from storage through the pooled storage layer."""
+    image_data = await download_file_from_s3(settings.S3_BUCKET, object_key)
+    if image_data is None:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error fetching image from storage"
+        )
+    return image_data
 
 @router.get("/images/{image_id}/thumbnail", response_class=StreamingResponse)
 async def get_image_thumbnail(
@@ -313,8 +540,9 @@ async def get_image_thumbnail(
 ):
     """
     Generates and returns a thumbnail for a given image.
-    It resizes the image to specified dimensions while maintaining aspect ratio.
-    The thumbnail is cached for subsequent requests.
+    Images with a pre-rendered derivative pyramid are streamed the nearest size
+    that covers the request; otherwise the original is resized on demand,
+    maintaining aspect ratio, and the result is cached for subsequent requests.
     """
     if width <= 0 or height <= 0:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Width and height must be positive integers")
@@ -346,69 +574,58 @@ async def get_image_thumbnail(
             detail=f"User '{current_user.email}' does not have access to image '{image_id}'",
         )
     
-    # Get the presigned URL for internal use
-    internal_url = get_presigned_download_url(
-        bucket_name=settings.S3_BUCKET,
-        object_name=db_image.object_storage_key
-    )
-    if not internal_url:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Could not generate download URL")
-    
-    # Use httpx to fetch the image from Minio
-    async with httpx.AsyncClient() as client:
+    thumbnail_filename = f"thumbnail_{db_image.filename}" if db_image.filename else "thumbnail"
+    object_storage_key = db_image.object_storage_key
+
+    # Stream the nearest pre-rendered derivative over the pooled storage layer
+    # when the upload pyramid exists; fall back to resizing the original
+    if db_image.derivative_keys:
+        size = snap_to_derivative((int(s) for s in db_image.derivative_keys), width, height)
+        try:
+            stream = await open_object_stream(settings.S3_BUCKET, db_image.derivative_keys[str(size)])
+        except Exception as e:
+            logger.warning("Derivative unavailable, resizing original", extra={
+                "image_id": str(image_id),
+                "size": size,
+                "error": str(e),
+            })
+        else:
+            headers = {"Content-Disposition": get_content_disposition_header(thumbnail_filename, "inline")}
+            if stream.content_length is not None:
+                headers["Content-Length"] = str(stream.content_length)
+            return StreamingResponse(content=stream.iter_chunks(), media_type=derivative_content_type(), headers=headers)
+
+    async def render_thumbnail():
+        # Needs no session; only plain values are captured from this request
+        image_data = await _fetch_object_bytes(object_storage_key)
+
+        # Decode/resize on the compute executor so large images don't stall the event loop
         try:
-            response = await client.get(internal_url)
-            response.raise_for_status()
-            
-            # Get the image data
-            image_data = await response.aread()
-            
-            # Use PIL to resize the image
-            try:
-                img = Image.open(io.BytesIO(image_data))
-                
-                # Resize the image while maintaining aspect ratio
-                img.thumbnail((width, height))
-                
-                # Save the resized image to a bytes buffer
-                output_buffer = io.BytesIO()
-                img_format = img.format or 'JPEG'  # Default to JPEG if format is unknown
-                img.save(output_buffer, format=img_format)
-                output_buffer.seek(0)
-                
-                # Determine the content type based on the image format
-                content_type_map = {
-                    'JPEG': 'image/jpeg',
-                    'PNG': 'image/png',
-                    'GIF': 'image/gif',
-                    'WEBP': 'image/webp'
-                }
-                content_type = content_type_map.get(img_format, 'image/jpeg')
-                
-                # Cache the thumbnail (24 hours)
-                thumbnail_filename = f"thumbnail_{db_image.filename}" if db_image.filename else "thumbnail"
-                thumbnail_data = output_buffer.getvalue()
-                cache.set(cache_key, (thumbnail_data, content_type, thumbnail_filename), expire=24*3600)
-                
-                # Return the thumbnail
-                output_buffer.seek(0)
-                return StreamingResponse(
-                    content=output_buffer,
-                    media_type=content_type,
-                    headers={
-                        "Content-Disposition": get_content_disposition_header(thumbnail_filename, "inline")
-                    }
-                )
-            except Exception as e:
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail=f"Error generating thumbnail: {str(e)}"
-                )
-        except httpx.HTTPError as e:
+            thumbnail_data, content_type = await get_compute_executor().run(make_thumbnail, image_data, width, height)
+        except ComputeSaturatedError:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Image processing is busy, please retry shortly",
+                headers={"Retry-After": "1"},
+            )
+        except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Error fetching image from storage: {str(e)}"
+                detail=f"Error generating thumbnail: {str(e)}"
             )
+        return thumbnail_data, content_type, thumbnail_filename
+
+    # Concurrent misses for the same size share one fetch/resize; cached for 24 hours
+    thumbnail_data, content_type, thumbnail_filename = await cache.get_or_compute(cache_key, render_thumbnail, expire=24*3600)
+
+    # Return the thumbnail
+    return StreamingResponse(
+        content=io.BytesIO(thumbnail_data),
+        media_type=content_type,
+        headers={
+            "Content-Disposition": get_content_disposition_header(thumbnail_filename, "inline")
+        }
+    )
 
 class MetadataUpdate(BaseModel):
     key: str
@@ -442,15 +659,15 @@ async def delete_image(
         await crud.create_image_deletion_event(db, image=db_image, actor_user_id=actor_user_id, action="soft_delete", reason=body.reason, previous_state=prev_state)
     if body.force and not db_image.storage_deleted:
         # Future: verify current_user is project owner/admin; placeholder uses membership only.
-        delete_file_from_s3(settings.S3_BUCKET, db_image.object_storage_key)
+        await delete_file_from_s3(settings.S3_BUCKET, db_image.object_storage_key)
+        await delete_image_derivatives(db_image.derivative_keys)
         await crud.mark_image_storage_deleted(db, db_image, actor_user_id=actor_user_id, hard=True)
         await crud.create_image_deletion_event(db, image=db_image, actor_user_id=actor_user_id, action="force_delete", reason=body.reason, previous_state={})
     await db.commit()
     await db.refresh(db_image)
     cache = get_cache()
-    cache.clear_pattern(f"project_images:{project_id}")
-    cache.delete(f"image:{image_id}:metadata")
-    cache.clear_pattern(f"thumbnail:{image_id}")
+    cache.invalidate_project(project_id)
+    cache.invalidate_image(image_id)
     return to_data_instance_schema(db_image)
 
 @router.post("/projects/{project_id}/images/{image_id}/restore", response_model=schemas.DataInstance)
@@ -479,9 +696,8 @@ async def restore_deleted_image(
     await db.commit()
     await db.refresh(db_image)
     cache = get_cache()
-    cache.clear_pattern(f"project_images:{project_id}")
-    cache.delete(f"image:{image_id}:metadata")
-    cache.clear_pattern(f"thumbnail:{image_id}")
+    cache.invalidate_project(project_id)
+    cache.invalidate_image(image_id)
     return to_data_instance_schema(db_image)
 
 @router.get("/projects/{project_id}/images/deletion-events", response_model=schemas.ImageDeletionEventList)
@@ -536,9 +752,8 @@ async def update_image_metadata(
     
     # Invalidate caches
     cache = get_cache()
-    cache.delete(f"image:{image_id}:metadata")
-    cache.clear_pattern(f"project_images:{db_image.project_id}")
-    cache.clear_pattern(f"thumbnail:{image_id}")
+    cache.invalidate_image(image_id)
+    cache.invalidate_project(db_image.project_id)
     
     # Return the updated image; build response dict ensuring updated metadata is present
     await db.refresh(db_image)
@@ -599,9 +814,8 @@ async def delete_image_metadata(
     
     # Invalidate caches
     cache = get_cache()
-    cache.delete(f"image:{image_id}:metadata")
-    cache.clear_pattern(f"project_images:{db_image.project_id}")
-    cache.clear_pattern(f"thumbnail:{image_id}")
+    cache.invalidate_image(image_id)
+    cache.invalidate_project(db_image.project_id)
     
     # Return the updated image; build response dict ensuring updated metadata is present
     await db.refresh(db_image)
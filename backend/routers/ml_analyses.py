@@ -6,9 +6,17 @@ from pydantic import Field
 from core import schemas
 from core.config import settings
 from core.database import get_db
-from utils.dependencies import get_current_user, get_image_or_403, verify_hmac_signature_flexible
+from fastapi.responses import StreamingResponse
+from utils.dependencies import get_current_user, get_image_or_403, get_project_or_403, verify_hmac_signature_flexible, verify_hmac_timestamp, hmac_digest_matches
+from middleware.body_cache import StreamedBodyMAC
 import utils.crud as crud
-from datetime import datetime, timezone
+from core.group_auth_helper import get_groups_for_user
+from utils.event_bus import get_event_bus, image_topic, project_topic
+from utils.serialization import to_data_instance_schema, to_ml_analysis_summary_schema
+from utils.pagination import encode_cursor, decode_cursor
+from utils.image_filters import parse_filters
+from datetime import datetime, timedelta, timezone
+import json as _json
 import logging
 
 logger = logging.getLogger(__name__)
@@ -45,7 +53,6 @@ async def get_artifact_download_url(
         raise HTTPException(status_code=404, detail="ML analysis feature disabled")
 
     from utils.boto3_client import get_presigned_download_url, boto3_client
-    from datetime import timedelta
 
     # Validate path starts with ml_outputs/
     if not path.startswith("ml_outputs/"):
@@ -63,7 +70,7 @@ async def get_artifact_download_url(
         raise HTTPException(status_code=400, detail="Invalid analysis ID in path")
 
     # Verify user has access to the analysis
-    db_obj = await crud.get_ml_analysis(db, analysis_id)
+    db_obj = await crud.get_ml_analysis(db, analysis_id, with_annotations=False)
     if not db_obj:
         raise HTTPException(status_code=404, detail="Analysis not found")
 
@@ -98,7 +105,7 @@ async def get_artifact_content(
     if not settings.ML_ANALYSIS_ENABLED:
         raise HTTPException(status_code=404, detail="ML analysis feature disabled")
 
-    from utils.boto3_client import boto3_client
+    from utils.boto3_client import boto3_client, open_object_stream
     from fastapi.responses import StreamingResponse
     from botocore.exceptions import ClientError
 
@@ -118,7 +125,7 @@ async def get_artifact_content(
         raise HTTPException(status_code=400, detail="Invalid analysis ID in path")
 
     # Verify user has access to the analysis
-    db_obj = await crud.get_ml_analysis(db, analysis_id)
+    db_obj = await crud.get_ml_analysis(db, analysis_id, with_annotations=False)
     if not db_obj:
         raise HTTPException(status_code=404, detail="Analysis not found")
 
@@ -131,13 +138,12 @@ async def get_artifact_content(
 
     # Stream the object from S3
     try:
-        response = boto3_client.get_object(Bucket=settings.S3_BUCKET, Key=path)
-        content_type = response.get('ContentType', 'application/octet-stream')
+        stream = await open_object_stream(settings.S3_BUCKET, path)
 
         # Stream the body
         return StreamingResponse(
-            response['Body'].iter_chunks(chunk_size=8192),
-            media_type=content_type,
+            stream.iter_chunks(),
+            media_type=stream.content_type,
             headers={
                 'Cache-Control': 'max-age=3600',
                 'Content-Disposition': f'inline; filename="{parts[-1]}"'
@@ -181,12 +187,10 @@ async def create_ml_analysis(
     # Access check
     await get_image_or_403(image_id, db, current_user)
     # Basic per-image limit
-    existing = await crud.list_ml_analyses_for_image(db, image_id, 0, settings.ML_MAX_ANALYSES_PER_IMAGE + 1)
-    if len(existing) >= settings.ML_MAX_ANALYSES_PER_IMAGE:
+    if await crud.count_ml_analyses_for_image(db, image_id) >= settings.ML_MAX_ANALYSES_PER_IMAGE:
         raise HTTPException(status_code=400, detail="Analysis limit reached for this image")
     # Model allow-list check
-    allowed = [m.strip() for m in settings.ML_ALLOWED_MODELS.split(',') if m.strip()]
-    if analysis_in.model_name not in allowed:
+    if analysis_in.model_name not in settings.ML_ALLOWED_MODEL_SET:
         raise HTTPException(status_code=400, detail="Model not allowed")
     db_obj = await crud.create_ml_analysis(db, analysis_in, requested_by_id=current_user.id, status=settings.ML_DEFAULT_STATUS)
     # Audit log
@@ -216,6 +220,59 @@ async def create_ml_analysis(
         annotations=[]
     )
 
+@router.post("/projects/{project_id}/analyses:bulk", response_model=schemas.MLAnalysisBulkCreateResult)
+async def create_ml_analyses_bulk(
+    project_id: uuid.UUID,
+    analysis_in: schemas.MLAnalysisBulkCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: schemas.User = Depends(get_current_user),
+):
+    """
+    Queue an analysis of one model for many images of a project in one
+    transaction: image_ids, or the images matching filters/search, or the
+    whole project. Images at ML_MAX_ANALYSES_PER_IMAGE, and by default those
+    that already have a run of this model and version, are skipped. At most
+    ML_BULK_CREATE_MAX analyses are queued per request; `remaining` says how
+    many eligible images are left for another request.
+    """
+    if not settings.ML_ANALYSIS_ENABLED:
+        raise HTTPException(status_code=404, detail="ML analysis feature disabled")
+    if analysis_in.model_name not in settings.ML_ALLOWED_MODEL_SET:
+        raise HTTPException(status_code=400, detail="Model not allowed")
+    if analysis_in.image_ids is not None and len(analysis_in.image_ids) > settings.ML_BULK_CREATE_MAX_IDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.ML_BULK_CREATE_MAX_IDS} image_ids per request; select larger sets with filters",
+        )
+    try:
+        image_filters = parse_filters(analysis_in.filters)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid filter: {e}")
+    await get_project_or_403(project_id, db, current_user)
+    counts = await crud.create_ml_analyses_bulk(
+        db, project_id, analysis_in,
+        requested_by_id=current_user.id,
+        status=settings.ML_DEFAULT_STATUS,
+        image_filters=image_filters,
+        max_per_image=settings.ML_MAX_ANALYSES_PER_IMAGE,
+        max_create=settings.ML_BULK_CREATE_MAX,
+    )
+    not_found = len(set(analysis_in.image_ids)) - counts["matched"] if analysis_in.image_ids is not None else 0
+    logger.info("ML_ANALYSIS_BULK_CREATE", extra={
+        "project_id": str(project_id),
+        "model": sanitize_for_log(analysis_in.model_name),
+        "created": counts["created"],
+        "requested_by": sanitize_for_log(str(current_user.id)),
+    })
+    return schemas.MLAnalysisBulkCreateResult(
+        project_id=project_id,
+        model_name=analysis_in.model_name,
+        model_version=analysis_in.model_version,
+        status=settings.ML_DEFAULT_STATUS,
+        not_found=not_found,
+        **counts,
+    )
+
 @router.get("/images/{image_id}/analyses", response_model=schemas.MLAnalysisList)
 async def list_ml_analyses(
     image_id: uuid.UUID,
@@ -229,29 +286,236 @@ async def list_ml_analyses(
     await get_image_or_403(image_id, db, current_user)
     objs = await crud.list_ml_analyses_for_image(db, image_id, skip, limit)
     total_count = await crud.count_ml_analyses_for_image(db, image_id)
-    # Convert to schemas (annotations excluded for list for performance)
-    analyses = [
-        schemas.MLAnalysis(
-            id=o.id,
-            image_id=o.image_id,
-            model_name=o.model_name,
-            model_version=o.model_version,
-            status=o.status,
-            error_message=o.error_message,
-            parameters=o.parameters,
-            provenance=o.provenance,
-            requested_by_id=o.requested_by_id,
-            external_job_id=o.external_job_id,
-            priority=o.priority,
-            created_at=o.created_at,
-            started_at=o.started_at,
-            completed_at=o.completed_at,
-            updated_at=o.updated_at,
-            annotations=[]
-        ) for o in objs
-    ]
+    # Annotations are summarised in SQL instead of loaded
+    summaries = await crud.get_ml_annotation_summaries(db, [o.id for o in objs])
+    analyses = [to_ml_analysis_summary_schema(o, summaries[o.id]) for o in objs]
     return schemas.MLAnalysisList(analyses=analyses, total=total_count)
 
+def _sse_message(event: str, data: dict) -> bytes:
+    return f"event: {event}\ndata: {_json.dumps(data)}\n\n".encode("utf-8")
+
+
+async def _analysis_event_stream(request: Request, topic: str):
+    """Relay bus events for one topic as server-sent events until the client disconnects."""
+    async with get_event_bus().subscribe([topic]) as subscription:
+        yield f"retry: {settings.ML_EVENTS_RETRY_MS}\n\n".encode("utf-8")
+        while not await request.is_disconnected():
+            event = await subscription.get(timeout=settings.ML_EVENTS_KEEPALIVE_SECONDS)
+            if subscription.overflowed:
+                # Events were dropped for this slow client; it should refetch
+                subscription.overflowed = False
+                yield _sse_message("resync", {})
+            if event is None:
+                yield b": keepalive\n\n"
+            else:
+                yield _sse_message("analysis", event)
+
+
+def _event_stream_response(request: Request, topic: str) -> StreamingResponse:
+    return StreamingResponse(
+        _analysis_event_stream(request, topic),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/images/{image_id}/analyses/events")
+async def stream_image_analysis_events(
+    image_id: uuid.UUID,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: schemas.User = Depends(get_current_user),
+):
+    """
+    Server-sent events for the analyses of one image: an "analysis" event per
+    status transition or annotation upload, and "resync" if events were dropped.
+    Replaces polling the analyses list while jobs are queued or processing.
+    """
+    if not settings.ML_ANALYSIS_ENABLED:
+        raise HTTPException(status_code=404, detail="ML analysis feature disabled")
+    await get_image_or_403(image_id, db, current_user)
+    # The stream can stay open for hours; give the connection back to the pool now
+    await db.close()
+    return _event_stream_response(request, image_topic(image_id))
+
+
+@router.get("/projects/{project_id}/analyses/events")
+async def stream_project_analysis_events(
+    project_id: uuid.UUID,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: schemas.User = Depends(get_current_user),
+):
+    """Server-sent events for the analyses of every image in a project."""
+    if not settings.ML_ANALYSIS_ENABLED:
+        raise HTTPException(status_code=404, detail="ML analysis feature disabled")
+    await get_project_or_403(project_id, db, current_user)
+    await db.close()
+    return _event_stream_response(request, project_topic(project_id))
+
+@router.get("/projects/{project_id}/ml-summary", response_model=schemas.ProjectMLSummaryPage)
+async def get_project_ml_summary(
+    project_id: uuid.UUID,
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(100, ge=1, le=1000),
+    sort: str = Query("created_at"),
+    order: str = Query("asc", pattern="^(asc|desc)$"),
+    include_deleted: bool = Query(False),
+    deleted_only: bool = Query(False),
+    search_field: Optional[str] = Query(None),
+    search_value: Optional[str] = Query(None),
+    filters: Optional[List[str]] = Query(None, alias="filter"),
+    model_name: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_db),
+    current_user: schemas.User = Depends(get_current_user),
+):
+    """
+    Latest analysis per model, with status and annotation count, for one page
+    of a project's images. Paging, search and filter parameters match
+    /projects/{id}/images:page, so a gallery can badge every tile of the page
+    it is showing with one request.
+    """
+    if not settings.ML_ANALYSIS_ENABLED:
+        raise HTTPException(status_code=404, detail="ML analysis feature disabled")
+    if sort not in crud.IMAGE_SORT_KEYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported sort key. Use one of: {', '.join(sorted(crud.IMAGE_SORT_KEYS))}",
+        )
+    descending = order == "desc"
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor, sort, descending)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid cursor: {e}")
+    try:
+        image_filters = parse_filters(filters)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid filter: {e}")
+    await get_project_or_403(project_id, db, current_user)
+    images, has_more = await crud.get_data_instances_page(
+        db,
+        project_id,
+        sort=sort,
+        descending=descending,
+        after=after,
+        limit=limit,
+        include_deleted=include_deleted,
+        deleted_only=deleted_only,
+        search_field=search_field,
+        search_value=search_value,
+        filters=image_filters,
+    )
+    latest = await crud.get_latest_ml_analyses_for_images(db, [img.id for img in images], model_name)
+    next_cursor = None
+    if has_more:
+        last = images[-1]
+        next_cursor = encode_cursor(sort, descending, getattr(last, sort), last.id)
+    return schemas.ProjectMLSummaryPage(
+        items=[
+            schemas.ImageMLSummary(image_id=img.id, models=[schemas.ImageModelStatus(**a) for a in latest[img.id]])
+            for img in images
+        ],
+        next_cursor=next_cursor,
+    )
+
+
+@router.get("/projects/{project_id}/images:pending-analysis", response_model=schemas.DataInstancePage)
+async def list_images_pending_analysis(
+    project_id: uuid.UUID,
+    model: str = Query(..., min_length=1, max_length=255),
+    version: Optional[str] = Query(None, max_length=100),
+    statuses: List[str] = Query(["queued", "processing", "completed"], alias="status"),
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_db),
+    current_user: schemas.User = Depends(get_current_user),
+):
+    """
+    Images that still need an analysis by this model: those with no analysis
+    of model (and version) whose status is one of ?status= (repeatable;
+    default queued, processing and completed). Ordered by upload time.
+    """
+    if not settings.ML_ANALYSIS_ENABLED:
+        raise HTTPException(status_code=404, detail="ML analysis feature disabled")
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor, "created_at", False)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid cursor: {e}")
+    await get_project_or_403(project_id, db, current_user)
+    images, has_more = await crud.get_images_pending_analysis(
+        db, project_id, model_name=model, model_version=version,
+        statuses=[s.lower() for s in statuses], after=after, limit=limit,
+    )
+    next_cursor = None
+    if has_more:
+        last = images[-1]
+        next_cursor = encode_cursor("created_at", False, last.created_at, last.id)
+    return schemas.DataInstancePage(
+        items=[to_data_instance_schema(img) for img in images],
+        next_cursor=next_cursor,
+    )
+
+
+def _parse_region(region: str):
+    try:
+        values = tuple(float(v) for v in region.split(","))
+    except ValueError:
+        values = ()
+    if len(values) != 4 or not all(0.0 <= v <= 1.0 for v in values) or values[0] > values[2] or values[1] > values[3]:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="region must be x_min,y_min,x_max,y_max normalised to 0..1",
+        )
+    return values
+
+
+@router.get("/projects/{project_id}/annotations/search", response_model=schemas.AnnotationSearchPage)
+async def search_project_annotations(
+    project_id: uuid.UUID,
+    class_name: Optional[str] = None,
+    annotation_type: Optional[str] = None,
+    model_name: Optional[str] = None,
+    min_confidence: Optional[float] = Query(None, ge=0, le=1),
+    max_confidence: Optional[float] = Query(None, ge=0, le=1),
+    region: Optional[str] = Query(None, description="x_min,y_min,x_max,y_max normalised to 0..1; matches overlapping boxes"),
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    db: AsyncSession = Depends(get_db),
+    current_user: schemas.User = Depends(get_current_user),
+):
+    """
+    Images of a project with annotations matching class, type, model,
+    confidence range and/or box region, ranked by best matching confidence.
+    """
+    if not settings.ML_ANALYSIS_ENABLED:
+        raise HTTPException(status_code=404, detail="ML analysis feature disabled")
+    parsed_region = _parse_region(region) if region is not None else None
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor, "confidence", True)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid cursor: {e}")
+    await get_project_or_403(project_id, db, current_user)
+    rows, has_more = await crud.search_project_annotations(
+        db, project_id,
+        class_name=class_name, annotation_type=annotation_type, model_name=model_name,
+        min_confidence=min_confidence, max_confidence=max_confidence,
+        region=parsed_region, after=after, limit=limit,
+    )
+    next_cursor = None
+    if has_more:
+        last = rows[-1]
+        next_cursor = encode_cursor("confidence", True, last["max_confidence"], last["image_id"])
+    return schemas.AnnotationSearchPage(
+        items=[schemas.AnnotationSearchHit(**row) for row in rows],
+        next_cursor=next_cursor,
+    )
+
 @router.get("/analyses/{analysis_id}", response_model=schemas.MLAnalysis)
 async def get_ml_analysis(
     analysis_id: uuid.UUID,
@@ -308,7 +572,7 @@ async def list_analysis_annotations(
 ):
     if not settings.ML_ANALYSIS_ENABLED:
         raise HTTPException(status_code=404, detail="ML analysis feature disabled")
-    db_obj = await crud.get_ml_analysis(db, analysis_id)
+    db_obj = await crud.get_ml_analysis(db, analysis_id, with_annotations=False)
     if not db_obj:
         raise HTTPException(status_code=404, detail="Analysis not found")
     # Access via image
@@ -343,6 +607,50 @@ VALID_STATUS_TRANSITIONS = {
 }
 
 
+def _publish_analysis_event(db_obj, project_id: uuid.UUID, annotation_count: Optional[int] = None):
+    """Push an analysis change to subscribers of its image and project (see the events endpoints)."""
+    event = {
+        "analysis_id": str(db_obj.id),
+        "image_id": str(db_obj.image_id),
+        "project_id": str(project_id),
+        "model_name": db_obj.model_name,
+        "status": db_obj.status,
+        "error_message": db_obj.error_message,
+        # None when the change did not touch annotations
+        "annotation_count": annotation_count,
+    }
+    bus = get_event_bus()
+    bus.publish(image_topic(db_obj.image_id), event)
+    bus.publish(project_topic(project_id), event)
+
+
+def _apply_status_transition(db_obj, new_status: str, error_message: Optional[str] = None, *, allow_direct_finish: bool = False):
+    """
+    Move a (locked) analysis to new_status and stamp its timestamps, without
+    committing. allow_direct_finish also permits queued -> completed|failed,
+    as finalize does for fast analyses. Raises 409 for any other transition
+    outside VALID_STATUS_TRANSITIONS.
+    """
+    old_status = (db_obj.status or "").lower()
+    allowed = set(VALID_STATUS_TRANSITIONS.get(old_status, set()))
+    if allow_direct_finish and old_status == "queued":
+        allowed |= {"completed", "failed"}
+    if new_status not in allowed:
+        raise HTTPException(status_code=409, detail=f"Illegal transition {old_status}->{new_status}")
+
+    now = datetime.now(timezone.utc)
+    if not db_obj.started_at and (new_status == "processing" or (old_status == "queued" and new_status != "canceled")):
+        # Finishing straight from queued counts as having started now
+        db_obj.started_at = now
+    if new_status in {"completed", "failed", "canceled"}:
+        db_obj.completed_at = now
+        # A finished job no longer holds a queue lease
+        db_obj.lease_expires_at = None
+    db_obj.status = new_status
+    if error_message:
+        db_obj.error_message = error_message
+
+
 @router.patch("/analyses/{analysis_id}/status", response_model=schemas.MLAnalysis)
 async def update_ml_analysis_status(
     analysis_id: uuid.UUID,
@@ -358,7 +666,7 @@ async def update_ml_analysis_status(
     if not db_obj:
         raise HTTPException(status_code=404, detail="Analysis not found")
     # Access via image
-    await get_image_or_403(db_obj.image_id, db, current_user)
+    db_image = await get_image_or_403(db_obj.image_id, db, current_user)
 
     new_status = payload.status.lower()
     old_status = (db_obj.status or "").lower()
@@ -368,34 +676,90 @@ async def update_ml_analysis_status(
     if old_status == new_status:
         # No-op: status hasn't changed, but keep lock until commit
         await db.commit()  # Release lock
-        return await get_ml_analysis(analysis_id, db, current_user)
-    allowed = VALID_STATUS_TRANSITIONS.get(old_status, set())
-    if new_status not in allowed:
-        raise HTTPException(status_code=409, detail=f"Illegal transition {old_status}->{new_status}")
-
-    # Update timestamps
-    if new_status == "processing" and not db_obj.started_at:
-        db_obj.started_at = datetime.now(timezone.utc)
-    if new_status in {"completed", "failed", "canceled"}:
-        db_obj.completed_at = datetime.now(timezone.utc)
-    db_obj.status = new_status
-    if payload.error_message:
-        db_obj.error_message = payload.error_message
+        return to_ml_analysis_summary_schema(db_obj)
+    _apply_status_transition(db_obj, new_status, payload.error_message)
     await db.commit()
     await db.refresh(db_obj)
+    _publish_analysis_event(db_obj, db_image.project_id)
     logger.info("ML_ANALYSIS_STATUS", extra={
         "analysis_id": str(db_obj.id),
         "from": sanitized_old_status,
         "to": sanitized_new_status,
         "user": sanitize_for_log(str(current_user.id))
     })
-    return await get_ml_analysis(analysis_id, db, current_user)
+    return to_ml_analysis_summary_schema(db_obj)
+
+
+# Bulk moves allowed by analyses:bulk-status: cancel, or requeue a stuck or failed job
+BULK_STATUS_TRANSITIONS = {
+    "queued": {"canceled"},
+    "processing": {"queued", "canceled"},
+    "failed": {"queued"},
+}
+
+
+class BulkStatusPayload(schemas.BaseModel):  # type: ignore[attr-defined]
+    status_from: str = "queued"
+    status_to: str = "canceled"
+    model_name: Optional[str] = None
+    # Only analyses not changed for this long
+    older_than_seconds: Optional[int] = Field(None, ge=0)
+    limit: int = Field(100, ge=1)
+    dry_run: bool = False
+
+
+@router.post("/projects/{project_id}/analyses:bulk-status", response_model=schemas.MLAnalysisBulkStatusResult)
+async def bulk_update_analysis_status(
+    project_id: uuid.UUID,
+    payload: BulkStatusPayload,
+    db: AsyncSession = Depends(get_db),
+    current_user: schemas.User = Depends(get_current_user),
+):
+    """
+    Cancel or requeue a project's analyses in one request, oldest first, at
+    most ML_BULK_STATUS_MAX per call. Replaces listing every image's analyses
+    and patching them one by one.
+    """
+    if not settings.ML_ANALYSIS_ENABLED:
+        raise HTTPException(status_code=404, detail="ML analysis feature disabled")
+    status_from = payload.status_from.lower()
+    status_to = payload.status_to.lower()
+    if status_to not in BULK_STATUS_TRANSITIONS.get(status_from, set()):
+        raise HTTPException(status_code=409, detail=f"Illegal bulk transition {status_from}->{status_to}")
+    await get_project_or_403(project_id, db, current_user)
+    older_than = None
+    if payload.older_than_seconds is not None:
+        older_than = datetime.now(timezone.utc) - timedelta(seconds=payload.older_than_seconds)
+    analyses = await crud.bulk_update_ml_analysis_status(
+        db, project_id,
+        status_from=status_from, status_to=status_to, model_name=payload.model_name,
+        older_than=older_than, limit=min(payload.limit, settings.ML_BULK_STATUS_MAX),
+        dry_run=payload.dry_run,
+    )
+    if not payload.dry_run:
+        for a in analyses:
+            _publish_analysis_event(a, project_id)
+        logger.info("ML_ANALYSIS_BULK_STATUS", extra={
+            "project_id": str(project_id),
+            "from": sanitize_for_log(status_from),
+            "to": sanitize_for_log(status_to),
+            "count": len(analyses),
+            "user": sanitize_for_log(str(current_user.id)),
+        })
+    return schemas.MLAnalysisBulkStatusResult(
+        status_from=status_from,
+        status_to=status_to,
+        dry_run=payload.dry_run,
+        matched=len(analyses),
+        analyses=[to_ml_analysis_summary_schema(a) for a in analyses],
+    )
 
 
 # ---------------- Phase 2 Callback / Pipeline Endpoints ---------------- #
 class BulkAnnotationsPayload(schemas.BaseModel):  # type: ignore[attr-defined]
     annotations: List[schemas.MLAnnotationCreate]
-    mode: str = "append"  # append|replace (replace not yet differentiating; future extension)
+    # append adds to the analysis' annotations; replace swaps the whole set atomically
+    mode: Literal["append", "replace"] = "append"
 
 
 def _verify_pipeline_hmac(request: Request, body_bytes: bytes):
@@ -437,46 +801,166 @@ def _verify_pipeline_hmac(request: Request, body_bytes: bytes):
         raise HTTPException(status_code=401, detail="Invalid HMAC signature")
 
 
-@router.post("/analyses/{analysis_id}/annotations:bulk", response_model=schemas.MLAnnotationList)
+@router.post("/analyses/{analysis_id}/annotations:bulk", response_model=schemas.MLAnnotationBulkResult)
 async def bulk_upload_annotations(
     analysis_id: uuid.UUID,
     payload: BulkAnnotationsPayload,
     request: Request,
+    include_annotations: bool = Query(False),
     db: AsyncSession = Depends(get_db),
     current_user: schemas.User = Depends(get_current_user),
     body_bytes: bytes = Depends(get_raw_body),
 ):
+    """
+    Store a batch of annotations for an analysis.
+    Returns the new ids and counts; the annotations themselves are echoed back
+    only with include_annotations=true, and never the ones stored earlier.
+    """
     if not settings.ML_ANALYSIS_ENABLED:
         raise HTTPException(status_code=404, detail="ML analysis feature disabled")
-    db_obj = await crud.get_ml_analysis(db, analysis_id)
+    # Row lock (without loading annotations) serialises uploads to one analysis,
+    # so a replace never interleaves with a concurrent append
+    db_obj = await crud.get_ml_analysis_for_update(db, analysis_id)
     if not db_obj:
         raise HTTPException(status_code=404, detail="Analysis not found")
     # Access check (user must have image access)
-    await get_image_or_403(db_obj.image_id, db, current_user)
+    db_image = await get_image_or_403(db_obj.image_id, db, current_user)
     if len(payload.annotations) > settings.ML_MAX_BULK_ANNOTATIONS:
         raise HTTPException(status_code=400, detail="Too many annotations in one request")
     # HMAC verify using the raw original request body
     _verify_pipeline_hmac(request, body_bytes)
-    # If mode == replace, we could delete existing first (future). For now always append.
-    inserted = await crud.bulk_insert_ml_annotations(db, analysis_id, payload.annotations)
-    anns = await crud.list_ml_annotations(db, analysis_id)
-    total_count = await crud.count_ml_annotations(db, analysis_id)
-    items = [
-        schemas.MLAnnotation(
-            id=a.id,
-            analysis_id=a.analysis_id,
-            annotation_type=a.annotation_type,
-            class_name=a.class_name,
-            confidence=float(a.confidence) if a.confidence is not None else None,
-            data=a.data,
-            storage_path=a.storage_path,
-            ordering=a.ordering,
-            created_at=a.created_at,
-        ) for a in anns
-    ]
+    replace = payload.mode == "replace"
+    ids, deleted = await crud.bulk_insert_ml_annotations(db, analysis_id, payload.annotations, replace=replace)
+    total_count = len(ids) if replace else await crud.count_ml_annotations(db, analysis_id)
+    _publish_analysis_event(db_obj, db_image.project_id, annotation_count=total_count)
+    items = None
+    if include_annotations:
+        items = [
+            schemas.MLAnnotation(
+                id=a.id,
+                analysis_id=a.analysis_id,
+                annotation_type=a.annotation_type,
+                class_name=a.class_name,
+                confidence=float(a.confidence) if a.confidence is not None else None,
+                data=a.data,
+                storage_path=a.storage_path,
+                ordering=a.ordering,
+                created_at=a.created_at,
+            ) for a in await crud.get_ml_annotations_by_ids(db, ids)
+        ]
     safe_analysis_id = sanitize_for_log(str(analysis_id))
-    logger.info("ML_BULK_ANNOTATIONS", extra={"analysis_id": safe_analysis_id, "count": inserted})
-    return schemas.MLAnnotationList(annotations=items, total=total_count)
+    logger.info("ML_BULK_ANNOTATIONS", extra={
+        "analysis_id": safe_analysis_id,
+        "mode": payload.mode,
+        "count": len(ids),
+        "deleted": deleted,
+    })
+    return schemas.MLAnnotationBulkResult(
+        analysis_id=analysis_id,
+        mode=payload.mode,
+        inserted=len(ids),
+        deleted=deleted,
+        total=total_count,
+        ids=ids,
+        annotations=items,
+    )
+
+
+async def _iter_ndjson_lines(request: Request, body_mac: Optional[StreamedBodyMAC], max_line_bytes: int):
+    """Yield the lines of a streamed body, feeding every chunk to body_mac on the way."""
+    pending = b""
+    async for chunk in request.stream():
+        if body_mac is not None:
+            body_mac.update(chunk, more_body=True)
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines + [pending]:
+            if len(line) > max_line_bytes:
+                raise HTTPException(status_code=413, detail=f"NDJSON line longer than {max_line_bytes} bytes")
+        for line in lines:
+            yield line
+    if body_mac is not None:
+        body_mac.update(b"", more_body=False)
+    if pending:
+        yield pending
+
+
+@router.post("/analyses/{analysis_id}/annotations:ndjson", response_model=schemas.MLAnnotationBulkResult)
+async def stream_upload_annotations(
+    analysis_id: uuid.UUID,
+    request: Request,
+    mode: Literal["append", "replace"] = Query("append"),
+    db: AsyncSession = Depends(get_db),
+    current_user: schemas.User = Depends(get_current_user),
+):
+    """
+    Store annotations sent as application/x-ndjson, one annotation object per line.
+
+    Lines are validated and inserted in batches of ML_NDJSON_BATCH_SIZE as they
+    arrive, so memory does not grow with the upload and ML_MAX_BULK_ANNOTATIONS
+    does not apply. The timestamp is checked before the body is read, so a long
+    upload is not rejected for outlasting the skew window; the HMAC is computed
+    over the stream and compared at the end, and nothing is committed unless it
+    matches.
+    """
+    if not settings.ML_ANALYSIS_ENABLED:
+        raise HTTPException(status_code=404, detail="ML analysis feature disabled")
+    if "ndjson" not in request.headers.get("content-type", "").lower():
+        raise HTTPException(status_code=415, detail="Content-Type must be application/x-ndjson")
+    body_mac = None
+    if settings.ML_PIPELINE_REQUIRE_HMAC:
+        if not settings.ML_CALLBACK_HMAC_SECRET:
+            raise HTTPException(status_code=500, detail="HMAC secret not configured")
+        timestamp = request.headers.get("X-ML-Timestamp", "0")
+        if not verify_hmac_timestamp(timestamp, settings.ML_HMAC_TIMESTAMP_SKEW_SECONDS):
+            raise HTTPException(status_code=401, detail="Invalid HMAC signature")
+        body_mac = StreamedBodyMAC(settings.ML_CALLBACK_HMAC_SECRET, timestamp)
+    # Row lock serialises uploads to one analysis for the whole stream
+    db_obj = await crud.get_ml_analysis_for_update(db, analysis_id)
+    if not db_obj:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+    db_image = await get_image_or_403(db_obj.image_id, db, current_user)
+
+    deleted = await crud.delete_ml_annotations(db, analysis_id) if mode == "replace" else 0
+    inserted = 0
+    batch: List[schemas.MLAnnotationCreate] = []
+    line_number = 0
+    try:
+        async for line in _iter_ndjson_lines(request, body_mac, settings.ML_NDJSON_MAX_LINE_BYTES):
+            line_number += 1
+            if not line.strip():
+                continue
+            try:
+                batch.append(schemas.MLAnnotationCreate.model_validate_json(line))
+            except ValueError as e:
+                raise HTTPException(status_code=422, detail=f"Invalid annotation on line {line_number}: {e}")
+            if len(batch) >= settings.ML_NDJSON_BATCH_SIZE:
+                inserted += len(await crud.insert_ml_annotation_rows(db, analysis_id, batch))
+                batch = []
+        inserted += len(await crud.insert_ml_annotation_rows(db, analysis_id, batch))
+        if body_mac is not None and not hmac_digest_matches(body_mac.hexdigest, request.headers.get("X-ML-Signature", "")):
+            raise HTTPException(status_code=401, detail="Invalid HMAC signature")
+    except HTTPException:
+        await db.rollback()
+        raise
+    await db.commit()
+
+    total_count = inserted if mode == "replace" else await crud.count_ml_annotations(db, analysis_id)
+    _publish_analysis_event(db_obj, db_image.project_id, annotation_count=total_count)
+    logger.info("ML_BULK_ANNOTATIONS", extra={
+        "analysis_id": sanitize_for_log(str(analysis_id)),
+        "mode": mode,
+        "count": inserted,
+        "deleted": deleted,
+        "streamed": True,
+    })
+    return schemas.MLAnnotationBulkResult(
+        analysis_id=analysis_id,
+        mode=mode,
+        inserted=inserted,
+        deleted=deleted,
+        total=total_count,
+    )
 
 
 class PresignRequest(schemas.BaseModel):  # type: ignore[attr-defined]
@@ -496,27 +980,9 @@ class PresignResponse(schemas.BaseModel):  # type: ignore[attr-defined]
     storage_path: str
 
 
-@router.post("/analyses/{analysis_id}/artifacts/presign", response_model=PresignResponse)
-async def presign_artifact_upload(
-    analysis_id: uuid.UUID,
-    req: PresignRequest,
-    request: Request,
-    db: AsyncSession = Depends(get_db),
-    current_user: schemas.User = Depends(get_current_user),
-    body_bytes: bytes = Depends(get_raw_body),
-):
-    if not settings.ML_ANALYSIS_ENABLED:
-        raise HTTPException(status_code=404, detail="ML analysis feature disabled")
-    db_obj = await crud.get_ml_analysis(db, analysis_id)
-    if not db_obj:
-        raise HTTPException(status_code=404, detail="Analysis not found")
-    await get_image_or_403(db_obj.image_id, db, current_user)
-    # Use raw body for HMAC verification
-    _verify_pipeline_hmac(request, body_bytes)
-
-    # Generate real presigned upload URL
+def _presign_artifact(analysis_id: uuid.UUID, req: PresignRequest) -> PresignResponse:
+    """Presigned PUT URL for one artifact of an analysis (signed locally, no storage round-trip)."""
     from utils.boto3_client import get_presigned_upload_url, boto3_client
-    from datetime import timedelta
     import os
 
     artifact_name = req.filename or f"{req.artifact_type}.bin"
@@ -560,6 +1026,26 @@ async def presign_artifact_upload(
     return PresignResponse(upload_url=upload_url, storage_path=storage_path)
 
 
+@router.post("/analyses/{analysis_id}/artifacts/presign", response_model=PresignResponse)
+async def presign_artifact_upload(
+    analysis_id: uuid.UUID,
+    req: PresignRequest,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: schemas.User = Depends(get_current_user),
+    body_bytes: bytes = Depends(get_raw_body),
+):
+    if not settings.ML_ANALYSIS_ENABLED:
+        raise HTTPException(status_code=404, detail="ML analysis feature disabled")
+    db_obj = await crud.get_ml_analysis(db, analysis_id, with_annotations=False)
+    if not db_obj:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+    await get_image_or_403(db_obj.image_id, db, current_user)
+    # Use raw body for HMAC verification
+    _verify_pipeline_hmac(request, body_bytes)
+    return _presign_artifact(analysis_id, req)
+
+
 class FinalizeRequest(schemas.BaseModel):  # type: ignore[attr-defined]
     status: Optional[str] = None  # typically completed
     error_message: Optional[str] = None
@@ -575,37 +1061,203 @@ async def finalize_analysis(
 ):
     if not settings.ML_ANALYSIS_ENABLED:
         raise HTTPException(status_code=404, detail="ML analysis feature disabled")
-    db_obj = await crud.get_ml_analysis(db, analysis_id)
+    # Row lock, as for status updates, so concurrent callbacks serialise
+    db_obj = await crud.get_ml_analysis_for_update(db, analysis_id)
     if not db_obj:
         raise HTTPException(status_code=404, detail="Analysis not found")
-    await get_image_or_403(db_obj.image_id, db, current_user)
+    db_image = await get_image_or_403(db_obj.image_id, db, current_user)
     # Use raw body for HMAC verification
     _verify_pipeline_hmac(request, body_bytes)
-    if req.status:
-        # Special case: allow pipeline to finalize directly from queued -> completed|failed without requiring an explicit
-        # intermediate PATCH to "processing". This is convenient for fast/atomic analyses and matches test expectations.
-        normalized_new = req.status.lower()
-        if db_obj.status == "queued" and normalized_new in {"completed", "failed"}:
-            now = datetime.now(timezone.utc)
-            if not db_obj.started_at:
-                db_obj.started_at = now  # treat as if processing started just now
-            db_obj.completed_at = now
-            db_obj.status = normalized_new
-            if req.error_message:
-                db_obj.error_message = req.error_message
-            await db.commit()
-            await db.refresh(db_obj)
-            sanitized_user_id = sanitize_for_log(str(current_user.id))
-            logger.info("ML_ANALYSIS_STATUS", extra={
-                "analysis_id": str(db_obj.id),
-                "from": "queued",
-                "to": sanitize_for_log(normalized_new),
-                "user": sanitized_user_id
-            })
-            return db_obj  # Fast path return
-        # Otherwise reuse the stricter status update logic (which enforces valid transitions)
-        return await update_ml_analysis_status(analysis_id, StatusUpdatePayload(status=req.status, error_message=req.error_message), db, current_user)  # type: ignore
-    return await get_ml_analysis(analysis_id, db, current_user)
+    old_status = (db_obj.status or "").lower()
+    new_status = req.status.lower() if req.status else None
+    if not new_status or new_status == old_status:
+        await db.commit()  # Release lock
+        return to_ml_analysis_summary_schema(db_obj)
+    # Fast analyses may finish straight from queued without a PATCH to processing
+    _apply_status_transition(db_obj, new_status, req.error_message, allow_direct_finish=True)
+    await db.commit()
+    await db.refresh(db_obj)
+    _publish_analysis_event(db_obj, db_image.project_id)
+    logger.info("ML_ANALYSIS_STATUS", extra={
+        "analysis_id": str(db_obj.id),
+        "from": sanitize_for_log(old_status),
+        "to": sanitize_for_log(new_status),
+        "user": sanitize_for_log(str(current_user.id))
+    })
+    return to_ml_analysis_summary_schema(db_obj)
+
+
+class ResultsPayload(schemas.BaseModel):  # type: ignore[attr-defined]
+    annotations: List[schemas.MLAnnotationCreate] = Field(default_factory=list)
+    # Applies to annotations as in annotations:bulk
+    mode: Literal["append", "replace"] = "append"
+    # Upload URLs to issue, returned in the same order
+    artifacts: List[PresignRequest] = Field(default_factory=list)
+    # Optional status change applied in the same transaction, e.g. completed
+    status: Optional[str] = None
+    error_message: Optional[str] = None
+
+
+class ResultsAnnotationCounts(schemas.BaseModel):  # type: ignore[attr-defined]
+    inserted: int
+    deleted: int = 0
+    total: int
+    ids: List[uuid.UUID]
+
+
+class ResultsResponse(schemas.BaseModel):  # type: ignore[attr-defined]
+    analysis: schemas.MLAnalysis
+    annotations: ResultsAnnotationCounts
+    artifacts: List[PresignResponse]
+
+
+@router.post("/analyses/{analysis_id}/results", response_model=ResultsResponse)
+async def submit_analysis_results(
+    analysis_id: uuid.UUID,
+    payload: ResultsPayload,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: schemas.User = Depends(get_current_user),
+    body_bytes: bytes = Depends(get_raw_body),
+):
+    """
+    Everything a pipeline sends when it finishes an image, in one request
+    with one HMAC check: annotations, artifact upload URLs and an optional
+    status change (queued may go straight to completed|failed, as with
+    finalize). Annotations and status are committed together, so nothing is
+    stored if any part is rejected.
+    """
+    if not settings.ML_ANALYSIS_ENABLED:
+        raise HTTPException(status_code=404, detail="ML analysis feature disabled")
+    db_obj = await crud.get_ml_analysis_for_update(db, analysis_id)
+    if not db_obj:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+    db_image = await get_image_or_403(db_obj.image_id, db, current_user)
+    if len(payload.annotations) > settings.ML_MAX_BULK_ANNOTATIONS:
+        raise HTTPException(status_code=400, detail="Too many annotations in one request")
+    if len(payload.artifacts) > settings.ML_RESULTS_MAX_ARTIFACTS:
+        raise HTTPException(status_code=400, detail="Too many artifacts in one request")
+    _verify_pipeline_hmac(request, body_bytes)
+
+    artifacts = [_presign_artifact(analysis_id, req) for req in payload.artifacts]
+    if len({a.storage_path for a in artifacts}) != len(artifacts):
+        raise HTTPException(status_code=400, detail="Artifact filenames must be unique")
+    old_status = (db_obj.status or "").lower()
+    new_status = payload.status.lower() if payload.status else None
+    if new_status and new_status != old_status:
+        _apply_status_transition(db_obj, new_status, payload.error_message, allow_direct_finish=True)
+
+    replace = payload.mode == "replace"
+    deleted = await crud.delete_ml_annotations(db, analysis_id) if replace else 0
+    ids = await crud.insert_ml_annotation_rows(db, analysis_id, payload.annotations)
+    await db.commit()
+    await db.refresh(db_obj)
+    total_count = len(ids) if replace else await crud.count_ml_annotations(db, analysis_id)
+    _publish_analysis_event(db_obj, db_image.project_id, annotation_count=total_count)
+    logger.info("ML_ANALYSIS_RESULTS", extra={
+        "analysis_id": sanitize_for_log(str(analysis_id)),
+        "mode": payload.mode,
+        "annotations": len(ids),
+        "artifacts": len(artifacts),
+        "from": sanitize_for_log(old_status),
+        "to": sanitize_for_log(new_status or old_status),
+        "user": sanitize_for_log(str(current_user.id)),
+    })
+    return ResultsResponse(
+        analysis=to_ml_analysis_summary_schema(db_obj),
+        annotations=ResultsAnnotationCounts(inserted=len(ids), deleted=deleted, total=total_count, ids=ids),
+        artifacts=artifacts,
+    )
+
+
+@router.post("/ml/jobs:claim", response_model=schemas.MLJobClaim)
+async def claim_ml_jobs(
+    request: Request,
+    model: str = Query(..., min_length=1, max_length=255),
+    n: int = Query(1, ge=1),
+    worker: Optional[str] = Query(None, min_length=1, max_length=255),
+    lease_seconds: Optional[int] = Query(None, ge=10, le=86400),
+    db: AsyncSession = Depends(get_db),
+    current_user: schemas.User = Depends(get_current_user),
+    body_bytes: bytes = Depends(get_raw_body),
+):
+    """
+    Claim up to n queued analyses of a model for this worker.
+
+    Jobs are handed out highest priority first and move to "processing" under
+    a lease. Workers extend the lease via /ml/jobs/{analysis_id}/heartbeat;
+    jobs whose lease lapses go back to the queue on the next claim.
+    """
+    if not settings.ML_ANALYSIS_ENABLED:
+        raise HTTPException(status_code=404, detail="ML analysis feature disabled")
+    _verify_pipeline_hmac(request, body_bytes)
+    if model not in settings.ML_ALLOWED_MODEL_SET:
+        raise HTTPException(status_code=400, detail="Model not allowed")
+
+    from utils.boto3_client import get_presigned_download_url
+
+    worker = worker or str(uuid.uuid4())
+    lease_seconds = lease_seconds or settings.ML_JOB_LEASE_SECONDS
+    analyses = await crud.claim_ml_analyses(
+        db,
+        model_name=model,
+        worker=worker,
+        group_ids=get_groups_for_user(current_user.email),
+        limit=min(n, settings.ML_JOB_MAX_CLAIM),
+        lease_seconds=lease_seconds,
+        max_attempts=settings.ML_JOB_MAX_ATTEMPTS,
+    )
+    expires_delta = timedelta(seconds=settings.ML_PRESIGNED_URL_EXPIRY_SECONDS)
+    jobs = [
+        schemas.MLJob(
+            analysis=to_ml_analysis_summary_schema(a),
+            project_id=a.image.project_id,
+            filename=a.image.filename,
+            content_type=a.image.content_type,
+            image_url=get_presigned_download_url(
+                bucket_name=settings.S3_BUCKET,
+                object_name=a.image.object_storage_key,
+                expires_delta=expires_delta,
+            ),
+            lease_expires_at=a.lease_expires_at,
+        )
+        for a in analyses
+    ]
+    for a in analyses:
+        _publish_analysis_event(a, a.image.project_id)
+    logger.info("ML_JOBS_CLAIMED", extra={
+        "model": sanitize_for_log(model),
+        "worker": sanitize_for_log(worker),
+        "count": len(jobs),
+        "user": sanitize_for_log(str(current_user.id))
+    })
+    return schemas.MLJobClaim(worker=worker, lease_seconds=lease_seconds, jobs=jobs)
+
+
+@router.post("/ml/jobs/{analysis_id}/heartbeat", response_model=schemas.MLJobLease)
+async def heartbeat_ml_job(
+    analysis_id: uuid.UUID,
+    request: Request,
+    worker: str = Query(..., min_length=1, max_length=255),
+    lease_seconds: Optional[int] = Query(None, ge=10, le=86400),
+    db: AsyncSession = Depends(get_db),
+    current_user: schemas.User = Depends(get_current_user),
+    body_bytes: bytes = Depends(get_raw_body),
+):
+    """Extend the lease on a claimed job. 409 means the lease was lost and the job may be running elsewhere."""
+    if not settings.ML_ANALYSIS_ENABLED:
+        raise HTTPException(status_code=404, detail="ML analysis feature disabled")
+    db_obj = await crud.get_ml_analysis(db, analysis_id, with_annotations=False)
+    if not db_obj:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+    await get_image_or_403(db_obj.image_id, db, current_user)
+    _verify_pipeline_hmac(request, body_bytes)
+    expires_at = await crud.renew_ml_lease(
+        db, analysis_id, worker, lease_seconds or settings.ML_JOB_LEASE_SECONDS
+    )
+    if expires_at is None:
+        raise HTTPException(status_code=409, detail="Lease not held by this worker")
+    return schemas.MLJobLease(analysis_id=analysis_id, worker=worker, lease_expires_at=expires_at)
 
 
 @router.get("/analyses/{analysis_id}/export")
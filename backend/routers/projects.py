@@ -1,12 +1,16 @@
 import uuid
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Response, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 import utils.crud as crud
 from core import schemas
 from core.database import get_db
 from core.group_auth_helper import is_user_in_group
-from utils.dependencies import get_current_user
+from utils.dependencies import get_current_user, get_project_or_403
+from utils.cache_manager import get_cache
+from utils.file_security import get_content_disposition_header
+from utils.project_report import REPORT_FORMATS, stream_report, cache_while_streaming
 from aiocache import Cache
 
 router = APIRouter(
@@ -51,25 +55,27 @@ async def create_new_project(
 @router.get("/", response_model=List[schemas.Project])
 #@cached(ttl=3600, key_builder=lambda *args, **kwargs: f"projects:user:{kwargs['current_user'].email}:skip:{kwargs.get('skip', 0)}:limit:{kwargs.get('limit', 100)}")
 async def read_projects(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     db: AsyncSession = Depends(get_db),
     current_user: schemas.User = Depends(get_current_user),
 ):
     """
-    Get all projects that the current user has access to.
-    This uses the new approach of iterating through projects and checking if the user
-    is a member of each project's group.
+    Get a page of projects that the current user has access to.
+    Projects are filtered by the user's groups in SQL; the total number of
+    accessible projects is returned in the X-Total-Count header.
     """
-    from utils.dependencies import get_accessible_projects_for_user
+    from utils.dependencies import get_accessible_projects_for_user, count_accessible_projects_for_user
     
-    # Get all projects the user has access to
+    # Get the page of projects the user has access to
     projects = await get_accessible_projects_for_user(
         db=db, 
         user=current_user, 
         skip=skip, 
         limit=limit
     )
+    response.headers["X-Total-Count"] = str(await count_accessible_projects_for_user(db=db, user=current_user))
     return projects
 
 @router.get("/{project_id}", response_model=schemas.Project)
@@ -96,3 +102,42 @@ async def read_project(
             detail=f"User '{current_user.email}' does not have access to project '{project_id}' (group '{db_project.meta_group_id}'). Please contact an administrator if you need access to this project.",
         )
     return db_project
+
+@router.get("/{project_id}/stats", response_model=schemas.ProjectStats)
+async def read_project_stats(
+    project_id: uuid.UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user: schemas.User = Depends(get_current_user),
+):
+    """
+    Get image, byte, comment and classification counts for a project.
+    Served from the incrementally maintained project_stats table, so the cost
+    does not grow with the number of images.
+    """
+    await get_project_or_403(project_id, db, current_user)
+    return await crud.get_project_stats(db=db, project_id=project_id)
+
+@router.get("/{project_id}/report")
+async def export_project_report(
+    project_id: uuid.UUID,
+    format: str = Query("json", pattern="^(json|csv)$"),
+    db: AsyncSession = Depends(get_db),
+    current_user: schemas.User = Depends(get_current_user),
+):
+    """
+    Export every image of a project with its comments and classifications.
+    Streams JSON or CSV built from a few batched queries; a completed report is
+    cached until anything in the project changes.
+    """
+    db_project = await get_project_or_403(project_id, db, current_user)
+
+    media_type = REPORT_FORMATS[format]
+    headers = {"Content-Disposition": get_content_disposition_header(f"project-{project_id}-report.{format}", "attachment")}
+    cache = get_cache()
+    pinned_key = cache.pin(f"project_report:{project_id}:{format}")
+    cached_report = cache.get_pinned(pinned_key)
+    if cached_report is not None:
+        return Response(content=cached_report, media_type=media_type, headers=headers)
+
+    chunks = cache_while_streaming(stream_report(db, db_project, format), cache, pinned_key, expire=30*60)
+    return StreamingResponse(chunks, media_type=media_type, headers=headers)
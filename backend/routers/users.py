@@ -6,7 +6,7 @@ import utils.crud as crud
 from core import schemas
 from core.database import get_db
 from core.group_auth_helper import is_user_in_group
-from utils.dependencies import get_current_user
+from utils.dependencies import get_current_user, get_user_accessible_groups
 
 router = APIRouter(
     tags=["Users"],
@@ -35,18 +35,7 @@ async def read_current_user_groups(
     This includes groups granted through project memberships.
     Returns a list of group identifiers.
     """
-    # Get all projects from the database
-    all_projects = await crud.get_all_projects(db)
-    
-    # Initialize empty list for accessible groups
-    user_groups = []
-    
-    # For each project, check if the user is a member of the project's group
-    for project in all_projects:
-        if is_user_in_group(current_user.email, project.meta_group_id) and project.meta_group_id not in user_groups:
-            user_groups.append(project.meta_group_id)
-    
-    return user_groups
+    return await get_user_accessible_groups(db, current_user)
 
 @router.post("/", response_model=schemas.User, status_code=status.HTTP_201_CREATED)
 async def create_user(
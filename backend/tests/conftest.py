@@ -1,6 +1,7 @@
 import pytest
 import pytest_asyncio
 import asyncio
+import json
 import os
 from fastapi.testclient import TestClient
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
@@ -66,7 +67,8 @@ def client():
     # Important: Patch where they are used (routers.images.*), not the module defining them
     from unittest.mock import patch
     with patch('routers.images.upload_file_to_s3', return_value=True), \
-         patch('routers.images.get_presigned_download_url', return_value='http://example/presigned'):
+         patch('routers.images.get_presigned_download_url', return_value='http://example/presigned'), \
+         patch('routers.images.AsyncSessionLocal', TestingSessionLocal):
         with TestClient(app) as c:
             yield c
     loop.run_until_complete(teardown_db())
@@ -121,3 +123,53 @@ def auth_headers():
         "X-User-Id": "test@example.com",
         "X-User-Groups": '["admin-group", "data-scientists"]'
     }
+
+@pytest.fixture
+def no_hmac(monkeypatch):
+    """Accept unsigned ML pipeline callbacks (annotations, finalize, results, ...)"""
+    monkeypatch.setattr("routers.ml_analyses.settings.ML_PIPELINE_REQUIRE_HMAC", False)
+
+@pytest.fixture
+def ml_project(client):
+    """Project id for ML analysis tests"""
+    r = client.post("/api/projects/", json={"name": "ML", "description": None, "meta_group_id": "g"})
+    assert r.status_code == 201, r.text
+    return r.json()["id"]
+
+@pytest.fixture
+def make_image(client, ml_project):
+    """Upload a placeholder image, to ml_project unless project_id is given, and return its id"""
+    def make(name="image.png", metadata=None, project_id=None):
+        r = client.post(
+            f"/api/projects/{project_id or ml_project}/images",
+            files={"file": (name, b"\x89PNG\r\n", "image/png")},
+            data={"metadata": json.dumps(metadata or {})},
+        )
+        assert r.status_code == 201, r.text
+        return r.json()["id"]
+    return make
+
+@pytest.fixture
+def ml_image(make_image):
+    """Image id in ml_project"""
+    return make_image()
+
+@pytest.fixture
+def make_analysis(client):
+    """Queue an analysis and return its id.
+
+    Posting annotations or finalizing with a status goes through the pipeline
+    callbacks, so tests passing either also need no_hmac.
+    """
+    def make(image_id, model_name="yolo_v8", model_version="1", annotations=None, status=None):
+        r = client.post(f"/api/images/{image_id}/analyses", json={"image_id": image_id, "model_name": model_name, "model_version": model_version})
+        assert r.status_code == 201, r.text
+        analysis_id = r.json()["id"]
+        if annotations:
+            r = client.post(f"/api/analyses/{analysis_id}/annotations:bulk", json={"annotations": annotations})
+            assert r.status_code == 200, r.text
+        if status:
+            r = client.post(f"/api/analyses/{analysis_id}/finalize", json={"status": status})
+            assert r.status_code == 200, r.text
+        return analysis_id
+    return make
@@ -0,0 +1,81 @@
+import pytest
+
+from utils.annotation_geometry import bbox_columns
+
+
+def test_bbox_columns_shapes():
+    xywh = bbox_columns({"bbox": [100, 150, 50, 100], "format": "xywh", "image_width": 1000, "image_height": 500})
+    assert (xywh["bbox_x"], xywh["bbox_y"], xywh["bbox_w"], xywh["bbox_h"]) == (100, 150, 50, 100)
+    assert (xywh["norm_x_min"], xywh["norm_y_min"], xywh["norm_x_max"], xywh["norm_y_max"]) == (0.1, 0.3, 0.15, 0.5)
+
+    xyxy = bbox_columns({"bbox": [100, 150, 150, 250], "format": "xyxy"})
+    assert (xyxy["bbox_w"], xyxy["bbox_h"]) == (50, 100)
+    # No image size: pixel box only
+    assert xyxy["norm_x_min"] is None and xyxy["image_width"] is None
+
+    corners = bbox_columns({"x_min": 10, "y_min": 20, "x_max": 30, "y_max": 60, "image_width": 100, "image_height": 100})
+    assert (corners["bbox_x"], corners["bbox_h"], corners["norm_y_max"]) == (10, 40, 0.6)
+
+    normalized = bbox_columns({"bbox": [0.5, 0.5, 0.25, 0.25], "format": "xywhn"})
+    assert (normalized["norm_x_max"], normalized["bbox_x"]) == (0.75, None)
+
+
+def test_bbox_columns_ignores_other_payloads():
+    for data in ({"label": "cat"}, {"bbox": [1, 2, 3]}, {"bbox": ["a", 1, 2, 3]}, [1, 2, 3, 4]):
+        assert all(v is None for v in bbox_columns(data).values())
+
+
+@pytest.fixture
+def add_image(make_image, make_analysis):
+    def add(name, annotations):
+        image_id = make_image(name)
+        make_analysis(image_id, annotations=annotations)
+        return image_id
+
+    return add
+
+
+def _box(label, confidence, x_min, y_min, x_max, y_max):
+    return {
+        "annotation_type": "bounding_box",
+        "class_name": label,
+        "confidence": confidence,
+        "data": {"x_min": x_min, "y_min": y_min, "x_max": x_max, "y_max": y_max, "image_width": 100, "image_height": 100},
+    }
+
+
+def test_search_ranks_images_by_best_match(client, ml_project, add_image, no_hmac):
+    low = add_image("low.png", [_box("person", 0.85, 0, 0, 10, 10)])
+    high = add_image("high.png", [_box("person", 0.95, 0, 0, 10, 10), _box("person", 0.9, 50, 50, 60, 60)])
+    add_image("weak.png", [_box("person", 0.5, 0, 0, 10, 10)])
+    add_image("dog.png", [_box("dog", 0.99, 0, 0, 10, 10)])
+
+    r = client.get(f"/api/projects/{ml_project}/annotations/search", params={"class_name": "person", "min_confidence": 0.8})
+    assert r.status_code == 200, r.text
+    items = r.json()["items"]
+    assert [i["image_id"] for i in items] == [high, low]
+    assert items[0]["match_count"] == 2 and items[0]["max_confidence"] == 0.95
+    assert r.json()["next_cursor"] is None
+
+
+def test_search_by_region_and_pagination(client, ml_project, add_image, no_hmac):
+    inside = [add_image(f"in{i}.png", [_box("car", 0.5 + i / 10, 40, 40, 60, 60)]) for i in range(3)]
+    add_image("out.png", [_box("car", 0.99, 0, 0, 10, 10)])
+
+    seen, cursor = [], None
+    while True:
+        params = {"region": "0.3,0.3,0.5,0.5", "limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        body = client.get(f"/api/projects/{ml_project}/annotations/search", params=params).json()
+        seen += [i["image_id"] for i in body["items"]]
+        cursor = body["next_cursor"]
+        if not cursor:
+            break
+    assert seen == list(reversed(inside))
+
+
+def test_search_rejects_bad_region_and_cursor(client, ml_project):
+    for region in ("0,0,1", "0.5,0,0.1,1", "0,0,2,1", "a,b,c,d"):
+        assert client.get(f"/api/projects/{ml_project}/annotations/search", params={"region": region}).status_code == 400
+    assert client.get(f"/api/projects/{ml_project}/annotations/search", params={"cursor": "nope"}).status_code == 400
@@ -35,3 +35,52 @@ def test_create_list_deactivate_api_key(client):
     assert r4.status_code == 200
     found = next(k for k in r4.json() if k["id"] == str(key_id))
     assert found["is_active"] is False
+
+
+def test_new_api_key_has_indexed_prefix(client):
+    r = client.post("/api/api-keys", json={"name": "prefixed"}, headers=_auth_headers())
+    assert r.status_code == 201
+    raw_key = r.json()["key"]
+    prefix, secret = raw_key.split(".", 1)
+    assert prefix and secret
+
+    headers = {"Authorization": f"Bearer {raw_key}"}
+    r2 = client.get("/api-key/projects", headers=headers)
+    assert r2.status_code == 200
+
+    # Correct prefix with the wrong secret must not authenticate
+    bad = {"Authorization": f"Bearer {prefix}.not-the-secret"}
+    assert client.get("/api-key/projects", headers=bad).status_code == 401
+
+
+def test_legacy_api_key_without_prefix_still_authenticates(client):
+    import asyncio
+    import secrets
+    from tests.conftest import TestingSessionLocal
+    from core import models, schemas
+    from utils import crud
+    from utils.dependencies import hash_api_key
+
+    legacy_key = secrets.token_urlsafe(32)
+
+    async def _create():
+        async with TestingSessionLocal() as db:
+            user = await crud.create_user(db, schemas.UserCreate(email="legacy@example.com"))
+            await crud.create_api_key(db, schemas.ApiKeyCreate(name="legacy"), user_id=user.id, key_hash=hash_api_key(legacy_key))
+
+    asyncio.get_event_loop().run_until_complete(_create())
+
+    r = client.get("/api-key/projects", headers={"Authorization": f"Bearer {legacy_key}"})
+    assert r.status_code == 200
+
+
+def test_deactivated_api_key_is_evicted_from_cache(client):
+    r = client.post("/api/api-keys", json={"name": "short-lived"}, headers=_auth_headers())
+    body = r.json()
+    headers = {"Authorization": f"Bearer {body['key']}"}
+
+    # First call verifies and caches the key
+    assert client.get("/api-key/projects", headers=headers).status_code == 200
+
+    assert client.delete(f"/api/api-keys/{body['api_key']['id']}").status_code == 204
+    assert client.get("/api-key/projects", headers=headers).status_code == 401
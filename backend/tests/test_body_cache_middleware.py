@@ -0,0 +1,79 @@
+"""
+Tests that BodyCacheMiddleware only buffers HMAC routes and streams the rest.
+"""
+import hashlib
+import hmac
+import time
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from middleware.body_cache import BodyCacheMiddleware
+
+
+def _probe_app(max_body_bytes=None):
+    app = FastAPI()
+    app.add_middleware(BodyCacheMiddleware, max_body_bytes=max_body_bytes)
+
+    @app.post("/{path:path}")
+    async def probe(request: Request):
+        body = await request.body()
+        body_mac = getattr(request.state, "body_hmac", None)
+        return {
+            "cached": hasattr(request.state, "cached_body"),
+            "digest": body_mac.hexdigest if body_mac else None,
+            "size": len(body),
+        }
+
+    return TestClient(app)
+
+
+def test_uploads_are_not_buffered():
+    client = _probe_app()
+    r = client.post("/api/projects/p/images", files={"file": ("a.png", b"x" * 1000, "image/png")})
+    assert r.json()["cached"] is False
+    assert r.json()["digest"] is None
+
+
+def test_hmac_json_routes_are_buffered_and_capped():
+    client = _probe_app(max_body_bytes=64)
+    r = client.post("/api/analyses/abc/annotations:bulk", json={"annotations": []})
+    assert r.json()["cached"] is True
+    r = client.post("/api/analyses/abc/finalize", json={"status": "x" * 100})
+    assert r.status_code == 413
+
+
+def test_api_ml_streamed_body_gets_incremental_digest(monkeypatch):
+    monkeypatch.setattr("middleware.body_cache.settings.ML_CALLBACK_HMAC_SECRET", "s3cret")
+    client = _probe_app()
+    body = b"y" * 5000
+    r = client.post("/api-ml/projects/p/images", content=body, headers={"Content-Type": "application/octet-stream", "X-ML-Timestamp": "123"})
+    expected = hmac.new(b"s3cret", msg=b"123." + body, digestmod=hashlib.sha256).hexdigest()
+    assert r.json() == {"cached": False, "digest": expected, "size": len(body)}
+
+
+def test_api_ml_upload_verified_with_streamed_hmac(client, monkeypatch):
+    secret = "stream_secret"
+    monkeypatch.setattr("utils.dependencies.settings.ML_CALLBACK_HMAC_SECRET", secret)
+    monkeypatch.setattr("utils.dependencies.settings.ML_PIPELINE_REQUIRE_HMAC", True)
+    api_key = client.post("/api/api-keys/", json={"name": "k", "description": "d"}).json()["key"]
+    proj = client.post("/api/projects/", json={"name": "S", "description": "d", "meta_group_id": "g"}).json()
+
+    boundary = "testboundary"
+    body = (
+        f"--{boundary}\r\n"
+        'Content-Disposition: form-data; name="file"; filename="f.png"\r\n'
+        "Content-Type: image/png\r\n\r\n"
+    ).encode() + b"\x89PNG\r\n" + f"\r\n--{boundary}--\r\n".encode()
+    ts = str(int(time.time()))
+    signature = hmac.new(secret.encode(), msg=ts.encode() + b"." + body, digestmod=hashlib.sha256).hexdigest()
+    headers = {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": f"multipart/form-data; boundary={boundary}",
+        "X-ML-Timestamp": ts,
+        "X-ML-Signature": "sha256=" + signature,
+    }
+    r = client.post(f"/api-ml/projects/{proj['id']}/images", content=body, headers=headers)
+    assert r.status_code == 201, r.text
+
+    headers["X-ML-Signature"] = "sha256=" + "0" * 64
+    r = client.post(f"/api-ml/projects/{proj['id']}/images", content=body, headers=headers)
+    assert r.status_code == 401
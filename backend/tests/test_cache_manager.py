@@ -137,4 +137,114 @@ class TestCacheManager:
         assert stats["count"] >= 2
         assert stats["size_bytes"] > 0
         assert stats["size_mb"] >= 0
-        assert 0 <= stats["usage_percent"] <= 100
\ No newline at end of file
+        assert 0 <= stats["usage_percent"] <= 100
+
+class TestCacheManagerTagInvalidation:
+    """Tests for generation-based tag invalidation on the real CacheManager."""
+
+    @pytest.fixture
+    def cache_manager(self):
+        from utils.cache_manager import CacheManager
+        manager = CacheManager()
+        yield manager
+        manager.clear()
+
+    def test_tag_for_key(self):
+        from utils.cache_manager import tag_for_key
+        assert tag_for_key("thumbnail:abc:w:200:h:200") == "image:abc"
+        assert tag_for_key("image:abc:metadata") == "image:abc"
+        assert tag_for_key("project_images:p1:skip:0:limit:100") == "project:p1"
+        assert tag_for_key("other:data") is None
+        assert tag_for_key("untagged") is None
+
+    def test_invalidate_image_drops_only_that_image(self, cache_manager):
+        cache_manager.set("thumbnail:img1:w:200:h:200", b"a")
+        cache_manager.set("image:img1:metadata", {"a": 1})
+        cache_manager.set("thumbnail:img2:w:200:h:200", b"b")
+
+        cache_manager.invalidate_image("img1")
+
+        assert cache_manager.get("thumbnail:img1:w:200:h:200") is None
+        assert cache_manager.get("image:img1:metadata") is None
+        assert cache_manager.get("thumbnail:img2:w:200:h:200") == b"b"
+
+    def test_invalidate_project_then_repopulate(self, cache_manager):
+        key = "project_images:p1:skip:0:limit:100"
+        cache_manager.set(key, ["old"])
+        cache_manager.set("project_images:p2:skip:0:limit:100", ["other"])
+
+        cache_manager.invalidate_project("p1")
+        assert cache_manager.get(key) is None
+        assert cache_manager.get("project_images:p2:skip:0:limit:100") == ["other"]
+
+        # New writes land in the new generation
+        cache_manager.set(key, ["new"])
+        assert cache_manager.get(key) == ["new"]
+        assert cache_manager.delete(key) is True
+        assert cache_manager.get(key) is None
+
+    def test_untagged_keys_are_unaffected(self, cache_manager):
+        cache_manager.set("other:data", "value")
+        cache_manager.invalidate_tag("project:other")
+        assert cache_manager.get("other:data") == "value"
+
+
+class TestCacheManagerSingleFlight:
+    """Tests for get_or_compute() request coalescing."""
+
+    @pytest.fixture
+    def cache_manager(self):
+        from utils.cache_manager import CacheManager
+        manager = CacheManager()
+        yield manager
+        manager.clear()
+
+    def test_concurrent_misses_share_one_computation(self, cache_manager):
+        import asyncio
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return b"thumb"
+
+        async def scenario():
+            return await asyncio.gather(*[
+                cache_manager.get_or_compute("thumbnail:img1:w:200:h:200", compute, expire=60) for _ in range(10)
+            ])
+
+        results = asyncio.run(scenario())
+        assert results == [b"thumb"] * 10
+        assert len(calls) == 1
+        assert cache_manager.get("thumbnail:img1:w:200:h:200") == b"thumb"
+        stats = cache_manager.stats()["single_flight"]
+        assert stats == {"computed": 1, "coalesced": 9, "in_flight": 0}
+
+    def test_errors_are_shared_and_not_cached(self, cache_manager):
+        import asyncio
+        calls = []
+
+        async def failing():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        async def scenario():
+            return await asyncio.gather(*[
+                cache_manager.get_or_compute("project_images:p1:x", failing) for _ in range(3)
+            ], return_exceptions=True)
+
+        results = asyncio.run(scenario())
+        assert all(isinstance(r, ValueError) for r in results)
+        assert len(calls) == 1
+        assert cache_manager.get("project_images:p1:x") is None
+
+    def test_invalidation_during_compute_does_not_store_stale_value(self, cache_manager):
+        import asyncio
+
+        async def compute():
+            cache_manager.invalidate_project("p1")
+            return ["stale"]
+
+        asyncio.run(cache_manager.get_or_compute("project_images:p1:x", compute))
+        assert cache_manager.get("project_images:p1:x") is None
@@ -0,0 +1,86 @@
+import asyncio
+import io
+import threading
+import pytest
+from PIL import Image
+from utils.compute_executor import ComputeExecutor, ComputeSaturatedError
+from utils.image_processing import make_thumbnail
+
+
+def _png_bytes(size=(400, 300)):
+    img = Image.new("RGB", size, (0, 128, 255))
+    buf = io.BytesIO()
+    img.save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def test_make_thumbnail_keeps_aspect_ratio():
+    data, content_type = make_thumbnail(_png_bytes(), 100, 100)
+    assert content_type == "image/png"
+    thumb = Image.open(io.BytesIO(data))
+    assert thumb.size == (100, 75)
+
+
+def test_executor_runs_and_records_metrics():
+    executor = ComputeExecutor("thread", max_workers=2, max_queue_depth=2)
+    try:
+        data, _ = asyncio.run(executor.run(make_thumbnail, _png_bytes(), 50, 50))
+        assert data
+        stats = executor.stats()
+        assert stats["completed"] == 1
+        assert stats["in_flight"] == 0
+        assert stats["rejected"] == 0
+        assert stats["exec_max_ms"] >= 0
+    finally:
+        executor.shutdown()
+
+
+def test_executor_rejects_when_saturated():
+    executor = ComputeExecutor("thread", max_workers=1, max_queue_depth=0)
+    release = threading.Event()
+
+    async def scenario():
+        blocked = asyncio.ensure_future(executor.run(release.wait, 5))
+        await asyncio.sleep(0.05)
+        with pytest.raises(ComputeSaturatedError):
+            await executor.run(make_thumbnail, _png_bytes(), 10, 10)
+        release.set()
+        await blocked
+
+    try:
+        asyncio.run(scenario())
+        assert executor.stats()["rejected"] == 1
+    finally:
+        executor.shutdown()
+
+
+def test_thumbnail_endpoint_returns_503_when_saturated(client, monkeypatch):
+    pr = client.post("/api/projects/", json={"name": "Busy", "description": None, "meta_group_id": "g"})
+    pid = pr.json()["id"]
+    ur = client.post(f"/api/projects/{pid}/images", files={"file": ("busy.png", io.BytesIO(_png_bytes()), "image/png")})
+    image_id = ur.json()["id"]
+
+    async def fake_download(bucket_name, object_name):
+        return _png_bytes()
+
+    class SaturatedExecutor:
+        async def run(self, fn, *args):
+            raise ComputeSaturatedError("full")
+
+    monkeypatch.setattr("routers.images.download_file_from_s3", fake_download)
+    monkeypatch.setattr("routers.images.get_compute_executor", lambda: SaturatedExecutor())
+    r = client.get(f"/api/images/{image_id}/thumbnail?width=64&height=64")
+    assert r.status_code == 503
+    assert r.headers.get("retry-after") == "1"
+
+
+def test_health_reports_compute_metrics(client, monkeypatch):
+    executor = ComputeExecutor("thread", max_workers=1, max_queue_depth=1)
+    monkeypatch.setattr("utils.compute_executor._compute_executor", executor)
+    try:
+        asyncio.run(executor.run(sum, [1, 2]))
+        compute = client.get("/api/health").json()["compute"]
+        assert compute["completed"] == 1
+        assert {"queue_wait_avg_ms", "exec_max_ms", "rejected"} <= set(compute)
+    finally:
+        executor.shutdown()
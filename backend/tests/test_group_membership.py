@@ -15,3 +15,35 @@ def test_is_user_in_group_non_debug_with_groups(monkeypatch):
     # Test with dev mapping - user@example.com has project-alpha-group access
     assert is_user_in_group("user@example.com", "project-alpha-group") is True
     assert is_user_in_group("user@example.com", "nonexistent") is False
+
+
+def test_get_groups_for_user(monkeypatch):
+    from core.group_auth_helper import get_groups_for_user, clear_cache
+    clear_cache()
+    monkeypatch.setattr(settings, "DEBUG", True)
+    assert get_groups_for_user("a@b.com") is None  # unrestricted in debug mode
+    monkeypatch.setattr(settings, "DEBUG", False)
+    monkeypatch.setattr(settings, "SKIP_HEADER_CHECK", False)
+    assert get_groups_for_user("Scientist@example.com") == ["data-scientists", "project-alpha-group"]
+    assert get_groups_for_user("nobody@example.com") == []
+    clear_cache()
+
+
+def test_project_listing_filters_by_group_in_sql(client, monkeypatch):
+    for i in range(3):
+        client.post("/api/projects/", json={"name": f"Mine{i}", "description": None, "meta_group_id": "g1"})
+        client.post("/api/projects/", json={"name": f"Other{i}", "description": None, "meta_group_id": "g2"})
+    monkeypatch.setattr("utils.dependencies.get_groups_for_user", lambda email: ["g1"])
+
+    r = client.get("/api/projects/?skip=0&limit=2")
+    assert r.status_code == 200
+    assert r.headers["x-total-count"] == "3"
+    first_page = [p["name"] for p in r.json()]
+    assert len(first_page) == 2
+
+    r = client.get("/api/projects/?skip=2&limit=2")
+    second_page = [p["name"] for p in r.json()]
+    # Limit applies after filtering, so pages cover exactly the accessible projects
+    assert sorted(first_page + second_page) == ["Mine0", "Mine1", "Mine2"]
+
+    assert client.get("/api/users/me/groups").json() == ["g1"]
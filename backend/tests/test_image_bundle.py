@@ -0,0 +1,72 @@
+import pytest
+
+
+@pytest.fixture
+def image_with_details(client):
+    pr = client.post("/api/projects/", json={"name": "Bundle", "description": None, "meta_group_id": "g"})
+    assert pr.status_code == 201, pr.text
+    pid = pr.json()["id"]
+    ir = client.post(f"/api/projects/{pid}/images", files={"file": ("b.png", b"\x89PNG\r\n", "image/png")}, data={"metadata": '{"k": 1}'})
+    assert ir.status_code == 201, ir.text
+    image_id = ir.json()["id"]
+
+    cr = client.post(f"/api/projects/{pid}/classes", json={"name": "cat", "description": None, "project_id": pid})
+    assert cr.status_code == 201, cr.text
+    class_id = cr.json()["id"]
+    r = client.post(f"/api/images/{image_id}/classifications", json={"image_id": image_id, "class_id": class_id})
+    assert r.status_code == 201, r.text
+    r = client.post(f"/api/images/{image_id}/comments", json={"text": "looks good", "image_id": image_id})
+    assert r.status_code == 201, r.text
+    r = client.post(f"/api/images/{image_id}/analyses", json={"image_id": image_id, "model_name": "resnet50_classifier", "model_version": "1"})
+    assert r.status_code == 201, r.text
+    return pid, image_id, class_id
+
+
+def test_bundle_matches_individual_endpoints(client, image_with_details):
+    pid, image_id, class_id = image_with_details
+    r = client.get(f"/api/images/{image_id}/bundle")
+    assert r.status_code == 200, r.text
+    bundle = r.json()
+
+    assert bundle["image"] == client.get(f"/api/images/{image_id}").json()
+    assert bundle["user"]["email"] == client.get("/api/users/me").json()["email"]
+    assert bundle["classifications"] == client.get(f"/api/images/{image_id}/classifications").json()
+    assert bundle["comments"] == client.get(f"/api/images/{image_id}/comments").json()
+    assert bundle["analyses"] == client.get(f"/api/images/{image_id}/analyses").json()
+    assert bundle["classes"] == client.get(f"/api/projects/{pid}/classes").json()
+    assert bundle["classifications"][0]["class_id"] == class_id
+    assert bundle["analyses"]["total"] == 1
+
+
+def test_bundle_include_selects_sections(client, image_with_details):
+    _, image_id, _ = image_with_details
+    bundle = client.get(f"/api/images/{image_id}/bundle?include=comments,classes").json()
+    assert len(bundle["comments"]) == 1
+    assert len(bundle["classes"]) == 1
+    assert bundle["classifications"] is None
+    assert bundle["analyses"] is None
+
+    r = client.get(f"/api/images/{image_id}/bundle?include=comments,secrets")
+    assert r.status_code == 400
+
+
+def test_bundle_omits_analyses_when_disabled(client, image_with_details, monkeypatch):
+    _, image_id, _ = image_with_details
+    monkeypatch.setattr("routers.images.settings.ML_ANALYSIS_ENABLED", False)
+    bundle = client.get(f"/api/images/{image_id}/bundle").json()
+    assert bundle["analyses"] is None
+    assert len(bundle["comments"]) == 1
+
+
+def test_bundle_hides_deleted_image_unless_requested(client, image_with_details):
+    pid, image_id, _ = image_with_details
+    r = client.request("DELETE", f"/api/projects/{pid}/images/{image_id}", json={"reason": "cleanup test data"})
+    assert r.status_code in (200, 204), r.text
+    assert client.get(f"/api/images/{image_id}/bundle").status_code == 404
+    r = client.get(f"/api/images/{image_id}/bundle?include_deleted=true&include=comments")
+    assert r.status_code == 200
+    assert r.json()["image"]["deleted_at"] is not None
+
+
+def test_bundle_unknown_image(client):
+    assert client.get("/api/images/00000000-0000-0000-0000-000000000000/bundle").status_code == 404
@@ -0,0 +1,73 @@
+import io
+from PIL import Image
+from utils.image_processing import make_derivatives, snap_to_derivative
+
+
+def _png_bytes(size=(1000, 500)):
+    img = Image.new("RGB", size, (200, 30, 30))
+    buf = io.BytesIO()
+    img.save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def test_make_derivatives_skips_upscaling():
+    rendered = make_derivatives(_png_bytes(), [128, 400, 800, 1600], "WEBP")
+    assert sorted(rendered) == [128, 400, 800]
+    level = Image.open(io.BytesIO(rendered[400]))
+    assert level.format == "WEBP"
+    assert level.size == (400, 200)
+
+
+def test_make_derivatives_small_image_keeps_one_level():
+    rendered = make_derivatives(_png_bytes((64, 64)), [128, 400], "JPEG")
+    assert list(rendered) == [128]
+    assert Image.open(io.BytesIO(rendered[128])).size == (64, 64)
+
+
+def test_snap_to_derivative():
+    assert snap_to_derivative([128, 400, 800], 200, 150) == 400
+    assert snap_to_derivative([128, 400, 800], 128, 128) == 128
+    assert snap_to_derivative([128, 400, 800], 2000, 100) == 800
+
+
+def test_upload_generates_derivatives_and_thumbnail_serves_them(client, monkeypatch):
+    from tests.conftest import TestingSessionLocal
+    stored = {}
+
+    async def fake_upload(bucket_name, object_name, file_data, length=None, content_type="application/octet-stream"):
+        stored[object_name] = file_data.read()
+        return True
+
+    async def fake_download(bucket_name, object_name):
+        return _png_bytes()
+
+    monkeypatch.setattr("utils.derivatives.download_file_from_s3", fake_download)
+    monkeypatch.setattr("utils.derivatives.upload_file_to_s3", fake_upload)
+    monkeypatch.setattr("utils.derivatives.AsyncSessionLocal", TestingSessionLocal)
+
+    pr = client.post("/api/projects/", json={"name": "Pyramid", "description": None, "meta_group_id": "g"})
+    pid = pr.json()["id"]
+    ur = client.post(f"/api/projects/{pid}/images", files={"file": ("big.png", io.BytesIO(_png_bytes()), "image/png")})
+    assert ur.status_code == 201
+    image_id = ur.json()["id"]
+    assert sorted(stored) == [f"derivatives/{pid}/{image_id}/{s}.webp" for s in (128, 400, 800)]
+
+    opened = []
+
+    class Stream:
+        def __init__(self, data):
+            self.data = data
+            self.content_length = len(data)
+        async def iter_chunks(self):
+            yield self.data
+
+    async def fake_open(bucket_name, object_name, byte_range=None):
+        opened.append(object_name)
+        return Stream(stored[object_name])
+
+    monkeypatch.setattr("routers.images.open_object_stream", fake_open)
+    r = client.get(f"/api/images/{image_id}/thumbnail?width=300&height=200")
+    assert r.status_code == 200
+    assert r.headers["content-type"] == "image/webp"
+    assert Image.open(io.BytesIO(r.content)).size == (400, 200)
+    assert opened == [f"derivatives/{pid}/{image_id}/400.webp"]
@@ -0,0 +1,87 @@
+import io
+import json
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+from core import models
+from utils.image_filters import parse_filter, parse_filters, compile_filters
+
+
+def _pg_sql(raw_filters):
+    query = select(models.DataInstance.id).where(*compile_filters(parse_filters(raw_filters), "postgresql"))
+    return str(query.compile(dialect=postgresql.dialect()))
+
+
+def test_parse_filter_types():
+    assert parse_filter("meta.exposure>=0.5") == ("meta.exposure", ">=", 0.5)
+    assert parse_filter("meta.camera=canon") == ("meta.camera", "=", "canon")
+    assert parse_filter('meta.code="007"') == ("meta.code", "=", "007")
+    assert parse_filter("meta.reviewed?") == ("meta.reviewed", "?", None)
+    assert parse_filter("filename=123.png").value == "123.png"
+    assert parse_filter("size_bytes<1000").value == 1000
+    assert parse_filter("created_at>=2026-01-01").value.year == 2026
+
+
+@pytest.mark.parametrize("raw", [
+    "meta.x", "nope=1", "meta.=1", "meta.x?y", "filename>a", "size_bytes~1",
+    "created_at>yesterday", "meta.flag>true", 'meta.a"b=1',
+])
+def test_parse_filter_rejects(raw):
+    with pytest.raises(ValueError):
+        parse_filter(raw)
+
+
+def test_postgres_compiles_to_index_operators():
+    sql = _pg_sql(["meta.camera=canon", "meta.reviewed?", "meta.exposure>=0.5", "meta.notes~blur", "filename~dog"])
+    assert "data_instances.metadata @> " in sql
+    assert "data_instances.metadata @? " in sql
+    assert "data_instances.metadata @@ " in sql
+    assert "CAST(data_instances.metadata AS TEXT) ILIKE" in sql
+    assert "data_instances.filename ILIKE" in sql
+    assert sql.count(" AND ") == 5  # all predicates AND-ed
+
+
+@pytest.fixture
+def project_with_metadata(client):
+    pr = client.post("/api/projects/", json={"name": "Filters", "description": None, "meta_group_id": "g"})
+    pid = pr.json()["id"]
+    rows = [
+        ("a.png", {"camera": "canon", "exposure": 0.25, "taken": "2025-06-01", "reviewed": True}),
+        ("b.png", {"camera": "nikon", "exposure": 0.75, "taken": "2026-02-01", "notes": "Blurry edge"}),
+        ("dog.png", {"camera": "canon", "exposure": "n/a"}),
+    ]
+    ids = {}
+    for name, meta in rows:
+        files = {"file": (name, io.BytesIO(b"data"), "image/png")}
+        r = client.post(f"/api/projects/{pid}/images", files=files, data={"metadata": json.dumps(meta)})
+        assert r.status_code == 201
+        ids[name] = r.json()["id"]
+    return pid, ids
+
+
+def _names(client, pid, *filters, page=False):
+    url = f"/api/projects/{pid}/images:page" if page else f"/api/projects/{pid}/images"
+    r = client.get(url, params=[("filter", f) for f in filters])
+    assert r.status_code == 200, r.text
+    items = r.json()["items"] if page else r.json()
+    return sorted(img["filename"] for img in items)
+
+
+def test_sqlite_fallback_filters(client, project_with_metadata):
+    pid, _ = project_with_metadata
+    assert _names(client, pid, "meta.camera=canon") == ["a.png", "dog.png"]
+    assert _names(client, pid, "meta.camera=canon", "meta.reviewed?") == ["a.png"]
+    # "n/a" is a string, so numeric ranges skip it
+    assert _names(client, pid, "meta.exposure>0.1") == ["a.png", "b.png"]
+    assert _names(client, pid, "meta.exposure<0.5") == ["a.png"]
+    assert _names(client, pid, "meta.taken>=2026-01-01") == ["b.png"]
+    assert _names(client, pid, "meta.notes~blurry") == ["b.png"]
+    assert _names(client, pid, "meta.camera!=canon") == ["b.png"]
+    assert _names(client, pid, "filename~dog") == ["dog.png"]
+    assert _names(client, pid, "meta.reviewed=true", page=True) == ["a.png"]
+
+
+def test_invalid_filter_returns_400(client, project_with_metadata):
+    pid, _ = project_with_metadata
+    assert client.get(f"/api/projects/{pid}/images", params={"filter": "bogus=1"}).status_code == 400
+    assert client.get(f"/api/projects/{pid}/images:page", params={"filter": "meta.x"}).status_code == 400
@@ -0,0 +1,91 @@
+import io
+import pytest
+from PIL import Image
+from utils.pagination import encode_cursor, decode_cursor
+
+
+def _png():
+    buf = io.BytesIO()
+    Image.new("RGB", (4, 4), (0, 0, 255)).save(buf, format="PNG")
+    buf.seek(0)
+    return buf
+
+
+@pytest.fixture
+def project_with_images(client):
+    pr = client.post("/api/projects/", json={"name": "Keyset", "description": None, "meta_group_id": "g"})
+    pid = pr.json()["id"]
+    ids = []
+    for i in range(7):
+        ur = client.post(f"/api/projects/{pid}/images", files={"file": (f"img{i}.png", _png(), "image/png")})
+        assert ur.status_code == 201
+        ids.append(ur.json()["id"])
+    return pid, ids
+
+
+def _walk(client, url):
+    seen, cursor, pages = [], None, 0
+    while True:
+        r = client.get(url + (f"&cursor={cursor}" if cursor else ""))
+        assert r.status_code == 200, r.text
+        body = r.json()
+        seen.extend(img["id"] for img in body["items"])
+        pages += 1
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return seen, pages
+
+
+def test_cursor_roundtrip_and_sort_mismatch():
+    import uuid
+    from datetime import datetime, timezone
+    row_id = uuid.uuid4()
+    ts = datetime(2026, 1, 2, 3, 4, 5, 678, tzinfo=timezone.utc)
+    cursor = encode_cursor("created_at", False, ts, row_id)
+    assert decode_cursor(cursor, "created_at", False) == (ts, row_id)
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, "created_at", True)
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor", "created_at", False)
+
+
+def test_pages_cover_all_images_once(client, project_with_images):
+    pid, ids = project_with_images
+    seen, pages = _walk(client, f"/api/projects/{pid}/images:page?limit=3")
+    assert pages == 3
+    assert seen == ids  # created_at, id ascending is upload order
+
+    seen_desc, _ = _walk(client, f"/api/projects/{pid}/images:page?limit=2&order=desc")
+    assert seen_desc == list(reversed(ids))
+
+    by_name, _ = _walk(client, f"/api/projects/{pid}/images:page?limit=4&sort=filename")
+    assert by_name == ids
+
+
+def test_deleted_images_filtered_in_sql(client, project_with_images):
+    pid, ids = project_with_images
+    for image_id in ids[:3]:
+        r = client.request("DELETE", f"/api/projects/{pid}/images/{image_id}", json={"reason": "cleanup test data"})
+        assert r.status_code in (200, 204), r.text
+
+    r = client.get(f"/api/projects/{pid}/images:page?limit=4")
+    body = r.json()
+    # A full page of live images, not a page thinned out by deleted rows
+    assert [img["id"] for img in body["items"]] == ids[3:]
+    assert body["next_cursor"] is None
+
+    deleted, _ = _walk(client, f"/api/projects/{pid}/images:page?limit=2&deleted_only=true")
+    assert deleted == ids[:3]
+
+    legacy = client.get(f"/api/projects/{pid}/images?limit=4").json()
+    assert [img["id"] for img in legacy] == ids[3:]
+
+
+def test_invalid_cursor_and_sort_rejected(client, project_with_images):
+    pid, _ = project_with_images
+    assert client.get(f"/api/projects/{pid}/images:page?cursor=garbage").status_code == 400
+    assert client.get(f"/api/projects/{pid}/images:page?sort=size").status_code == 400
+
+    first = client.get(f"/api/projects/{pid}/images:page?limit=2").json()
+    r = client.get(f"/api/projects/{pid}/images:page?limit=2&order=desc&cursor={first['next_cursor']}")
+    assert r.status_code == 400
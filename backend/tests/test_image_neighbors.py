@@ -0,0 +1,84 @@
+import io
+import pytest
+from PIL import Image
+
+
+def _png():
+    buf = io.BytesIO()
+    Image.new("RGB", (4, 4), (0, 255, 0)).save(buf, format="PNG")
+    buf.seek(0)
+    return buf
+
+
+@pytest.fixture
+def project_with_images(client):
+    pr = client.post("/api/projects/", json={"name": "Neighbors", "description": None, "meta_group_id": "g"})
+    pid = pr.json()["id"]
+    ids = []
+    for i in range(5):
+        ur = client.post(
+            f"/api/projects/{pid}/images",
+            files={"file": (f"img{i}.png", _png(), "image/png")},
+            data={"metadata": '{"even": %s}' % ("true" if i % 2 == 0 else "false")},
+        )
+        assert ur.status_code == 201, ur.text
+        ids.append(ur.json()["id"])
+    return pid, ids
+
+
+def _neighbors(client, image_id, query=""):
+    query += ("&" if query else "?") + "include_position=true"
+    r = client.get(f"/api/images/{image_id}/neighbors{query}")
+    assert r.status_code == 200, r.text
+    body = r.json()
+    return body["previous_id"], body["next_id"], body["position"], body["total"]
+
+
+def test_neighbors_follow_listing_order(client, project_with_images):
+    pid, ids = project_with_images
+    assert _neighbors(client, ids[0]) == (None, ids[1], 1, 5)
+    assert _neighbors(client, ids[2]) == (ids[1], ids[3], 3, 5)
+    assert _neighbors(client, ids[4]) == (ids[3], None, 5, 5)
+
+    # Descending order mirrors the gallery's newest-first view
+    assert _neighbors(client, ids[4], "?order=desc") == (None, ids[3], 1, 5)
+    assert _neighbors(client, ids[1], "?order=desc&sort=filename") == (ids[2], ids[0], 4, 5)
+
+    # Walking next_id visits the same sequence as images:page
+    page = client.get(f"/api/projects/{pid}/images:page?limit=10&order=desc").json()
+    walked, current = [], ids[4]
+    while current:
+        walked.append(current)
+        current = _neighbors(client, current, "?order=desc")[1]
+    assert walked == [img["id"] for img in page["items"]]
+
+
+def test_neighbors_apply_filters(client, project_with_images):
+    _, ids = project_with_images
+    even = "?filter=meta.even%3Dtrue"
+    assert _neighbors(client, ids[2], even) == (ids[0], ids[4], 2, 3)
+    # An image outside the filtered set still gets its surrounding images
+    assert _neighbors(client, ids[1], even) == (ids[0], ids[2], None, 3)
+
+
+def test_neighbors_skip_deleted_images(client, project_with_images):
+    pid, ids = project_with_images
+    r = client.request("DELETE", f"/api/projects/{pid}/images/{ids[2]}", json={"reason": "cleanup test data"})
+    assert r.status_code in (200, 204), r.text
+
+    assert _neighbors(client, ids[1]) == (ids[0], ids[3], 2, 4)
+    assert _neighbors(client, ids[2]) == (ids[1], ids[3], None, 4)
+    assert _neighbors(client, ids[2], "?include_deleted=true") == (ids[1], ids[3], 3, 5)
+
+
+def test_neighbors_rejects_bad_parameters(client, project_with_images):
+    _, ids = project_with_images
+    assert client.get(f"/api/images/{ids[0]}/neighbors?sort=size").status_code == 400
+    assert client.get(f"/api/images/{ids[0]}/neighbors?filter=bogus").status_code == 400
+    assert client.get(f"/api/images/{ids[0]}/neighbors?order=sideways").status_code == 422
+
+
+def test_neighbors_position_is_opt_in(client, project_with_images):
+    _, ids = project_with_images
+    body = client.get(f"/api/images/{ids[2]}/neighbors").json()
+    assert (body["previous_id"], body["next_id"], body["position"], body["total"]) == (ids[1], ids[3], None, 5)
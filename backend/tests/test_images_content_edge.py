@@ -20,25 +20,20 @@ def test_content_disposition_sanitization(client, monkeypatch):
     ur = client.post(f"/api/projects/{pid}/images", files={"file": ('bad"name\n.png', io.BytesIO(data), "image/png")})
     image_id = ur.json()["id"]
 
-    class Resp:
-        def __init__(self, data):
-            self._data = data
-        def raise_for_status(self):
-            return None
-        async def aread(self):
-            return self._data
-        def iter_bytes(self):
-            yield self._data
+    class Stream:
+        content_length = len(data)
+        content_type = "image/png"
+        content_range = None
+        etag = '"e1"'
+        last_modified = None
 
-    class Client:
-        async def __aenter__(self):
-            return self
-        async def __aexit__(self, *a):
-            return False
-        async def get(self, url):
-            return Resp(data)
+        async def iter_chunks(self):
+            yield data
 
-    monkeypatch.setattr("routers.images.httpx.AsyncClient", Client)
+    async def fake_open(bucket_name, object_name, byte_range=None):
+        return Stream()
+
+    monkeypatch.setattr("routers.images.open_object_stream", fake_open)
     r = client.get(f"/api/images/{image_id}/content")
     assert r.status_code == 200
     cd = r.headers.get("content-disposition", "")
@@ -60,14 +55,9 @@ def test_content_http_error(client, monkeypatch):
     class BadResp(Exception):
         pass
 
-    class Client:
-        async def __aenter__(self):
-            return self
-        async def __aexit__(self, *a):
-            return False
-        async def get(self, url):
-            raise BadResp("boom")
+    async def fake_open(bucket_name, object_name, byte_range=None):
+        raise BadResp("boom")
 
-    monkeypatch.setattr("routers.images.httpx.AsyncClient", Client)
+    monkeypatch.setattr("routers.images.open_object_stream", fake_open)
     r = client.get(f"/api/images/{image_id}/content")
     assert r.status_code == 500
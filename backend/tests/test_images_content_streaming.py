@@ -0,0 +1,93 @@
+import io
+import pytest
+from datetime import datetime, timezone
+from PIL import Image
+import utils.boto3_client as storage
+from tests.test_storage_async import FakeS3
+from utils.http_conditional import is_not_modified, requested_range
+
+
+def _png_bytes():
+    img = Image.new("RGB", (64, 64), (10, 200, 10))
+    buf = io.BytesIO()
+    img.save(buf, format="PNG")
+    return buf.getvalue()
+
+
+@pytest.fixture
+def fake_s3(monkeypatch):
+    fake = FakeS3()
+    monkeypatch.setattr(storage, "boto3_client", fake)
+    monkeypatch.setattr(storage.settings, "THUMBNAIL_DERIVATIVES_ENABLED", False)
+
+    async def fake_upload(bucket_name, object_name, file_data, length=None, content_type="application/octet-stream"):
+        fake.upload_fileobj(file_data, bucket_name, object_name, ExtraArgs={"ContentType": content_type})
+        return True
+
+    monkeypatch.setattr("routers.images.upload_file_to_s3", fake_upload)
+    yield fake
+    storage.shutdown_storage_pool()
+
+
+def _upload(client, data):
+    pr = client.post("/api/projects/", json={"name": "Stream", "description": None, "meta_group_id": "g"})
+    pid = pr.json()["id"]
+    ur = client.post(f"/api/projects/{pid}/images", files={"file": ("s.png", io.BytesIO(data), "image/png")})
+    assert ur.status_code == 201
+    return ur.json()["id"]
+
+
+def test_content_streams_full_body_with_validators(client, fake_s3):
+    data = _png_bytes()
+    image_id = _upload(client, data)
+    r = client.get(f"/api/images/{image_id}/content")
+    assert r.status_code == 200
+    assert r.content == data
+    assert r.headers["etag"] == '"abc"'
+    assert r.headers["last-modified"] == "Fri, 02 Jan 2026 03:04:05 GMT"
+    assert r.headers["accept-ranges"] == "bytes"
+    assert r.headers["content-length"] == str(len(data))
+
+
+def test_content_range_returns_206(client, fake_s3):
+    data = _png_bytes()
+    image_id = _upload(client, data)
+    r = client.get(f"/api/images/{image_id}/content", headers={"Range": "bytes=0-9"})
+    assert r.status_code == 206
+    assert r.content == data[:10]
+    assert r.headers["content-range"] == f"bytes 0-9/{len(data)}"
+
+
+def test_revalidation_returns_304_without_storage(client, fake_s3):
+    image_id = _upload(client, _png_bytes())
+    calls_after_upload = fake_s3.get_calls
+    r = client.get(f"/api/images/{image_id}/content", headers={"If-None-Match": '"abc"'})
+    assert r.status_code == 304
+    assert r.headers["etag"] == '"abc"'
+    r = client.get(f"/api/images/{image_id}/content", headers={"If-Modified-Since": "Fri, 02 Jan 2026 03:04:05 GMT"})
+    assert r.status_code == 304
+    # A "-0000" zone parses as a naive datetime
+    r = client.get(f"/api/images/{image_id}/content", headers={"If-Modified-Since": "Fri, 02 Jan 2026 03:04:05 -0000"})
+    assert r.status_code == 304
+    assert fake_s3.get_calls == calls_after_upload
+
+
+def test_legacy_image_revalidates_against_object(client, fake_s3, monkeypatch):
+    async def no_head(bucket_name, object_name):
+        return None
+
+    monkeypatch.setattr("routers.images.head_object_s3", no_head)
+    image_id = _upload(client, _png_bytes())
+    calls_after_upload = fake_s3.get_calls
+    r = client.get(f"/api/images/{image_id}/content", headers={"If-None-Match": 'W/"abc"'})
+    assert r.status_code == 304
+    assert fake_s3.get_calls == calls_after_upload + 1
+
+
+def test_conditional_helpers():
+    assert requested_range({"range": "bytes=5-"}, None) == "bytes=5-"
+    assert requested_range({"range": "bytes=0-1,4-5"}, None) is None
+    assert requested_range({"range": "bytes=9-2"}, None) is None
+    assert requested_range({"range": "bytes=0-1", "if-range": '"old"'}, '"new"') is None
+    assert not is_not_modified({"if-none-match": '"x"', "if-modified-since": "Fri, 02 Jan 2026 03:04:05 GMT"}, '"y"', None)
+    assert not is_not_modified({"if-modified-since": "Fri, 02 Jan 2026 03:04:04 -0000"}, None, datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc))
@@ -68,35 +68,27 @@ def test_get_download_url_and_content_and_thumbnail(client, monkeypatch):
     assert dr.status_code == 200
     assert dr.json()["url"].endswith(f"/images/{image_id}/content")
 
-    # Mock httpx client to return our bytes for content and thumbnail
-    class Resp:
-        def __init__(self, data, ctype="image/png"):
-            self._data = data
-            self.headers = {"content-type": ctype}
-            self.status_code = 200
+    # Mock the storage stream for content
+    class Stream:
+        content_length = None
+        content_type = "image/png"
+        content_range = None
+        etag = '"e1"'
+        last_modified = None
 
-        def raise_for_status(self):
-            return None
+        async def iter_chunks(self):
+            yield _make_png_bytes().getvalue()
 
-        async def aread(self):
-            return self._data
+    async def fake_open(bucket_name, object_name, byte_range=None):
+        return Stream()
 
-        def iter_bytes(self):
-            # Simple iterator over bytes
-            yield self._data
+    monkeypatch.setattr("routers.images.open_object_stream", fake_open)
 
-    class Client:
-        async def __aenter__(self):
-            return self
+    # Mock the storage read used by the on-demand thumbnail path
+    async def fake_download(bucket_name, object_name):
+        return _make_png_bytes().getvalue()
 
-        async def __aexit__(self, exc_type, exc, tb):
-            return False
-
-        async def get(self, url):
-            # Return fixed PNG
-            return Resp(_make_png_bytes().getvalue())
-
-    monkeypatch.setattr("routers.images.httpx.AsyncClient", Client)
+    monkeypatch.setattr("routers.images.download_file_from_s3", fake_download)
 
     # Proxy content
     cr = client.get(f"/api/images/{image_id}/content")
@@ -0,0 +1,65 @@
+def _bulk(client, project_id, **body):
+    return client.post(f"/api/projects/{project_id}/analyses:bulk", json={"model_name": "yolo_v8", "model_version": "1", **body})
+
+
+def _models(client, image_id):
+    return [(a["model_name"], a["model_version"], a["status"]) for a in client.get(f"/api/images/{image_id}/analyses").json()["analyses"]]
+
+
+def test_bulk_create_whole_project_then_skip_existing(client, ml_project, make_image):
+    ids = [make_image(f"{i}.png") for i in range(4)]
+
+    r = _bulk(client, ml_project, priority=5)
+    assert r.status_code == 200, r.text
+    body = r.json()
+    assert (body["matched"], body["created"], body["skipped_existing"], body["remaining"]) == (4, 4, 0, 0)
+    assert body["status"] == "queued"
+    for image_id in ids:
+        assert _models(client, image_id) == [("yolo_v8", "1", "queued")]
+    assert {a["priority"] for a in client.get(f"/api/images/{ids[0]}/analyses").json()["analyses"]} == {5}
+
+    # A second run of the same model and version is skipped, a new version is not
+    body = _bulk(client, ml_project).json()
+    assert (body["matched"], body["created"], body["skipped_existing"]) == (4, 0, 4)
+    body = _bulk(client, ml_project, model_version="2").json()
+    assert (body["created"], body["skipped_existing"]) == (4, 0)
+    body = _bulk(client, ml_project, skip_existing=False).json()
+    assert (body["created"], body["skipped_existing"]) == (4, 0)
+    assert len(_models(client, ids[0])) == 3
+
+
+def test_bulk_create_by_ids_and_filters(client, ml_project, make_image):
+    cat = make_image("cat.png", {"label": "cat"})
+    dog = make_image("dog.png", {"label": "dog"})
+    other_project = client.post("/api/projects/", json={"name": "Elsewhere", "description": None, "meta_group_id": "g"}).json()["id"]
+    foreign = make_image("x.png", project_id=other_project)
+
+    body = _bulk(client, ml_project, filters=["meta.label=cat"]).json()
+    assert (body["matched"], body["created"]) == (1, 1)
+    assert _models(client, dog) == []
+
+    body = _bulk(client, ml_project, model_name="vgg16", image_ids=[dog, foreign]).json()
+    assert (body["matched"], body["created"], body["not_found"]) == (1, 1, 1)
+    assert _models(client, dog) == [("vgg16", "1", "queued")]
+    assert _models(client, foreign) == []
+    assert [m for m, _, _ in _models(client, cat)] == ["yolo_v8"]
+
+
+def test_bulk_create_limits(client, ml_project, make_image, monkeypatch):
+    full = make_image("full.png")
+    free = make_image("free.png")
+    monkeypatch.setattr("routers.ml_analyses.settings.ML_MAX_ANALYSES_PER_IMAGE", 2)
+    for version in ("a", "b"):
+        _bulk(client, ml_project, model_version=version, image_ids=[full])
+
+    monkeypatch.setattr("routers.ml_analyses.settings.ML_BULK_CREATE_MAX", 1)
+    extra = make_image("extra.png")
+    body = _bulk(client, ml_project, model_version="c").json()
+    assert (body["matched"], body["created"], body["skipped_limit"], body["remaining"]) == (3, 1, 1, 1)
+    assert _models(client, free) == [("yolo_v8", "c", "queued")]
+    assert _models(client, extra) == []
+
+    assert _bulk(client, ml_project, model_name="not_a_model").status_code == 400
+    assert _bulk(client, ml_project, filters=["bogus=1"]).status_code == 400
+    monkeypatch.setattr("routers.ml_analyses.settings.ML_BULK_CREATE_MAX_IDS", 1)
+    assert _bulk(client, ml_project, image_ids=[free, extra]).status_code == 400
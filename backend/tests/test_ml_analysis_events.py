@@ -0,0 +1,97 @@
+import asyncio
+import threading
+
+import pytest
+
+import utils.event_bus as event_bus
+from utils.event_bus import InProcessEventBus, image_topic, project_topic
+
+
+class _FakeRequest:
+    """Connected until `disconnect_after` disconnect checks have been made."""
+
+    def __init__(self, disconnect_after: int):
+        self.checks = 0
+        self.disconnect_after = disconnect_after
+
+    async def is_disconnected(self):
+        self.checks += 1
+        return self.checks > self.disconnect_after
+
+
+@pytest.mark.asyncio
+async def test_bus_delivers_across_threads_and_unsubscribes():
+    bus = InProcessEventBus(max_queue=10)
+    async with bus.subscribe(["image:1"]) as sub:
+        thread = threading.Thread(target=bus.publish, args=("image:1", {"n": 1}))
+        thread.start()
+        thread.join()
+        assert bus.publish("image:2", {"n": 2}) == 0
+        assert await sub.get(timeout=1) == {"n": 1}
+        assert await sub.get(timeout=0.05) is None
+    assert bus.subscriber_count("image:1") == 0
+
+
+@pytest.mark.asyncio
+async def test_bus_flags_overflow_for_slow_subscribers():
+    bus = InProcessEventBus(max_queue=2)
+    async with bus.subscribe(["t"]) as sub:
+        for n in range(3):
+            bus.publish("t", {"n": n})
+        await asyncio.sleep(0)
+        assert sub.overflowed
+        assert [await sub.get(timeout=1), await sub.get(timeout=1)] == [{"n": 0}, {"n": 1}]
+
+
+@pytest.mark.asyncio
+async def test_event_stream_formats_events(monkeypatch):
+    from routers.ml_analyses import _analysis_event_stream
+    bus = InProcessEventBus()
+    monkeypatch.setattr(event_bus, "_event_bus", bus)
+    monkeypatch.setattr("routers.ml_analyses.settings.ML_EVENTS_KEEPALIVE_SECONDS", 0.05)
+
+    stream = _analysis_event_stream(_FakeRequest(disconnect_after=2), "image:abc")
+    assert (await stream.__anext__()).startswith(b"retry: ")
+    bus.publish("image:abc", {"status": "processing"})
+    chunk = await stream.__anext__()
+    assert chunk == b'event: analysis\ndata: {"status": "processing"}\n\n'
+    assert await stream.__anext__() == b": keepalive\n\n"
+    with pytest.raises(StopAsyncIteration):
+        await stream.__anext__()
+    assert bus.subscriber_count("image:abc") == 0
+
+
+class _RecordingBus(event_bus.EventBus):
+    def __init__(self):
+        self.events = []
+
+    def publish(self, topic, event):
+        self.events.append((topic, event))
+        return 0
+
+
+def test_analysis_changes_are_published(client, ml_project, ml_image, make_analysis, no_hmac, monkeypatch):
+    bus = _RecordingBus()
+    monkeypatch.setattr(event_bus, "_event_bus", bus)
+    analysis_id = make_analysis(ml_image)
+
+    assert client.patch(f"/api/analyses/{analysis_id}/status", json={"status": "processing"}).status_code == 200
+    body = {"annotations": [{"annotation_type": "classification", "class_name": "cat", "confidence": 0.9, "data": {}}]}
+    assert client.post(f"/api/analyses/{analysis_id}/annotations:bulk", json=body).status_code == 200
+    assert client.post(f"/api/analyses/{analysis_id}/finalize", json={"status": "completed"}).status_code == 200
+
+    image_events = [e for topic, e in bus.events if topic == image_topic(ml_image)]
+    project_events = [e for topic, e in bus.events if topic == project_topic(ml_project)]
+    assert image_events == project_events
+    assert [(e["status"], e["annotation_count"]) for e in image_events] == [
+        ("processing", None), ("processing", 1), ("completed", None),
+    ]
+    assert all(e["analysis_id"] == analysis_id for e in image_events)
+
+
+def test_event_streams_check_access(client, monkeypatch):
+    missing = "00000000-0000-0000-0000-000000000000"
+    assert client.get(f"/api/images/{missing}/analyses/events").status_code == 404
+    assert client.get(f"/api/projects/{missing}/analyses/events").status_code == 404
+    monkeypatch.setattr("routers.ml_analyses.settings.ML_ANALYSIS_ENABLED", False)
+    assert client.get(f"/api/images/{missing}/analyses/events").status_code == 404
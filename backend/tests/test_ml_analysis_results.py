@@ -0,0 +1,74 @@
+import hashlib
+import hmac
+import json
+import time
+import uuid
+
+from middleware.body_cache import RAW_BODY_ROUTE_RE
+
+
+def _box(label):
+    return {"annotation_type": "bounding_box", "class_name": label, "confidence": 0.5, "data": {"bbox": [0, 0, 1, 1]}}
+
+
+def test_results_in_one_request(client, ml_image, make_analysis, no_hmac):
+    analysis_id = make_analysis(ml_image)
+    r = client.post(f"/api/analyses/{analysis_id}/results", json={
+        "annotations": [_box("car"), _box("person")],
+        "artifacts": [{"artifact_type": "heatmap", "filename": "heat.png"}, {"artifact_type": "log"}],
+        "status": "completed",
+    })
+    assert r.status_code == 200, r.text
+    body = r.json()
+    assert body["analysis"]["status"] == "completed"
+    assert body["analysis"]["started_at"] and body["analysis"]["completed_at"]
+    assert (body["annotations"]["inserted"], body["annotations"]["total"]) == (2, 2)
+    assert [a["storage_path"] for a in body["artifacts"]] == [
+        f"ml_outputs/{analysis_id}/heat.png",
+        f"ml_outputs/{analysis_id}/log.bin",
+    ]
+    assert all(a["upload_url"] for a in body["artifacts"])
+    assert len(client.get(f"/api/analyses/{analysis_id}").json()["annotations"]) == 2
+
+
+def test_results_replace_without_status_change(client, ml_image, make_analysis, no_hmac):
+    analysis_id = make_analysis(ml_image)
+    client.post(f"/api/analyses/{analysis_id}/results", json={"annotations": [_box("car"), _box("car")]})
+    body = client.post(f"/api/analyses/{analysis_id}/results", json={"annotations": [_box("bus")], "mode": "replace"}).json()
+    assert (body["annotations"]["inserted"], body["annotations"]["deleted"], body["annotations"]["total"]) == (1, 2, 1)
+    assert body["analysis"]["status"] == "queued"
+    assert body["artifacts"] == []
+
+
+def test_rejected_results_store_nothing(client, ml_image, make_analysis, no_hmac, monkeypatch):
+    analysis_id = make_analysis(ml_image)
+    client.post(f"/api/analyses/{analysis_id}/finalize", json={"status": "completed"})
+
+    r = client.post(f"/api/analyses/{analysis_id}/results", json={"annotations": [_box("car")], "status": "processing"})
+    assert r.status_code == 409
+    r = client.post(f"/api/analyses/{analysis_id}/results", json={
+        "annotations": [_box("car")],
+        "artifacts": [{"artifact_type": "mask", "filename": "m.png"}, {"artifact_type": "mask", "filename": "m.png"}],
+    })
+    assert r.status_code == 400
+    monkeypatch.setattr("routers.ml_analyses.settings.ML_RESULTS_MAX_ARTIFACTS", 1)
+    r = client.post(f"/api/analyses/{analysis_id}/results", json={"artifacts": [{"artifact_type": "log"}, {"artifact_type": "mask"}]})
+    assert r.status_code == 400
+    assert client.get(f"/api/analyses/{analysis_id}").json()["annotations"] == []
+
+
+def test_signed_results_body_is_buffered_for_hmac(client, ml_image, make_analysis, monkeypatch):
+    assert RAW_BODY_ROUTE_RE.search(f"/api/analyses/{uuid.uuid4()}/results")
+    analysis_id = make_analysis(ml_image)
+    monkeypatch.setattr("routers.ml_analyses.settings.ML_PIPELINE_REQUIRE_HMAC", True)
+    monkeypatch.setattr("routers.ml_analyses.settings.ML_CALLBACK_HMAC_SECRET", "results-secret")
+    body = json.dumps({"annotations": [_box("car")], "status": "completed"}).encode("utf-8")
+    ts = str(int(time.time()))
+    signature = hmac.new(b"results-secret", ts.encode("utf-8") + b"." + body, hashlib.sha256).hexdigest()
+    headers = {"Content-Type": "application/json", "X-ML-Timestamp": ts, "X-ML-Signature": "sha256=" + signature}
+
+    r = client.post(f"/api/analyses/{analysis_id}/results", content=body, headers=headers)
+    assert r.status_code == 200, r.text
+    assert r.json()["analysis"]["status"] == "completed"
+    headers["X-ML-Signature"] = "sha256=" + "0" * 64
+    assert client.post(f"/api/analyses/{analysis_id}/results", content=body, headers=headers).status_code == 401
@@ -0,0 +1,51 @@
+def _ann(annotation_type, class_name, confidence):
+    return {"annotation_type": annotation_type, "class_name": class_name, "confidence": confidence, "data": {}}
+
+
+def test_list_carries_sql_annotation_summaries(client, ml_image, make_analysis, no_hmac):
+    busy = make_analysis(ml_image, annotations=[
+        _ann("bounding_box", "car", 0.4),
+        _ann("bounding_box", "car", 0.7),
+        _ann("bounding_box", "person", 0.9),
+        _ann("classification", "street", 0.6),
+        _ann("heatmap", None, None),
+    ])
+    empty = make_analysis(ml_image)
+
+    r = client.get(f"/api/images/{ml_image}/analyses")
+    assert r.status_code == 200, r.text
+    by_id = {a["id"]: a for a in r.json()["analyses"]}
+    assert by_id[busy]["annotations"] == []
+
+    summary = by_id[busy]["annotation_summary"]
+    assert summary["total"] == 5
+    assert summary["by_type"] == {"bounding_box": 3, "classification": 1, "heatmap": 1}
+    assert summary["max_confidence"] == 0.9
+    assert summary["top_classes"][0] == {"class_name": "car", "count": 2, "max_confidence": 0.7}
+    assert [c["class_name"] for c in summary["top_classes"]] == ["car", "person", "street"]
+
+    assert by_id[empty]["annotation_summary"] == {"total": 0, "by_type": {}, "top_classes": [], "max_confidence": None}
+
+    bundle = client.get(f"/api/images/{ml_image}/bundle", params={"include": "analyses"}).json()
+    assert {a["id"]: a["annotation_summary"]["total"] for a in bundle["analyses"]["analyses"]} == {busy: 5, empty: 0}
+
+
+def test_top_classes_are_capped(client, ml_image, make_analysis, no_hmac):
+    make_analysis(ml_image, annotations=[_ann("bounding_box", f"class{i}", 0.5) for i in range(8)])
+    summary = client.get(f"/api/images/{ml_image}/analyses").json()["analyses"][0]["annotation_summary"]
+    assert summary["total"] == 8
+    assert len(summary["top_classes"]) == 5
+
+
+def test_status_updates_do_not_return_annotations(client, ml_image, make_analysis, no_hmac):
+    analysis_id = make_analysis(ml_image, annotations=[_ann("bounding_box", "car", 0.5)])
+    r = client.patch(f"/api/analyses/{analysis_id}/status", json={"status": "processing"})
+    assert r.status_code == 200, r.text
+    assert r.json()["status"] == "processing" and r.json()["annotations"] == []
+
+    r = client.post(f"/api/analyses/{analysis_id}/finalize", json={"status": "completed"})
+    assert r.status_code == 200, r.text
+    assert r.json()["status"] == "completed"
+
+    # The detail endpoint still returns the annotations themselves
+    assert len(client.get(f"/api/analyses/{analysis_id}").json()["annotations"]) == 1
@@ -0,0 +1,57 @@
+import pytest
+
+
+@pytest.fixture
+def analysis_id(ml_image, make_analysis):
+    return make_analysis(ml_image)
+
+
+def _boxes(n, label="car"):
+    return [
+        {"annotation_type": "bounding_box", "class_name": label, "confidence": 0.5, "data": {"x_min": i, "y_min": i, "x_max": i + 1, "y_max": i + 1}, "ordering": i}
+        for i in range(n)
+    ]
+
+
+def test_append_returns_ids_and_counts_only(client, analysis_id, no_hmac):
+    r = client.post(f"/api/analyses/{analysis_id}/annotations:bulk", json={"annotations": _boxes(3)})
+    assert r.status_code == 200, r.text
+    body = r.json()
+    assert (body["mode"], body["inserted"], body["deleted"], body["total"]) == ("append", 3, 0, 3)
+    assert len(set(body["ids"])) == 3
+    assert body["annotations"] is None
+
+    body = client.post(f"/api/analyses/{analysis_id}/annotations:bulk", json={"annotations": _boxes(2)}).json()
+    assert (body["inserted"], body["total"]) == (2, 5)
+    listed = client.get(f"/api/analyses/{analysis_id}/annotations").json()
+    assert listed["total"] == 5
+    assert set(body["ids"]) <= {a["id"] for a in listed["annotations"]}
+
+
+def test_replace_swaps_the_annotation_set(client, analysis_id, no_hmac):
+    client.post(f"/api/analyses/{analysis_id}/annotations:bulk", json={"annotations": _boxes(4)})
+    r = client.post(f"/api/analyses/{analysis_id}/annotations:bulk", json={"annotations": _boxes(2, "bus"), "mode": "replace"})
+    assert r.status_code == 200, r.text
+    body = r.json()
+    assert (body["inserted"], body["deleted"], body["total"]) == (2, 4, 2)
+    listed = client.get(f"/api/analyses/{analysis_id}/annotations").json()["annotations"]
+    assert sorted(a["id"] for a in listed) == sorted(body["ids"])
+    assert {a["class_name"] for a in listed} == {"bus"}
+
+    # Replacing with nothing clears the analysis
+    body = client.post(f"/api/analyses/{analysis_id}/annotations:bulk", json={"annotations": [], "mode": "replace"}).json()
+    assert (body["inserted"], body["deleted"], body["total"]) == (0, 2, 0)
+
+
+def test_include_annotations_echoes_this_batch(client, analysis_id, no_hmac):
+    client.post(f"/api/analyses/{analysis_id}/annotations:bulk", json={"annotations": _boxes(2)})
+    body = client.post(f"/api/analyses/{analysis_id}/annotations:bulk?include_annotations=true", json={"annotations": _boxes(1, "bike")}).json()
+    assert body["total"] == 3
+    assert [a["id"] for a in body["annotations"]] == body["ids"]
+    assert body["annotations"][0]["class_name"] == "bike"
+    assert body["annotations"][0]["data"] == {"x_min": 0, "y_min": 0, "x_max": 1, "y_max": 1}
+
+
+def test_unknown_mode_rejected(client, analysis_id, no_hmac):
+    r = client.post(f"/api/analyses/{analysis_id}/annotations:bulk", json={"annotations": _boxes(1), "mode": "merge"})
+    assert r.status_code == 422
@@ -0,0 +1,137 @@
+import hashlib
+import hmac
+import json
+import time
+
+import pytest
+
+from routers.ml_analyses import settings
+
+
+def _lines(n, label="car"):
+    return [
+        json.dumps({"annotation_type": "bounding_box", "class_name": label, "confidence": 0.5, "data": {"i": i}, "ordering": i})
+        for i in range(n)
+    ]
+
+
+def _body(lines):
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def _hmac_headers(body: bytes) -> dict:
+    ts = str(int(time.time()))
+    mac = hmac.new(settings.ML_CALLBACK_HMAC_SECRET.encode("utf-8"), ts.encode("utf-8") + b"." + body, hashlib.sha256)
+    return {"X-ML-Timestamp": ts, "X-ML-Signature": "sha256=" + mac.hexdigest(), "Content-Type": "application/x-ndjson"}
+
+
+def _chunks(body: bytes, size: int = 37):
+    # Split mid-line so the server has to reassemble lines across chunks
+    for i in range(0, len(body), size):
+        yield body[i:i + size]
+
+
+@pytest.fixture
+def analysis_id(client):
+    pid = client.post("/api/projects/", json={"name": "Ndjson", "description": None, "meta_group_id": "g"}).json()["id"]
+    image_id = client.post(f"/api/projects/{pid}/images", files={"file": ("n.png", b"\x89PNG\r\n", "image/png")}, data={"metadata": "{}"}).json()["id"]
+    r = client.post(f"/api/images/{image_id}/analyses", json={"image_id": image_id, "model_name": "yolo_v8", "model_version": "1"})
+    return r.json()["id"]
+
+
+def _count(client, analysis_id):
+    return client.get(f"/api/analyses/{analysis_id}/annotations?limit=1").json()["total"]
+
+
+def test_streamed_upload_in_batches_beyond_bulk_limit(client, analysis_id, monkeypatch):
+    monkeypatch.setattr(settings, "ML_NDJSON_BATCH_SIZE", 7)
+    monkeypatch.setattr(settings, "ML_MAX_BULK_ANNOTATIONS", 10)
+    body = _body(_lines(25))
+    r = client.post(f"/api/analyses/{analysis_id}/annotations:ndjson", content=_chunks(body), headers=_hmac_headers(body))
+    assert r.status_code == 200, r.text
+    result = r.json()
+    assert (result["inserted"], result["total"], result["ids"]) == (25, 25, None)
+    assert _count(client, analysis_id) == 25
+
+    body = _body(_lines(3, "bus"))
+    r = client.post(f"/api/analyses/{analysis_id}/annotations:ndjson?mode=replace", content=body, headers=_hmac_headers(body))
+    assert (r.json()["deleted"], r.json()["total"]) == (25, 3)
+    listed = client.get(f"/api/analyses/{analysis_id}/annotations").json()["annotations"]
+    assert {a["class_name"] for a in listed} == {"bus"}
+
+
+def test_bad_signature_commits_nothing(client, analysis_id):
+    body = _body(_lines(5))
+    headers = _hmac_headers(body)
+    headers["X-ML-Signature"] = "sha256=" + "0" * 64
+    r = client.post(f"/api/analyses/{analysis_id}/annotations:ndjson", content=_chunks(body), headers=headers)
+    assert r.status_code == 401
+    assert _count(client, analysis_id) == 0
+
+
+def test_invalid_line_rolls_back(client, analysis_id):
+    lines = _lines(3)
+    lines.insert(2, json.dumps({"annotation_type": "x", "data": {}}))
+    body = _body(lines)
+    r = client.post(f"/api/analyses/{analysis_id}/annotations:ndjson", content=body, headers=_hmac_headers(body))
+    assert r.status_code == 422
+    assert "line 3" in r.json()["detail"]
+    assert _count(client, analysis_id) == 0
+
+
+def test_overlong_line_and_wrong_content_type(client, analysis_id, monkeypatch):
+    monkeypatch.setattr(settings, "ML_NDJSON_MAX_LINE_BYTES", 64)
+    body = b'{"annotation_type": "bounding_box", "data": {"pad": "' + b"x" * 200 + b'"}}\n'
+    r = client.post(f"/api/analyses/{analysis_id}/annotations:ndjson", content=_chunks(body, 16), headers=_hmac_headers(body))
+    assert r.status_code == 413
+    headers = _hmac_headers(body)
+    headers["Content-Type"] = "application/json"
+    assert client.post(f"/api/analyses/{analysis_id}/annotations:ndjson", content=body, headers=headers).status_code == 415
+
+
+def test_api_ml_prefix_defers_hmac_to_the_stream(client, analysis_id):
+    api_key = client.post("/api/api-keys/", json={"name": "ndjson", "description": "stream"}).json()["key"]
+    body = _body(_lines(4))
+    headers = _hmac_headers(body)
+    headers["Authorization"] = f"Bearer {api_key}"
+    r = client.post(f"/api-ml/analyses/{analysis_id}/annotations:ndjson", content=_chunks(body), headers=headers)
+    assert r.status_code == 200, r.text
+    assert r.json()["inserted"] == 4
+
+    headers["X-ML-Signature"] = "sha256=" + "0" * 64
+    r = client.post(f"/api-ml/analyses/{analysis_id}/annotations:ndjson", content=_chunks(body), headers=headers)
+    assert r.status_code == 401
+    assert _count(client, analysis_id) == 4
+
+
+def test_slow_upload_outlasting_the_skew_window_still_commits(client, analysis_id, monkeypatch):
+    body = _body(_lines(6))
+    headers = _hmac_headers(body)
+    real_time = time.time
+
+    def slow_chunks():
+        for i, chunk in enumerate(_chunks(body)):
+            if i == 1:
+                # The clock passes the skew window while the body is still arriving
+                monkeypatch.setattr(time, "time", lambda: real_time() + settings.ML_HMAC_TIMESTAMP_SKEW_SECONDS + 60)
+            yield chunk
+
+    r = client.post(f"/api/analyses/{analysis_id}/annotations:ndjson", content=slow_chunks(), headers=headers)
+    assert r.status_code == 200, r.text
+    assert _count(client, analysis_id) == 6
+
+
+def test_stale_timestamp_is_rejected_before_reading(client, analysis_id):
+    body = _body(_lines(2))
+    headers = _hmac_headers(body)
+    headers["X-ML-Timestamp"] = str(int(time.time()) - settings.ML_HMAC_TIMESTAMP_SKEW_SECONDS - 60)
+    read = []
+
+    def tracked_chunks():
+        for chunk in _chunks(body):
+            read.append(chunk)
+            yield chunk
+
+    r = client.post(f"/api/analyses/{analysis_id}/annotations:ndjson", content=tracked_chunks(), headers=headers)
+    assert r.status_code == 401
+    assert read == [] and _count(client, analysis_id) == 0
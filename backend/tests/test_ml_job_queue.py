@@ -0,0 +1,126 @@
+import asyncio
+import hashlib
+import hmac
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import update
+
+from core import models
+from routers.ml_analyses import settings
+
+
+def _run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+def _signed(body: bytes = b"") -> dict:
+    ts = str(int(time.time()))
+    mac = hmac.new(settings.ML_CALLBACK_HMAC_SECRET.encode("utf-8"), ts.encode("utf-8") + b"." + body, hashlib.sha256)
+    return {"X-ML-Timestamp": ts, "X-ML-Signature": "sha256=" + mac.hexdigest()}
+
+
+def _claim(client, query):
+    with patch("utils.boto3_client.get_presigned_download_url", return_value="http://example/presigned"):
+        return client.post(f"/api/ml/jobs:claim?{query}", headers=_signed())
+
+
+async def _expire_leases(ids):
+    from tests.conftest import TestingSessionLocal
+    async with TestingSessionLocal() as db:
+        await db.execute(
+            update(models.MLAnalysis)
+            .where(models.MLAnalysis.id.in_([uuid.UUID(i) for i in ids]))
+            .values(lease_expires_at=datetime.now(timezone.utc) - timedelta(seconds=1))
+        )
+        await db.commit()
+
+
+@pytest.fixture
+def queued_analyses(client):
+    pr = client.post("/api/projects/", json={"name": "Queue", "description": None, "meta_group_id": "g"})
+    pid = pr.json()["id"]
+    ids = []
+    for priority in (0, 5, 1, 5):
+        ir = client.post(f"/api/projects/{pid}/images", files={"file": ("q.png", b"\x89PNG\r\n", "image/png")}, data={"metadata": "{}"})
+        image_id = ir.json()["id"]
+        ar = client.post(f"/api/images/{image_id}/analyses", json={
+            "image_id": image_id, "model_name": "yolo_v8", "model_version": "1", "priority": priority,
+        })
+        assert ar.status_code == 201, ar.text
+        ids.append(ar.json()["id"])
+    return pid, ids
+
+
+def test_claim_hands_out_jobs_by_priority_once(client, queued_analyses):
+    _, ids = queued_analyses
+    r = _claim(client, "model=yolo_v8&n=3&worker=w1")
+    assert r.status_code == 200, r.text
+    body = r.json()
+    assert body["worker"] == "w1"
+    claimed = [job["analysis"]["id"] for job in body["jobs"]]
+    # Priority 5 (oldest first), then priority 1
+    assert claimed == [ids[1], ids[3], ids[2]]
+    assert all(job["analysis"]["status"] == "processing" for job in body["jobs"])
+    assert body["jobs"][0]["image_url"] == "http://example/presigned"
+    assert body["jobs"][0]["filename"] == "q.png"
+
+    second = _claim(client, "model=yolo_v8&n=3&worker=w2").json()
+    assert [job["analysis"]["id"] for job in second["jobs"]] == [ids[0]]
+    assert _claim(client, "model=yolo_v8&n=3").json()["jobs"] == []
+    # Other models' queues are separate
+    assert _claim(client, "model=vgg16&n=3").json()["jobs"] == []
+
+
+def test_heartbeat_extends_only_own_lease(client, queued_analyses):
+    _, ids = queued_analyses
+    job = _claim(client, "model=yolo_v8&n=1&worker=w1").json()["jobs"][0]
+    analysis_id = job["analysis"]["id"]
+
+    r = client.post(f"/api/ml/jobs/{analysis_id}/heartbeat?worker=w1&lease_seconds=600", headers=_signed())
+    assert r.status_code == 200, r.text
+    assert r.json()["lease_expires_at"] > job["lease_expires_at"]
+
+    r = client.post(f"/api/ml/jobs/{analysis_id}/heartbeat?worker=w2", headers=_signed())
+    assert r.status_code == 409
+
+
+def test_expired_leases_return_to_queue(client, queued_analyses, monkeypatch):
+    _, ids = queued_analyses
+    monkeypatch.setattr(settings, "ML_JOB_MAX_ATTEMPTS", 2)
+    first = _claim(client, "model=yolo_v8&n=1&worker=w1").json()["jobs"][0]["analysis"]["id"]
+    assert first == ids[1]
+    _run(_expire_leases([first]))
+
+    # The lapsed job is claimable again, ahead of lower-priority work
+    again = _claim(client, "model=yolo_v8&n=1&worker=w2").json()["jobs"][0]["analysis"]["id"]
+    assert again == first
+    r = client.post(f"/api/ml/jobs/{first}/heartbeat?worker=w1", headers=_signed())
+    assert r.status_code == 409
+
+    # After ML_JOB_MAX_ATTEMPTS claims an expired job is failed instead of requeued
+    _run(_expire_leases([first]))
+    nxt = _claim(client, "model=yolo_v8&n=1&worker=w3").json()["jobs"][0]["analysis"]["id"]
+    assert nxt == ids[3]
+    detail = client.get(f"/api/analyses/{first}").json()
+    assert detail["status"] == "failed"
+    assert "Lease expired" in detail["error_message"]
+
+
+def test_expired_leases_are_swept_per_model(client, queued_analyses):
+    _, ids = queued_analyses
+    yolo = _claim(client, "model=yolo_v8&n=1&worker=w1").json()["jobs"][0]["analysis"]["id"]
+    _run(_expire_leases([yolo]))
+
+    # A claim for another model leaves the lapsed yolo_v8 lease alone
+    assert _claim(client, "model=vgg16&n=1").json()["jobs"] == []
+    assert client.get(f"/api/analyses/{yolo}").json()["status"] == "processing"
+    assert _claim(client, "model=yolo_v8&n=1&worker=w2").json()["jobs"][0]["analysis"]["id"] == yolo
+
+
+def test_claim_requires_hmac_and_allowed_model(client, queued_analyses):
+    assert client.post("/api/ml/jobs:claim?model=yolo_v8").status_code == 401
+    assert _claim(client, "model=not-a-model").status_code == 400
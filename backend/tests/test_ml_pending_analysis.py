@@ -0,0 +1,80 @@
+def _pending(client, project_id, **params):
+    r = client.get(f"/api/projects/{project_id}/images:pending-analysis", params={"model": "yolo_v8", **params})
+    assert r.status_code == 200, r.text
+    return [img["id"] for img in r.json()["items"]]
+
+
+def test_pending_analysis_is_an_anti_join(client, ml_project, make_image, make_analysis, no_hmac):
+    done = make_image("done.png")
+    queued = make_image("queued.png")
+    failed = make_image("failed.png")
+    other_model = make_image("other.png")
+    fresh = make_image("fresh.png")
+    make_analysis(done, status="completed")
+    make_analysis(queued)
+    make_analysis(failed, status="failed")
+    make_analysis(other_model, model_name="vgg16", status="completed")
+
+    assert _pending(client, ml_project) == [failed, other_model, fresh]
+    # skip_existing semantics of the pipeline scripts: only completed runs count
+    assert _pending(client, ml_project, status="completed") == [queued, failed, other_model, fresh]
+    # A different version has not been run anywhere
+    assert _pending(client, ml_project, version="2") == [done, queued, failed, other_model, fresh]
+
+    r = client.request("DELETE", f"/api/projects/{ml_project}/images/{fresh}", json={"reason": "cleanup test data"})
+    assert r.status_code == 200, r.text
+    assert fresh not in _pending(client, ml_project)
+
+
+def test_pending_analysis_pages(client, ml_project, make_image):
+    ids = [make_image(f"{i}.png") for i in range(5)]
+    seen, cursor = [], None
+    while True:
+        params = {"model": "yolo_v8", "limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        body = client.get(f"/api/projects/{ml_project}/images:pending-analysis", params=params).json()
+        seen += [img["id"] for img in body["items"]]
+        cursor = body["next_cursor"]
+        if not cursor:
+            break
+    assert seen == ids
+
+
+def _bulk(client, project_id, **payload):
+    return client.post(f"/api/projects/{project_id}/analyses:bulk-status", json=payload)
+
+
+def test_bulk_cancel_queued(client, ml_project, make_image, make_analysis, no_hmac):
+    image_id = make_image("a.png")
+    queued = [make_analysis(image_id) for _ in range(3)]
+    make_analysis(image_id, status="completed")
+
+    r = _bulk(client, ml_project, dry_run=True)
+    assert r.status_code == 200, r.text
+    assert r.json()["matched"] == 3 and r.json()["dry_run"] is True
+    assert {a["status"] for a in r.json()["analyses"]} == {"queued"}
+
+    # Nothing has been idle for an hour yet
+    assert _bulk(client, ml_project, older_than_seconds=3600).json()["matched"] == 0
+
+    body = _bulk(client, ml_project, limit=2).json()
+    assert [a["id"] for a in body["analyses"]] == queued[:2]
+    assert {a["status"] for a in body["analyses"]} == {"canceled"}
+    statuses = {a["id"]: a["status"] for a in client.get(f"/api/images/{image_id}/analyses").json()["analyses"]}
+    assert sorted(statuses.values()) == ["canceled", "canceled", "completed", "queued"]
+
+
+def test_bulk_requeue_resets_failed_runs(client, ml_project, make_image, make_analysis, no_hmac):
+    image_id = make_image("a.png")
+    failed = make_analysis(image_id, status="failed")
+    other_project = client.post("/api/projects/", json={"name": "Other", "description": None, "meta_group_id": "g"}).json()["id"]
+    elsewhere = make_analysis(make_image("b.png", project_id=other_project), status="failed")
+
+    body = _bulk(client, ml_project, status_from="failed", status_to="queued").json()
+    assert [a["id"] for a in body["analyses"]] == [failed]
+    requeued = client.get(f"/api/analyses/{failed}").json()
+    assert (requeued["status"], requeued["started_at"], requeued["completed_at"]) == ("queued", None, None)
+    assert client.get(f"/api/analyses/{elsewhere}").json()["status"] == "failed"
+
+    assert _bulk(client, ml_project, status_from="completed", status_to="queued").status_code == 409
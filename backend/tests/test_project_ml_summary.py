@@ -0,0 +1,65 @@
+def _boxes(n):
+    return [{"annotation_type": "bounding_box", "class_name": "car", "confidence": 0.5, "data": {}} for _ in range(n)]
+
+
+def test_latest_analysis_per_model_for_each_image(client, ml_project, make_image, make_analysis, no_hmac):
+    first = make_image("a.png")
+    second = make_image("b.png")
+    untouched = make_image("c.png")
+    make_analysis(first, "yolo_v8", annotations=_boxes(4))
+    newest = make_analysis(first, "yolo_v8", annotations=_boxes(2))
+    client.patch(f"/api/analyses/{newest}/status", json={"status": "processing"})
+    vgg = make_analysis(first, "vgg16")
+    other = make_analysis(second, "yolo_v8", annotations=_boxes(1))
+
+    r = client.get(f"/api/projects/{ml_project}/ml-summary")
+    assert r.status_code == 200, r.text
+    items = {i["image_id"]: i["models"] for i in r.json()["items"]}
+    assert list(items) == [first, second, untouched]
+    assert [(m["model_name"], m["analysis_id"], m["status"], m["annotation_count"]) for m in items[first]] == [
+        ("vgg16", vgg, "queued", 0),
+        ("yolo_v8", newest, "processing", 2),
+    ]
+    assert [(m["analysis_id"], m["annotation_count"]) for m in items[second]] == [(other, 1)]
+    assert items[untouched] == []
+
+    only_yolo = client.get(f"/api/projects/{ml_project}/ml-summary", params={"model_name": "yolo_v8"}).json()["items"]
+    assert [m["model_name"] for m in only_yolo[0]["models"]] == ["yolo_v8"]
+
+
+def test_summary_accepts_listing_filters(client, ml_project, make_image, make_analysis):
+    cat = make_image("cat.png", {"label": "cat"})
+    make_image("dog.png", {"label": "dog"})
+    gone = make_image("gone.png")
+    make_analysis(cat, "yolo_v8")
+    client.request("DELETE", f"/api/projects/{ml_project}/images/{gone}", json={"reason": "cleanup test data"})
+
+    for params in ({"filter": "meta.label=cat"}, {"search_field": "label", "search_value": "dog"}, {"deleted_only": "true"}, {"include_deleted": "true"}):
+        listing = client.get(f"/api/projects/{ml_project}/images:page", params=params).json()["items"]
+        summary = client.get(f"/api/projects/{ml_project}/ml-summary", params=params).json()["items"]
+        assert [i["image_id"] for i in summary] == [img["id"] for img in listing]
+    assert [i["image_id"] for i in client.get(f"/api/projects/{ml_project}/ml-summary", params={"filter": "meta.label=cat"}).json()["items"]] == [cat]
+    assert client.get(f"/api/projects/{ml_project}/ml-summary", params={"filter": "bogus=1"}).status_code == 400
+
+
+def test_pages_follow_the_image_listing(client, ml_project, make_image, make_analysis):
+    ids = [make_image(f"{i}.png") for i in range(5)]
+    for image_id in ids:
+        make_analysis(image_id, "yolo_v8")
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2, "order": "desc"}
+        if cursor:
+            params["cursor"] = cursor
+        body = client.get(f"/api/projects/{ml_project}/ml-summary", params=params).json()
+        assert all(len(item["models"]) == 1 for item in body["items"])
+        seen += [item["image_id"] for item in body["items"]]
+        cursor = body["next_cursor"]
+        if not cursor:
+            break
+    listing = client.get(f"/api/projects/{ml_project}/images:page", params={"order": "desc", "limit": 10}).json()["items"]
+    assert seen == [img["id"] for img in listing]
+
+    assert client.get(f"/api/projects/{ml_project}/ml-summary", params={"sort": "size"}).status_code == 400
+    assert client.get(f"/api/projects/{ml_project}/ml-summary", params={"cursor": "bogus"}).status_code == 400
@@ -0,0 +1,74 @@
+import csv
+import io
+import pytest
+from utils.cache_manager import get_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    import utils.cache_manager as cm
+    cm._cache_manager = None
+    get_cache().clear()
+    yield
+    get_cache().clear()
+    cm._cache_manager = None
+
+
+def _setup_project(client, images=3):
+    pid = client.post("/api/projects/", json={"name": "Report", "description": "d", "meta_group_id": "g"}).json()["id"]
+    ids = []
+    for i in range(images):
+        r = client.post(f"/api/projects/{pid}/images", files={"file": (f"r{i}.png", io.BytesIO(b"x" * (i + 1)), "image/png")})
+        ids.append(r.json()["id"])
+    class_id = client.post(f"/api/projects/{pid}/classes", json={"name": "=cat", "description": None, "project_id": pid}).json()["id"]
+    client.post(f"/api/images/{ids[0]}/classifications", json={"image_id": ids[0], "class_id": class_id})
+    client.post(f"/api/images/{ids[0]}/comments", json={"text": "first"})
+    if len(ids) > 1:
+        client.post(f"/api/images/{ids[1]}/comments", json={"text": "second"})
+    return pid, ids
+
+
+def test_json_report_batches_images_comments_and_classifications(client, monkeypatch):
+    monkeypatch.setattr("utils.project_report.settings.REPORT_BATCH_SIZE", 2)
+    pid, ids = _setup_project(client)
+    r = client.get(f"/api/projects/{pid}/report")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("application/json")
+    report = r.json()
+    assert report["project"]["id"] == pid
+    assert report["stats"]["image_count"] == 3
+    assert [img["id"] for img in report["images"]] == ids
+    first = report["images"][0]
+    assert [c["class_name"] for c in first["classifications"]] == ["=cat"]
+    assert [c["text"] for c in first["comments"]] == ["first"]
+    assert first["comments"][0]["author_email"]
+    assert report["images"][2]["comments"] == []
+
+
+def test_csv_report_escapes_formulas(client):
+    pid, ids = _setup_project(client, images=1)
+    r = client.get(f"/api/projects/{pid}/report?format=csv")
+    assert r.status_code == 200
+    assert "attachment" in r.headers["content-disposition"]
+    rows = list(csv.reader(io.StringIO(r.text)))
+    assert rows[0][0] == "Image ID"
+    assert rows[1][0] == ids[0]
+    assert rows[1][6] == "1"
+    assert rows[1][8] == "'=cat"
+
+
+def test_report_cached_until_project_changes(client):
+    pid, ids = _setup_project(client, images=1)
+    first = client.get(f"/api/projects/{pid}/report").json()
+    cache = get_cache()
+    assert cache.get(f"project_report:{pid}:json") is not None
+
+    client.post(f"/api/images/{ids[0]}/comments", json={"text": "later"})
+    assert cache.get(f"project_report:{pid}:json") is None
+    second = client.get(f"/api/projects/{pid}/report").json()
+    assert len(second["images"][0]["comments"]) == len(first["images"][0]["comments"]) + 1
+
+
+def test_report_rejects_unknown_format(client):
+    pid, _ = _setup_project(client, images=1)
+    assert client.get(f"/api/projects/{pid}/report?format=xml").status_code == 422
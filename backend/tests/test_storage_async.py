@@ -0,0 +1,149 @@
+import asyncio
+import io
+import threading
+from datetime import datetime, timezone
+import pytest
+from botocore.exceptions import ClientError
+import utils.boto3_client as storage
+
+
+class FakeBody:
+    def __init__(self, data):
+        self._buf = io.BytesIO(data)
+        self.closed = False
+
+    def read(self, n=-1):
+        return self._buf.read(n)
+
+    def close(self):
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *a):
+        self.close()
+
+
+LAST_MODIFIED = datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+
+
+class FakeS3:
+    """Minimal in-memory stand-in for the boto3 S3 client."""
+
+    def __init__(self, upload_barrier=None):
+        self.objects = {}
+        self.upload_barrier = upload_barrier
+        self.get_calls = 0
+
+    def _missing(self, op):
+        return ClientError({"Error": {"Code": "NoSuchKey", "Message": "missing"}}, op)
+
+    def upload_fileobj(self, fileobj, bucket, key, ExtraArgs=None):
+        if self.upload_barrier:
+            # Only passes if all uploads are in flight at the same time
+            self.upload_barrier.wait(timeout=5)
+        self.objects[(bucket, key)] = (fileobj.read(), (ExtraArgs or {}).get("ContentType"))
+
+    def get_object(self, Bucket, Key, Range=None):
+        if (Bucket, Key) not in self.objects:
+            raise self._missing("GetObject")
+        data, content_type = self.objects[(Bucket, Key)]
+        self.get_calls += 1
+        response = {"ContentType": content_type, "ETag": '"abc"', "LastModified": LAST_MODIFIED}
+        if Range:
+            start, end = Range.removeprefix("bytes=").split("-")
+            response["ContentRange"] = f"bytes {start}-{end}/{len(data)}"
+            data = data[int(start):int(end) + 1]
+        response["ContentLength"] = len(data)
+        response["Body"] = FakeBody(data)
+        return response
+
+    def head_object(self, Bucket, Key):
+        if (Bucket, Key) not in self.objects:
+            raise ClientError({"Error": {"Code": "404", "Message": "Not Found"}}, "HeadObject")
+        data, content_type = self.objects[(Bucket, Key)]
+        return {"ContentLength": len(data), "ContentType": content_type, "ETag": '"abc"', "LastModified": LAST_MODIFIED}
+
+    def delete_object(self, Bucket, Key):
+        self.objects.pop((Bucket, Key), None)
+
+
+@pytest.fixture
+def fake_s3(monkeypatch):
+    fake = FakeS3()
+    monkeypatch.setattr(storage, "boto3_client", fake)
+    yield fake
+    storage.shutdown_storage_pool()
+
+
+def test_upload_head_download_delete_roundtrip(fake_s3):
+    async def scenario():
+        assert await storage.upload_file_to_s3("b", "k", io.BytesIO(b"hello world"), 11, "text/plain")
+        head = await storage.head_object_s3("b", "k")
+        assert head["content_length"] == 11
+        assert head["content_type"] == "text/plain"
+        assert await storage.download_file_from_s3("b", "k") == b"hello world"
+        assert await storage.delete_file_from_s3("b", "k")
+        assert await storage.head_object_s3("b", "k") is None
+        assert await storage.download_file_from_s3("b", "k") is None
+
+    asyncio.run(scenario())
+
+
+def test_open_object_stream_reads_range_in_chunks(fake_s3, monkeypatch):
+    monkeypatch.setattr(storage.settings, "S3_STREAM_CHUNK_BYTES", 4)
+    fake_s3.objects[("b", "k")] = (b"0123456789", "application/octet-stream")
+
+    async def scenario():
+        stream = await storage.open_object_stream("b", "k", byte_range="bytes=2-8")
+        chunks = [chunk async for chunk in stream.iter_chunks()]
+        assert chunks == [b"2345", b"678"]
+        assert stream.content_range == "bytes 2-8/10"
+        assert stream._body.closed
+        with pytest.raises(ClientError):
+            await storage.open_object_stream("b", "missing")
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_uploads_do_not_serialise(monkeypatch):
+    uploads = 8
+    fake = FakeS3(upload_barrier=threading.Barrier(uploads))
+    monkeypatch.setattr(storage, "boto3_client", fake)
+    monkeypatch.setattr(storage.settings, "S3_MAX_POOL_CONNECTIONS", uploads)
+    storage.shutdown_storage_pool()
+
+    async def scenario():
+        results = await asyncio.gather(*[
+            storage.upload_file_to_s3("b", f"k{i}", io.BytesIO(b"x"), 1) for i in range(uploads)
+        ])
+        assert all(results)
+
+    try:
+        asyncio.run(scenario())
+        assert len(fake.objects) == uploads
+    finally:
+        storage.shutdown_storage_pool()
+
+
+def test_thumbnail_fallback_reads_original_through_storage_pool(client, fake_s3, monkeypatch):
+    from PIL import Image
+
+    def no_presign(*a, **kw):
+        raise AssertionError("thumbnail fallback must not presign")
+
+    monkeypatch.setattr("routers.images.get_presigned_download_url", no_presign)
+    pr = client.post("/api/projects/", json={"name": "Pool", "description": None, "meta_group_id": "g"})
+    buf = io.BytesIO()
+    Image.new("RGB", (32, 32), (0, 128, 255)).save(buf, format="PNG")
+    ur = client.post(f"/api/projects/{pr.json()['id']}/images", files={"file": ("p.png", io.BytesIO(buf.getvalue()), "image/png")})
+    image = ur.json()
+    # The original lands in storage only after upload, so no derivatives exist and the resize fallback runs
+    fake_s3.objects[(storage.settings.S3_BUCKET, image["object_storage_key"])] = (buf.getvalue(), "image/png")
+    reads = fake_s3.get_calls
+
+    r = client.get(f"/api/images/{image['id']}/thumbnail?width=16&height=16")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("image/")
+    assert fake_s3.get_calls == reads + 1
@@ -0,0 +1,89 @@
+"""
+Typed bounding-box columns derived from free-form annotation payloads.
+
+Pipelines describe boxes in a few shapes (see docs/api-ml-guide.md and the
+frontend BoundingBoxOverlay):
+
+- ``{"bbox": [x, y, w, h], "format": "xywh"}`` (format defaults to xywh)
+- ``{"bbox": [x1, y1, x2, y2], "format": "xyxy"}``
+- ``"xywhn"`` / ``"xyxyn"`` formats, or ``"normalized": true``, for 0..1 coordinates
+- ``{"x_min", "y_min", "x_max", "y_max"}`` or ``{"left", "top", "right", "bottom"}``
+
+plus optional ``image_width`` / ``image_height``. ``bbox_columns`` turns these
+into the pixel box (x, y, w, h), the image size, and the box normalised to
+0..1, so class/confidence/region searches can use plain indexed columns
+instead of parsing JSON. Anything it does not recognise yields all None.
+"""
+
+from typing import Any, Dict, Optional
+
+BBOX_COLUMNS = (
+    "bbox_x", "bbox_y", "bbox_w", "bbox_h",
+    "image_width", "image_height",
+    "norm_x_min", "norm_y_min", "norm_x_max", "norm_y_max",
+)
+
+
+def _number(value: Any) -> Optional[float]:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return float(value)
+
+
+def _dimension(value: Any) -> Optional[int]:
+    number = _number(value)
+    if number is None or number <= 0:
+        return None
+    return int(number)
+
+
+def _corners(data: Dict[str, Any]):
+    """(x_min, y_min, x_max, y_max, normalized) from a payload, or None."""
+    fmt = str(data.get("format") or "xywh").lower()
+    normalized = fmt.endswith("n") or data.get("normalized") is True
+    bbox = data.get("bbox")
+    if isinstance(bbox, (list, tuple)) and len(bbox) == 4:
+        values = [_number(v) for v in bbox]
+        if any(v is None for v in values):
+            return None
+        a, b, c, d = values
+        if fmt.startswith("xyxy"):
+            return a, b, c, d, normalized
+        return a, b, a + c, b + d, normalized
+    for keys in (("x_min", "y_min", "x_max", "y_max"), ("left", "top", "right", "bottom")):
+        if all(k in data for k in keys):
+            values = [_number(data[k]) for k in keys]
+            if any(v is None for v in values):
+                return None
+            return (*values, normalized)
+    return None
+
+
+def bbox_columns(data: Any) -> Dict[str, Optional[float]]:
+    """Values for the MLAnnotation typed box columns, keyed by column name."""
+    columns: Dict[str, Optional[float]] = dict.fromkeys(BBOX_COLUMNS)
+    if not isinstance(data, dict):
+        return columns
+    width = _dimension(data.get("image_width"))
+    height = _dimension(data.get("image_height"))
+    columns["image_width"], columns["image_height"] = width, height
+    corners = _corners(data)
+    if corners is None:
+        return columns
+    x_min, y_min, x_max, y_max, normalized = corners
+    x_min, x_max = min(x_min, x_max), max(x_min, x_max)
+    y_min, y_max = min(y_min, y_max), max(y_min, y_max)
+
+    if normalized:
+        norm = (x_min, y_min, x_max, y_max)
+        pixels = (x_min * width, y_min * height, x_max * width, y_max * height) if width and height else None
+    else:
+        pixels = (x_min, y_min, x_max, y_max)
+        norm = (x_min / width, y_min / height, x_max / width, y_max / height) if width and height else None
+
+    if pixels is not None:
+        px_min, py_min, px_max, py_max = pixels
+        columns.update(bbox_x=px_min, bbox_y=py_min, bbox_w=px_max - px_min, bbox_h=py_max - py_min)
+    if norm is not None:
+        columns.update(zip(("norm_x_min", "norm_y_min", "norm_x_max", "norm_y_max"), norm))
+    return columns
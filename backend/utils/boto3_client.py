@@ -1,6 +1,12 @@
 import os
+import asyncio
+import functools
+import threading
 import boto3
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Dict, Optional
+from botocore.config import Config
 from botocore.exceptions import ClientError
 from core.config import settings
 from datetime import timedelta
@@ -44,7 +50,14 @@ else:
             aws_access_key_id=settings.S3_ACCESS_KEY,
             aws_secret_access_key=settings.S3_SECRET_KEY,
             region_name=S3_REGION,
-            config=boto3.session.Config(signature_version='s3v4', s3={'addressing_style': 'path'})
+            config=Config(
+                signature_version='s3v4',
+                s3={'addressing_style': 'path'},
+                max_pool_connections=settings.S3_MAX_POOL_CONNECTIONS,
+                connect_timeout=settings.S3_CONNECT_TIMEOUT_SECONDS,
+                read_timeout=settings.S3_READ_TIMEOUT_SECONDS,
+                retries={'max_attempts': 3, 'mode': 'standard'},
+            )
         )
         # print("Boto3 S3 client initialized successfully")
     except ClientError as e:
@@ -109,6 +122,69 @@ else:
             logger.warning("MinIO/S3 server refused connection - may still be starting")
 
 
+# Storage I/O pool.
+# boto3 clients are thread-safe and keep up to S3_MAX_POOL_CONNECTIONS keep-alive
+# connections, so running blocking calls on a pool of the same size lets
+# concurrent requests each use their own connection without stalling the event loop.
+_storage_executor: Optional[ThreadPoolExecutor] = None
+_storage_executor_lock = threading.Lock()
+
+
+def start_storage_pool() -> ThreadPoolExecutor:
+    """Get or create the shared storage I/O pool (thread-safe)."""
+    global _storage_executor
+    if _storage_executor is None:
+        with _storage_executor_lock:
+            if _storage_executor is None:
+                _storage_executor = ThreadPoolExecutor(
+                    max_workers=settings.S3_MAX_POOL_CONNECTIONS,
+                    thread_name_prefix="s3-io",
+                )
+    return _storage_executor
+
+
+def shutdown_storage_pool():
+    """Shut down the shared storage I/O pool, if one was created."""
+    global _storage_executor
+    with _storage_executor_lock:
+        if _storage_executor is not None:
+            _storage_executor.shutdown(wait=False)
+            _storage_executor = None
+
+
+async def _run_storage(fn, *args, **kwargs) -> Any:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(start_storage_pool(), functools.partial(fn, *args, **kwargs))
+
+
+class ObjectStream:
+    """An open object body, read chunk by chunk on the storage pool."""
+
+    def __init__(self, response: Dict[str, Any], chunk_size: int):
+        self._body = response['Body']
+        self.chunk_size = chunk_size
+        self.content_length = response.get('ContentLength')
+        self.content_type = response.get('ContentType') or 'application/octet-stream'
+        self.content_range = response.get('ContentRange')
+        self.etag = response.get('ETag')
+        self.last_modified = response.get('LastModified')
+
+    async def iter_chunks(self) -> AsyncIterator[bytes]:
+        try:
+            while True:
+                chunk = await _run_storage(self._body.read, self.chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            # Returns the connection to the pool even if the client disconnects mid-stream
+            self._body.close()
+
+    async def aclose(self):
+        """Release the connection without reading the body."""
+        self._body.close()
+
+
 def ensure_bucket_exists(client, bucket_name: str):
     if not client:
         logger.error("Boto3 S3 client not initialized")
@@ -208,7 +284,8 @@ async def upload_file_to_s3(
             })
         
         # Stream upload to S3 without buffering whole file in memory
-        boto3_client.upload_fileobj(
+        await _run_storage(
+            boto3_client.upload_fileobj,
             file_data,
             bucket_name,
             object_name,
@@ -239,6 +316,74 @@ async def upload_file_to_s3(
         })
         return False
 
+def _read_object(bucket_name: str, object_name: str) -> bytes:
+    response = boto3_client.get_object(Bucket=bucket_name, Key=object_name)
+    with response['Body'] as body:
+        return body.read()
+
+async def download_file_from_s3(bucket_name: str, object_name: str) -> bytes | None:
+    """Read a whole object into memory. Returns None if the client is unavailable or the read fails."""
+    if not boto3_client:
+        logger.error("Boto3 S3 client not initialized, cannot download object")
+        return None
+    try:
+        return await _run_storage(_read_object, bucket_name, object_name)
+    except ClientError as e:
+        logger.error("S3 error downloading object", extra={
+            "object_name": sanitize_for_log(object_name),
+            "bucket": sanitize_for_log(bucket_name),
+            "error": str(e)
+        })
+        return None
+    except Exception as e:
+        logger.error("Unexpected error downloading object", extra={
+            "object_name": sanitize_for_log(object_name),
+            "bucket": sanitize_for_log(bucket_name),
+            "error": str(e),
+            "error_type": type(e).__name__
+        })
+        return None
+
+async def open_object_stream(bucket_name: str, object_name: str, byte_range: Optional[str] = None) -> ObjectStream:
+    """
+    Open an object for streaming. byte_range is an HTTP Range value such as "bytes=0-1023".
+
+    Raises:
+        RuntimeError: If the S3 client is not initialized
+        ClientError: If the object cannot be read (e.g. NoSuchKey, InvalidRange)
+    """
+    if not boto3_client:
+        raise RuntimeError("Boto3 S3 client not initialized")
+    params = {'Bucket': bucket_name, 'Key': object_name}
+    if byte_range:
+        params['Range'] = byte_range
+    response = await _run_storage(boto3_client.get_object, **params)
+    return ObjectStream(response, settings.S3_STREAM_CHUNK_BYTES)
+
+async def head_object_s3(bucket_name: str, object_name: str) -> Dict[str, Any] | None:
+    """Fetch object size/type/ETag/Last-Modified. Returns None if missing or on error."""
+    if not boto3_client:
+        logger.error("Boto3 S3 client not initialized, cannot head object")
+        return None
+    try:
+        response = await _run_storage(boto3_client.head_object, Bucket=bucket_name, Key=object_name)
+    except ClientError as e:
+        error_code = e.response.get('Error', {}).get('Code')
+        if error_code not in ('NoSuchKey', '404'):
+            logger.error("S3 error reading object head", extra={
+                "object_name": sanitize_for_log(object_name),
+                "bucket": sanitize_for_log(bucket_name),
+                "error": str(e)
+            })
+        return None
+    return {
+        "content_length": response.get('ContentLength'),
+        "content_type": response.get('ContentType'),
+        "etag": response.get('ETag'),
+        "last_modified": response.get('LastModified'),
+    }
+
+# Presigning is computed locally by botocore (no network round trip), so it stays synchronous.
 def get_presigned_download_url(bucket_name: str, object_name: str, expires_delta: timedelta = timedelta(hours=1)) -> str | None:
     if not boto3_client:
         logger.error("Boto3 S3 client not initialized, cannot generate URL")
@@ -324,13 +469,13 @@ def get_presigned_upload_url(bucket_name: str, object_name: str, expires_delta:
         return None
 
 
-def delete_file_from_s3(bucket_name: str, object_name: str) -> bool:
+async def delete_file_from_s3(bucket_name: str, object_name: str) -> bool:
     """Delete an object from S3/MinIO. Returns True if deleted or object missing, False on error."""
     if not boto3_client:
         logger.error("Boto3 S3 client not initialized, cannot delete object")
         return False
     try:
-        boto3_client.delete_object(Bucket=bucket_name, Key=object_name)
+        await _run_storage(boto3_client.delete_object, Bucket=bucket_name, Key=object_name)
         logger.info("Deleted object from bucket", extra={
             "object_name": sanitize_for_log(object_name),
             "bucket": sanitize_for_log(bucket_name)
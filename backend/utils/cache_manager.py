@@ -1,14 +1,53 @@
 import os
+import asyncio
+import secrets
 from pathlib import Path
-from typing import Optional, Any
+from typing import Optional, Any, Awaitable, Callable, Dict
 from diskcache import Cache
 from core.config import settings
 
+# Key namespaces that are tagged for invalidation.
+# A key "<namespace>:<id>:..." belongs to tag "<kind>:<id>", e.g.
+# "thumbnail:<image_id>:w:200:h:200" -> "image:<image_id>".
+TAG_NAMESPACES = {
+    "project_images": "project",
+    "project_report": "project",
+    "image": "image",
+    "thumbnail": "image",
+}
+
+_GENERATION_KEY_PREFIX = "__generation__:"
+_MISSING = object()
+
+
+def tag_for_key(key: str) -> Optional[str]:
+    """Return the invalidation tag for a cache key, or None if the key is untagged."""
+    namespace, sep, rest = key.partition(":")
+    kind = TAG_NAMESPACES.get(namespace)
+    if kind is None or not sep:
+        return None
+    ident = rest.split(":", 1)[0]
+    return f"{kind}:{ident}" if ident else None
+
+
 class CacheManager:
-    """Simple wrapper around diskcache with project-specific configuration."""
+    """Simple wrapper around diskcache with project-specific configuration.
+
+    Keys in a tagged namespace (see TAG_NAMESPACES) are stored under the current
+    generation of their tag. Invalidating a tag bumps its generation, which makes
+    every entry written under the old generation unreachable in O(1); the orphaned
+    entries age out through expiry and LRU eviction.
+
+    get_or_compute() adds single-flight coalescing: concurrent misses for the same
+    key share one computation instead of each doing the same work.
+    """
     
     def __init__(self):
         import tempfile
+
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._computed = 0
+        self._coalesced = 0
         
         # In testing/CI environments, prefer temp directory for cache
         if os.getenv('CI') or os.getenv('PYTEST_CURRENT_TEST'):
@@ -34,31 +73,130 @@ class CacheManager:
             self._memory_cache = {}
             self.cache = None
     
+    def _generation(self, tag: str) -> str:
+        """Return the current generation token for a tag, creating one if missing.
+
+        A missing token (never set, or evicted by LRU) is replaced with a fresh
+        one rather than a fixed default, so evicting a counter can never make
+        entries from an older generation reachable again.
+        """
+        gen_key = _GENERATION_KEY_PREFIX + tag
+        if self.cache is not None:
+            generation = self.cache.get(gen_key)
+            if generation is None:
+                self.cache.add(gen_key, secrets.token_hex(8))
+                generation = self.cache.get(gen_key)
+            return generation
+        return self._memory_cache.setdefault(gen_key, secrets.token_hex(8))
+
+    def _physical_key(self, key: str) -> str:
+        tag = tag_for_key(key)
+        if tag is None:
+            return key
+        return f"{key}@{self._generation(tag)}"
+
     def set(self, key: str, value: Any, expire: Optional[float] = None):
         """Set a cache entry with optional expiration in seconds."""
+        physical_key = self._physical_key(key)
         if self.cache is not None:
-            return self.cache.set(key, value, expire=expire)
+            return self.cache.set(physical_key, value, expire=expire)
         else:
             # Simple in-memory cache without expiration for testing
-            self._memory_cache[key] = value
+            self._memory_cache[physical_key] = value
             return True
     
     def get(self, key: str, default: Any = None) -> Any:
         """Get a cache entry, return default if not found."""
+        return self._get_physical(self._physical_key(key), default)
+
+    def pin(self, key: str) -> str:
+        """Resolve key to its current generation.
+
+        For values built over time (e.g. streamed responses): write them with
+        set_pinned() so an invalidation that happens mid-build leaves the value
+        in the old, unreachable generation instead of the new one.
+        """
+        return self._physical_key(key)
+
+    def get_pinned(self, pinned_key: str, default: Any = None) -> Any:
+        return self._get_physical(pinned_key, default)
+
+    def set_pinned(self, pinned_key: str, value: Any, expire: Optional[float] = None):
         if self.cache is not None:
-            return self.cache.get(key, default)
-        else:
-            return self._memory_cache.get(key, default)
+            return self.cache.set(pinned_key, value, expire=expire)
+        self._memory_cache[pinned_key] = value
+        return True
     
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[Any]], expire: Optional[float] = None) -> Any:
+        """Return the cached value for key, computing and caching it on a miss.
+
+        Concurrent callers that miss on the same key await a single in-flight
+        computation. The computation runs as its own task, so a caller that
+        disconnects does not cancel it for the others. Exceptions are shared
+        with every waiter and nothing is cached.
+
+        Because the computation can outlive the request that started it,
+        compute must not use request-scoped resources such as the request's
+        database session; open a dedicated one inside compute instead.
+        """
+        physical_key = self._physical_key(key)
+        value = self._get_physical(physical_key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        # Keyed by physical key: callers arriving after an invalidation start a
+        # fresh computation, and a computation that started before it writes
+        # into the old (now unreachable) generation.
+        task = self._inflight.get(physical_key)
+        if task is None:
+            task = asyncio.ensure_future(self._compute_and_store(physical_key, compute, expire))
+            self._inflight[physical_key] = task
+            task.add_done_callback(lambda _t: self._inflight.pop(physical_key, None))
+        else:
+            self._coalesced += 1
+        return await asyncio.shield(task)
+
+    async def _compute_and_store(self, physical_key: str, compute: Callable[[], Awaitable[Any]], expire: Optional[float]) -> Any:
+        value = await compute()
+        self._computed += 1
+        self.set_pinned(physical_key, value, expire=expire)
+        return value
+
+    def _get_physical(self, physical_key: str, default: Any) -> Any:
+        if self.cache is not None:
+            return self.cache.get(physical_key, default)
+        return self._memory_cache.get(physical_key, default)
+
     def delete(self, key: str) -> bool:
         """Delete a cache entry."""
+        physical_key = self._physical_key(key)
+        if self.cache is not None:
+            return self.cache.delete(physical_key)
+        else:
+            return self._memory_cache.pop(physical_key, None) is not None
+
+    def invalidate_tag(self, tag: str):
+        """Invalidate every entry under a tag (e.g. "project:<id>", "image:<id>") in O(1)."""
+        gen_key = _GENERATION_KEY_PREFIX + tag
+        generation = secrets.token_hex(8)
         if self.cache is not None:
-            return self.cache.delete(key)
+            self.cache.set(gen_key, generation)
         else:
-            return self._memory_cache.pop(key, None) is not None
+            self._memory_cache[gen_key] = generation
+
+    def invalidate_project(self, project_id: Any):
+        """Invalidate cached image listings and reports for a project."""
+        self.invalidate_tag(f"project:{project_id}")
+
+    def invalidate_image(self, image_id: Any):
+        """Invalidate cached metadata and thumbnails for an image."""
+        self.invalidate_tag(f"image:{image_id}")
     
     def clear_pattern(self, pattern: str):
-        """Clear all cache entries whose keys contain the pattern."""
+        """Clear all cache entries whose keys contain the pattern.
+
+        Scans the whole keyspace; prefer invalidate_tag() for tagged namespaces.
+        """
         if self.cache is not None:
             keys_to_delete = []
             for key in self.cache:
@@ -79,6 +217,14 @@ class CacheManager:
         else:
             self._memory_cache.clear()
     
+    def single_flight_stats(self) -> dict:
+        """Computations run vs. duplicate computations suppressed by get_or_compute()."""
+        return {
+            'computed': self._computed,
+            'coalesced': self._coalesced,
+            'in_flight': len(self._inflight),
+        }
+
     def stats(self) -> dict:
         """Get cache statistics."""
         if self.cache is not None:
@@ -90,7 +236,8 @@ class CacheManager:
                 'size_mb': round(volume / (1024 * 1024), 2),
                 'limit_mb': settings.CACHE_SIZE_MB,
                 'usage_percent': round((volume / size_limit) * 100, 2) if size_limit > 0 else 0,
-                'count': len(self.cache)
+                'count': len(self.cache),
+                'single_flight': self.single_flight_stats(),
             }
         else:
             return {
@@ -98,7 +245,8 @@ class CacheManager:
                 'size_mb': 0,
                 'limit_mb': settings.CACHE_SIZE_MB,
                 'usage_percent': 0,
-                'count': len(self._memory_cache)
+                'count': len(self._memory_cache),
+                'single_flight': self.single_flight_stats(),
             }
 
 import threading
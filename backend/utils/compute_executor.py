@@ -0,0 +1,162 @@
+"""
+Bounded executor for CPU-heavy work (image decode/resize, etc.).
+
+Keeps PIL and similar work off the event loop. The executor is either a thread
+pool (Pillow releases the GIL for decode/resize) or a process pool, selected by
+COMPUTE_EXECUTOR_TYPE. Submissions beyond COMPUTE_MAX_WORKERS running plus
+COMPUTE_MAX_QUEUE_DEPTH waiting are rejected with ComputeSaturatedError so
+callers can answer 503 instead of piling up latency.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ComputeSaturatedError(RuntimeError):
+    """Raised when the compute executor queue is full."""
+
+
+def _timed_call(fn: Callable, args: Tuple[Any, ...]) -> Tuple[Any, float, float]:
+    """Run fn in the worker and report wall-clock start/finish times."""
+    started_at = time.time()
+    result = fn(*args)
+    return result, started_at, time.time()
+
+
+class ComputeExecutor:
+    """Thread or process pool with a queue-depth limit and timing metrics."""
+
+    def __init__(self, executor_type: str = "thread", max_workers: int = 0, max_queue_depth: int = 64):
+        self.executor_type = executor_type
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_queue_depth = max_queue_depth
+        if executor_type == "process":
+            self._executor: Executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        elif executor_type == "thread":
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="compute")
+        else:
+            raise ValueError(f"Unknown compute executor type: {executor_type}")
+
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._queue_wait_total = 0.0
+        self._queue_wait_max = 0.0
+        self._exec_total = 0.0
+        self._exec_max = 0.0
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_queue_depth
+
+    async def run(self, fn: Callable, *args: Any) -> Any:
+        """
+        Run fn(*args) on the executor and return its result.
+
+        fn and args must be picklable when using the process pool.
+
+        Raises:
+            ComputeSaturatedError: If the executor is already at capacity
+        """
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                self._rejected += 1
+                logger.warning("Compute executor saturated", extra={
+                    "in_flight": self._in_flight,
+                    "capacity": self.capacity,
+                })
+                raise ComputeSaturatedError("Compute executor is saturated")
+            self._in_flight += 1
+
+        submitted_at = time.time()
+        try:
+            loop = asyncio.get_running_loop()
+            result, started_at, finished_at = await loop.run_in_executor(self._executor, _timed_call, fn, args)
+        except Exception:
+            with self._lock:
+                self._failed += 1
+            raise
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+        queue_wait = max(0.0, started_at - submitted_at)
+        exec_time = max(0.0, finished_at - started_at)
+        with self._lock:
+            self._completed += 1
+            self._queue_wait_total += queue_wait
+            self._queue_wait_max = max(self._queue_wait_max, queue_wait)
+            self._exec_total += exec_time
+            self._exec_max = max(self._exec_max, exec_time)
+        logger.debug("Compute task finished", extra={
+            "task": getattr(fn, "__name__", "unknown"),
+            "queue_wait_ms": round(queue_wait * 1000, 2),
+            "exec_ms": round(exec_time * 1000, 2),
+        })
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Get executor statistics for monitoring/debugging."""
+        with self._lock:
+            completed = self._completed
+            return {
+                "executor_type": self.executor_type,
+                "max_workers": self.max_workers,
+                "max_queue_depth": self.max_queue_depth,
+                "in_flight": self._in_flight,
+                "completed": completed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+                "queue_wait_avg_ms": round(self._queue_wait_total / completed * 1000, 2) if completed else 0,
+                "queue_wait_max_ms": round(self._queue_wait_max * 1000, 2),
+                "exec_avg_ms": round(self._exec_total / completed * 1000, 2) if completed else 0,
+                "exec_max_ms": round(self._exec_max * 1000, 2),
+            }
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
+
+
+# Global executor instance with thread lock
+_compute_executor: Optional[ComputeExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_compute_executor() -> ComputeExecutor:
+    """Get or create the global compute executor (thread-safe)."""
+    global _compute_executor
+    if _compute_executor is None:
+        with _executor_lock:
+            # Double-check locking pattern
+            if _compute_executor is None:
+                _compute_executor = ComputeExecutor(
+                    executor_type=settings.COMPUTE_EXECUTOR_TYPE,
+                    max_workers=settings.COMPUTE_MAX_WORKERS,
+                    max_queue_depth=settings.COMPUTE_MAX_QUEUE_DEPTH,
+                )
+    return _compute_executor
+
+
+def get_compute_stats() -> Optional[Dict[str, Any]]:
+    """Stats of the global compute executor, or None if it has not been started."""
+    executor = _compute_executor
+    return executor.stats() if executor is not None else None
+
+
+def shutdown_compute_executor():
+    """Shut down the global compute executor, if one was created."""
+    global _compute_executor
+    with _executor_lock:
+        if _compute_executor is not None:
+            _compute_executor.shutdown(wait=False)
+            _compute_executor = None
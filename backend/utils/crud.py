@@ -1,9 +1,12 @@
 import uuid
-from sqlalchemy import select, update, delete, and_, text
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import select, insert, update, delete, and_, case, exists, false as sa_false, func, tuple_, cast, Text
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 from core import models, schemas
-from typing import List, Optional, Dict, Any
+from utils.image_filters import ImageFilter, compile_filters
+from utils.annotation_geometry import bbox_columns
+from typing import List, Optional, Dict, Any, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
@@ -39,6 +42,7 @@ async def create_ml_analysis(db: AsyncSession, analysis: schemas.MLAnalysisCreat
         model_name=payload["model_name"],
         model_version=payload["model_version"],
         parameters=payload.get("parameters"),
+        priority=payload.get("priority", 0),
         status=status,
         requested_by_id=requested_by_id,
     )
@@ -47,12 +51,107 @@ async def create_ml_analysis(db: AsyncSession, analysis: schemas.MLAnalysisCreat
     await db.refresh(db_obj)
     return db_obj
 
-async def get_ml_analysis(db: AsyncSession, analysis_id: uuid.UUID) -> Optional[models.MLAnalysis]:
-    result = await db.execute(
-        select(models.MLAnalysis)
-        .where(models.MLAnalysis.id == analysis_id)
-        .options(selectinload(models.MLAnalysis.annotations))
+ACTIVE_ANALYSIS_STATUSES = ("queued", "processing", "completed")
+
+async def create_ml_analyses_bulk(
+    db: AsyncSession,
+    project_id: uuid.UUID,
+    analysis: schemas.MLAnalysisBulkCreate,
+    *,
+    requested_by_id: uuid.UUID,
+    status: str = "queued",
+    image_filters: Optional[List[ImageFilter]] = None,
+    max_per_image: int,
+    max_create: int,
+) -> Dict[str, int]:
+    """
+    Queue one analysis per selected image of a project, in one transaction.
+
+    The selection (image_ids, filters, search) is joined once to per-image
+    analysis counts: one aggregate query reports how many images are skipped
+    for an existing run of the same model and version or for being at
+    max_per_image, a second fetches the eligible ids (oldest image first, at
+    most max_create), and the analyses go in with one executemany INSERT.
+    Returns counts: matched, created, skipped_existing, skipped_limit, remaining.
+    """
+    analysis_model = models.MLAnalysis
+    selected = _project_image_query(
+        db, models.DataInstance.id, project_id,
+        search_field=analysis.search_field, search_value=analysis.search_value, filters=image_filters,
+    ).add_columns(models.DataInstance.created_at)
+    if analysis.image_ids is not None:
+        selected = selected.where(models.DataInstance.id.in_(analysis.image_ids))
+    selected = selected.subquery()
+
+    is_same_run = and_(
+        analysis_model.model_name == analysis.model_name,
+        analysis_model.model_version == analysis.model_version,
+        analysis_model.status.in_(ACTIVE_ANALYSIS_STATUSES),
     )
+    per_image = (
+        select(
+            analysis_model.image_id,
+            func.count().label("total"),
+            func.max(case((is_same_run, 1), else_=0)).label("has_run"),
+        )
+        .where(analysis_model.image_id.in_(select(selected.c.id)))
+        .group_by(analysis_model.image_id)
+        .subquery()
+    )
+    has_run = func.coalesce(per_image.c.has_run, 0) == 1
+    over_limit = func.coalesce(per_image.c.total, 0) >= max_per_image
+    candidates = select(selected.c.id).outerjoin(per_image, per_image.c.image_id == selected.c.id)
+    # An image with an existing run counts as skipped_existing even if it is also at the limit
+    skip_existing = has_run if analysis.skip_existing else sa_false()
+    skip_limit = and_(~skip_existing, over_limit)
+
+    stats = (await db.execute(candidates.with_only_columns(
+        func.count(),
+        func.coalesce(func.sum(case((skip_existing, 1), else_=0)), 0),
+        func.coalesce(func.sum(case((skip_limit, 1), else_=0)), 0),
+    ))).one()
+    matched, skipped_existing, skipped_limit = (int(v) for v in stats)
+
+    image_ids = (await db.execute(
+        candidates.where(~skip_existing, ~over_limit)
+        .order_by(selected.c.created_at, selected.c.id)
+        .limit(max_create)
+    )).scalars().all()
+
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "image_id": image_id,
+            "model_name": analysis.model_name,
+            "model_version": analysis.model_version,
+            "parameters": analysis.parameters,
+            "priority": analysis.priority,
+            "status": status,
+            "requested_by_id": requested_by_id,
+        }
+        for image_id in image_ids
+    ]
+    if rows:
+        await db.execute(insert(analysis_model), rows)
+    await db.commit()
+    return {
+        "matched": matched,
+        "created": len(rows),
+        "skipped_existing": skipped_existing,
+        "skipped_limit": skipped_limit,
+        "remaining": matched - skipped_existing - skipped_limit - len(rows),
+    }
+
+async def get_ml_analysis(db: AsyncSession, analysis_id: uuid.UUID, with_annotations: bool = True) -> Optional[models.MLAnalysis]:
+    """
+    Get an ML analysis. Pass with_annotations=False when only the analysis row
+    is needed (status, image_id for access checks); its annotations are then
+    not loaded and must not be accessed.
+    """
+    query = select(models.MLAnalysis).where(models.MLAnalysis.id == analysis_id)
+    if with_annotations:
+        query = query.options(selectinload(models.MLAnalysis.annotations))
+    result = await db.execute(query)
     return result.scalars().first()
 
 async def get_ml_analysis_for_update(db: AsyncSession, analysis_id: uuid.UUID) -> Optional[models.MLAnalysis]:
@@ -73,6 +172,108 @@ async def list_ml_analyses_for_image(db: AsyncSession, image_id: uuid.UUID, skip
     )
     return result.scalars().all()
 
+async def get_ml_annotation_summaries(
+    db: AsyncSession, analysis_ids: List[uuid.UUID], top_classes: int = 5
+) -> Dict[uuid.UUID, Dict[str, Any]]:
+    """
+    Annotation aggregates for each analysis in analysis_ids, in two GROUP BY
+    queries: counts and max confidence per type, and the top_classes most
+    frequent classes per analysis (ranked with a window over the class groups).
+    Analyses without annotations get an empty summary.
+    """
+    summaries: Dict[uuid.UUID, Dict[str, Any]] = {
+        analysis_id: {"total": 0, "by_type": {}, "top_classes": [], "max_confidence": None}
+        for analysis_id in analysis_ids
+    }
+    if not analysis_ids:
+        return summaries
+    ann = models.MLAnnotation
+
+    by_type = await db.execute(
+        select(ann.analysis_id, ann.annotation_type, func.count(), func.max(ann.confidence))
+        .where(ann.analysis_id.in_(analysis_ids))
+        .group_by(ann.analysis_id, ann.annotation_type)
+    )
+    for analysis_id, annotation_type, count, max_confidence in by_type.all():
+        summary = summaries[analysis_id]
+        summary["total"] += count
+        summary["by_type"][annotation_type] = count
+        if max_confidence is not None and (summary["max_confidence"] is None or max_confidence > summary["max_confidence"]):
+            summary["max_confidence"] = max_confidence
+
+    class_count = func.count().label("count")
+    per_class = (
+        select(
+            ann.analysis_id,
+            ann.class_name,
+            class_count,
+            func.max(ann.confidence).label("max_confidence"),
+            func.row_number().over(
+                partition_by=ann.analysis_id, order_by=(func.count().desc(), ann.class_name)
+            ).label("rank"),
+        )
+        .where(ann.analysis_id.in_(analysis_ids), ann.class_name.is_not(None))
+        .group_by(ann.analysis_id, ann.class_name)
+        .subquery()
+    )
+    top = await db.execute(
+        select(per_class.c.analysis_id, per_class.c.class_name, per_class.c.count, per_class.c.max_confidence)
+        .where(per_class.c.rank <= top_classes)
+        .order_by(per_class.c.analysis_id, per_class.c.rank)
+    )
+    for analysis_id, class_name, count, max_confidence in top.all():
+        summaries[analysis_id]["top_classes"].append(
+            {"class_name": class_name, "count": count, "max_confidence": max_confidence}
+        )
+    return summaries
+
+async def get_latest_ml_analyses_for_images(
+    db: AsyncSession, image_ids: List[uuid.UUID], model_name: Optional[str] = None
+) -> Dict[uuid.UUID, List[Dict[str, Any]]]:
+    """
+    The most recent analysis of each model for each image, with its
+    annotation count, in one query: analyses are ranked per (image, model)
+    with row_number() over ix_ml_analyses_image_model_created and only the
+    first of each is joined to its annotations.
+    Returns image id -> list of analyses ordered by model name.
+    """
+    latest: Dict[uuid.UUID, List[Dict[str, Any]]] = {image_id: [] for image_id in image_ids}
+    if not image_ids:
+        return latest
+    analysis = models.MLAnalysis
+    conditions = [analysis.image_id.in_(image_ids)]
+    if model_name is not None:
+        conditions.append(analysis.model_name == model_name)
+    ranked = (
+        select(
+            analysis.id, analysis.image_id, analysis.model_name, analysis.model_version,
+            analysis.status, analysis.created_at, analysis.completed_at,
+            func.row_number().over(
+                partition_by=(analysis.image_id, analysis.model_name),
+                order_by=(analysis.created_at.desc(), analysis.id.desc()),
+            ).label("rank"),
+        )
+        .where(*conditions)
+        .subquery()
+    )
+    columns = [
+        ranked.c.id, ranked.c.image_id, ranked.c.model_name, ranked.c.model_version,
+        ranked.c.status, ranked.c.created_at, ranked.c.completed_at,
+    ]
+    result = await db.execute(
+        select(*columns, func.count(models.MLAnnotation.id).label("annotation_count"))
+        .outerjoin(models.MLAnnotation, models.MLAnnotation.analysis_id == ranked.c.id)
+        .where(ranked.c.rank == 1)
+        .group_by(*columns)
+        .order_by(ranked.c.image_id, ranked.c.model_name)
+    )
+    for row in result.all():
+        entry = dict(row._mapping)
+        image_id = entry.pop("image_id")
+        entry["analysis_id"] = entry.pop("id")
+        latest[image_id].append(entry)
+    return latest
+
 async def count_ml_analyses_for_image(db: AsyncSession, image_id: uuid.UUID) -> int:
     """Count total ML analyses for an image."""
     from sqlalchemy import func
@@ -81,6 +282,233 @@ async def count_ml_analyses_for_image(db: AsyncSession, image_id: uuid.UUID) ->
     )
     return result.scalar_one()
 
+async def requeue_expired_ml_leases(db: AsyncSession, max_attempts: int, *, model_name: str, limit: int) -> int:
+    """
+    Put up to `limit` jobs of a model whose lease has lapsed back in the queue;
+    jobs already claimed max_attempts times are marked failed instead. Does not
+    commit. Returns the number of requeued jobs.
+
+    Expired rows are locked with FOR UPDATE SKIP LOCKED, so concurrent claimers
+    sweep disjoint rows instead of queueing behind one another's UPDATE.
+    """
+    now = datetime.now(timezone.utc)
+    expired = (
+        await db.execute(
+            select(models.MLAnalysis.id, models.MLAnalysis.attempts)
+            .where(
+                models.MLAnalysis.status == "processing",
+                models.MLAnalysis.model_name == model_name,
+                models.MLAnalysis.lease_expires_at < now,
+            )
+            .order_by(models.MLAnalysis.lease_expires_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+    ).all()
+    exhausted = [row.id for row in expired if row.attempts >= max_attempts]
+    retry = [row.id for row in expired if row.attempts < max_attempts]
+    if exhausted:
+        await db.execute(
+            update(models.MLAnalysis)
+            .where(models.MLAnalysis.id.in_(exhausted))
+            .values(
+                status="failed",
+                error_message=f"Lease expired after {max_attempts} attempts",
+                completed_at=now,
+                lease_expires_at=None,
+            )
+            .execution_options(synchronize_session=False)
+        )
+    if retry:
+        await db.execute(
+            update(models.MLAnalysis)
+            .where(models.MLAnalysis.id.in_(retry))
+            .values(status="queued", lease_owner=None, lease_expires_at=None)
+            .execution_options(synchronize_session=False)
+        )
+    return len(retry)
+
+async def claim_ml_analyses(
+    db: AsyncSession,
+    *,
+    model_name: str,
+    worker: str,
+    group_ids: Optional[List[str]],
+    limit: int,
+    lease_seconds: int,
+    max_attempts: int,
+) -> List[models.MLAnalysis]:
+    """
+    Atomically claim up to `limit` queued analyses of a model, highest priority
+    then oldest first, for projects in group_ids (None = unrestricted).
+
+    Candidate rows are locked with FOR UPDATE SKIP LOCKED, so concurrent
+    workers each get a disjoint set without waiting on one another.
+    """
+    await requeue_expired_ml_leases(db, max_attempts, model_name=model_name, limit=limit)
+    order = (models.MLAnalysis.priority.desc(), models.MLAnalysis.created_at, models.MLAnalysis.id)
+    candidates = (
+        select(models.MLAnalysis.id)
+        .join(models.DataInstance, models.DataInstance.id == models.MLAnalysis.image_id)
+        .join(models.Project, models.Project.id == models.DataInstance.project_id)
+        .where(
+            models.MLAnalysis.status == "queued",
+            models.MLAnalysis.model_name == model_name,
+            models.DataInstance.deleted_at.is_(None),
+        )
+        .order_by(*order)
+        .limit(limit)
+        .with_for_update(skip_locked=True, of=models.MLAnalysis)
+    )
+    ids = (await db.execute(_restrict_to_groups(candidates, group_ids))).scalars().all()
+    if not ids:
+        await db.commit()
+        return []
+    now = datetime.now(timezone.utc)
+    await db.execute(
+        update(models.MLAnalysis)
+        .where(models.MLAnalysis.id.in_(ids))
+        .values(
+            status="processing",
+            started_at=func.coalesce(models.MLAnalysis.started_at, now),
+            lease_owner=worker,
+            lease_expires_at=now + timedelta(seconds=lease_seconds),
+            attempts=models.MLAnalysis.attempts + 1,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    result = await db.execute(
+        select(models.MLAnalysis)
+        .options(selectinload(models.MLAnalysis.image))
+        .where(models.MLAnalysis.id.in_(ids))
+        .order_by(*order)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalars().all()
+
+async def get_images_pending_analysis(
+    db: AsyncSession,
+    project_id: uuid.UUID,
+    *,
+    model_name: str,
+    model_version: Optional[str] = None,
+    statuses: List[str],
+    after: Optional[tuple] = None,
+    limit: int = 100,
+) -> tuple:
+    """
+    One keyset page, by (created_at, id), of a project's live images that have
+    no analysis of model_name (and model_version, if given) in any of statuses.
+    The anti-join is a NOT EXISTS over ix_ml_analyses_image_model_created.
+
+    Returns:
+        (images, has_more)
+    """
+    analysis = models.MLAnalysis
+    done = [
+        analysis.image_id == models.DataInstance.id,
+        analysis.model_name == model_name,
+        analysis.status.in_(statuses),
+    ]
+    if model_version is not None:
+        done.append(analysis.model_version == model_version)
+    query = select(models.DataInstance).where(
+        models.DataInstance.project_id == project_id,
+        models.DataInstance.deleted_at.is_(None),
+        ~exists().where(*done),
+    )
+    key = tuple_(models.DataInstance.created_at, models.DataInstance.id)
+    if after is not None:
+        query = query.where(key > tuple_(*after))
+    query = query.order_by(models.DataInstance.created_at, models.DataInstance.id).limit(limit + 1)
+    images = list((await db.execute(query)).scalars().all())
+    return images[:limit], len(images) > limit
+
+async def bulk_update_ml_analysis_status(
+    db: AsyncSession,
+    project_id: uuid.UUID,
+    *,
+    status_from: str,
+    status_to: str,
+    model_name: Optional[str] = None,
+    older_than: Optional[datetime] = None,
+    limit: int = 100,
+    dry_run: bool = False,
+) -> List[models.MLAnalysis]:
+    """
+    Move up to `limit` of a project's analyses from status_from to status_to,
+    oldest first, in one UPDATE, and commit. `older_than` only matches
+    analyses last changed before it. Moving to "queued" resets the run state
+    (timestamps, lease, attempts, error) so the job is picked up afresh.
+    Rows are locked with SKIP LOCKED, so analyses being claimed or updated
+    concurrently are left alone. With dry_run nothing is changed.
+    Returns the matched analyses, in their new state unless dry_run.
+    """
+    analysis = models.MLAnalysis
+    last_change = func.coalesce(analysis.updated_at, analysis.created_at)
+    conditions = [
+        models.DataInstance.project_id == project_id,
+        analysis.status == status_from,
+    ]
+    if model_name is not None:
+        conditions.append(analysis.model_name == model_name)
+    if older_than is not None:
+        conditions.append(last_change < older_than)
+    order = (analysis.created_at, analysis.id)
+    candidates = (
+        select(analysis.id)
+        .join(models.DataInstance, models.DataInstance.id == analysis.image_id)
+        .where(*conditions)
+        .order_by(*order)
+        .limit(limit)
+    )
+    if not dry_run:
+        candidates = candidates.with_for_update(skip_locked=True, of=analysis)
+    ids = (await db.execute(candidates)).scalars().all()
+    if ids and not dry_run:
+        now = datetime.now(timezone.utc)
+        if status_to == "queued":
+            values = dict(
+                status="queued", started_at=None, completed_at=None, error_message=None,
+                lease_owner=None, lease_expires_at=None, attempts=0,
+            )
+        else:
+            values = dict(status=status_to, completed_at=now, lease_expires_at=None)
+        await db.execute(
+            update(analysis)
+            .where(analysis.id.in_(ids), analysis.status == status_from)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+    await db.commit()
+    if not ids:
+        return []
+    result = await db.execute(
+        select(analysis)
+        .options(selectinload(analysis.image))
+        .where(analysis.id.in_(ids))
+        .order_by(*order)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalars().all()
+
+async def renew_ml_lease(db: AsyncSession, analysis_id: uuid.UUID, worker: str, lease_seconds: int) -> Optional[datetime]:
+    """Extend a lease held by worker; returns the new expiry, or None if the worker no longer holds it."""
+    expires_at = datetime.now(timezone.utc) + timedelta(seconds=lease_seconds)
+    result = await db.execute(
+        update(models.MLAnalysis)
+        .where(
+            models.MLAnalysis.id == analysis_id,
+            models.MLAnalysis.status == "processing",
+            models.MLAnalysis.lease_owner == worker,
+        )
+        .values(lease_expires_at=expires_at)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return expires_at if result.rowcount else None
+
 async def create_ml_annotation(db: AsyncSession, analysis_id: uuid.UUID, annotation: schemas.MLAnnotationCreate) -> models.MLAnnotation:
     payload = annotation.model_dump()
     db_obj = models.MLAnnotation(
@@ -91,6 +519,7 @@ async def create_ml_annotation(db: AsyncSession, analysis_id: uuid.UUID, annotat
         data=payload["data"],
         storage_path=payload.get("storage_path"),
         ordering=payload.get("ordering"),
+        **bbox_columns(payload["data"]),
     )
     db.add(db_obj)
     await db.commit()
@@ -106,6 +535,16 @@ async def list_ml_annotations(db: AsyncSession, analysis_id: uuid.UUID, skip: in
     )
     return result.scalars().all()
 
+async def get_ml_annotations_by_ids(db: AsyncSession, annotation_ids: List[uuid.UUID]) -> List[models.MLAnnotation]:
+    """Annotations with the given ids, in the order of annotation_ids."""
+    if not annotation_ids:
+        return []
+    result = await db.execute(
+        select(models.MLAnnotation).where(models.MLAnnotation.id.in_(annotation_ids))
+    )
+    by_id = {a.id: a for a in result.scalars().all()}
+    return [by_id[i] for i in annotation_ids if i in by_id]
+
 async def count_ml_annotations(db: AsyncSession, analysis_id: uuid.UUID) -> int:
     """Count total annotations for an analysis."""
     from sqlalchemy import func
@@ -114,31 +553,128 @@ async def count_ml_annotations(db: AsyncSession, analysis_id: uuid.UUID) -> int:
     )
     return result.scalar_one()
 
-async def bulk_insert_ml_annotations(db: AsyncSession, analysis_id: uuid.UUID, annotations: List[schemas.MLAnnotationCreate]) -> int:
-    """Bulk insert annotations efficiently with chunking to prevent memory issues."""
-    CHUNK_SIZE = 500  # Process in chunks to avoid memory/timeout issues
-    total_inserted = 0
-
-    for i in range(0, len(annotations), CHUNK_SIZE):
-        chunk = annotations[i:i + CHUNK_SIZE]
-        objs = []
-        for ann in chunk:
-            payload = ann.model_dump()
-            objs.append(models.MLAnnotation(
-                analysis_id=analysis_id,
-                annotation_type=payload["annotation_type"],
-                class_name=payload.get("class_name"),
-                confidence=payload.get("confidence"),
-                data=payload["data"],
-                storage_path=payload.get("storage_path"),
-                ordering=payload.get("ordering"),
-            ))
-        db.add_all(objs)
-        await db.flush()  # Flush each chunk but don't commit yet
-        total_inserted += len(objs)
-
-    await db.commit()  # Single commit at the end
-    return total_inserted
+async def delete_ml_annotations(db: AsyncSession, analysis_id: uuid.UUID) -> int:
+    """Delete every annotation of an analysis without committing; returns the number deleted."""
+    result = await db.execute(
+        delete(models.MLAnnotation).where(models.MLAnnotation.analysis_id == analysis_id)
+    )
+    return result.rowcount
+
+async def insert_ml_annotation_rows(
+    db: AsyncSession, analysis_id: uuid.UUID, annotations: List[schemas.MLAnnotationCreate]
+) -> List[uuid.UUID]:
+    """
+    Insert annotations with one executemany Core INSERT, without committing.
+    Returns the ids of the inserted rows in input order.
+    """
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "analysis_id": analysis_id,
+            "annotation_type": ann.annotation_type,
+            "class_name": ann.class_name,
+            "confidence": ann.confidence,
+            "data": ann.data,
+            "storage_path": ann.storage_path,
+            "ordering": ann.ordering,
+            **bbox_columns(ann.data),
+        }
+        for ann in annotations
+    ]
+    if rows:
+        # A list of parameter sets runs as a batched executemany ("insertmanyvalues")
+        await db.execute(insert(models.MLAnnotation), rows)
+    return [row["id"] for row in rows]
+
+async def bulk_insert_ml_annotations(
+    db: AsyncSession,
+    analysis_id: uuid.UUID,
+    annotations: List[schemas.MLAnnotationCreate],
+    replace: bool = False,
+) -> Tuple[List[uuid.UUID], int]:
+    """
+    Insert annotations and commit once.
+
+    With replace=True the analysis' existing annotations are deleted in the
+    same transaction, so readers see either the old set or the new one.
+    Returns (ids of the inserted rows in request order, number deleted).
+    """
+    deleted = await delete_ml_annotations(db, analysis_id) if replace else 0
+    ids = await insert_ml_annotation_rows(db, analysis_id, annotations)
+    await db.commit()
+    return ids, deleted
+
+async def search_project_annotations(
+    db: AsyncSession,
+    project_id: uuid.UUID,
+    *,
+    class_name: Optional[str] = None,
+    annotation_type: Optional[str] = None,
+    model_name: Optional[str] = None,
+    min_confidence: Optional[float] = None,
+    max_confidence: Optional[float] = None,
+    region: Optional[Tuple[float, float, float, float]] = None,
+    after: Optional[tuple] = None,
+    limit: int = 50,
+) -> tuple:
+    """
+    One keyset page of a project's images that have matching annotations,
+    ranked by their best matching confidence (then image id), both descending.
+
+    Predicates use the typed annotation columns: (class_name, confidence) is
+    indexed, and `region` is a normalised (x_min, y_min, x_max, y_max) box
+    matched against overlapping annotation boxes, through the GiST box index
+    on PostgreSQL. `after` is the (score, image id) of the last row of the
+    previous page.
+
+    Returns:
+        (rows with image_id, filename, match_count and max_confidence, has_more)
+    """
+    ann = models.MLAnnotation
+    image = models.DataInstance
+    score = func.coalesce(func.max(ann.confidence), 0.0)
+    conditions = [image.project_id == project_id, image.deleted_at.is_(None)]
+    if class_name is not None:
+        conditions.append(ann.class_name == class_name)
+    if annotation_type is not None:
+        conditions.append(ann.annotation_type == annotation_type)
+    if model_name is not None:
+        conditions.append(models.MLAnalysis.model_name == model_name)
+    if min_confidence is not None:
+        conditions.append(ann.confidence >= min_confidence)
+    if max_confidence is not None:
+        conditions.append(ann.confidence <= max_confidence)
+    if region is not None:
+        rx_min, ry_min, rx_max, ry_max = region
+        conditions.append(ann.norm_x_min.is_not(None))
+        if db.get_bind().dialect.name == "postgresql":
+            # Same expression as ix_ml_annotations_norm_box so the planner can use it
+            box = func.box(func.point(ann.norm_x_min, ann.norm_y_min), func.point(ann.norm_x_max, ann.norm_y_max))
+            conditions.append(box.op("&&")(func.box(func.point(rx_min, ry_min), func.point(rx_max, ry_max))))
+        else:
+            conditions.extend([
+                ann.norm_x_min <= rx_max, ann.norm_x_max >= rx_min,
+                ann.norm_y_min <= ry_max, ann.norm_y_max >= ry_min,
+            ])
+
+    query = (
+        select(
+            image.id.label("image_id"),
+            image.filename,
+            func.count(ann.id).label("match_count"),
+            score.label("max_confidence"),
+        )
+        .select_from(ann)
+        .join(models.MLAnalysis, models.MLAnalysis.id == ann.analysis_id)
+        .join(image, image.id == models.MLAnalysis.image_id)
+        .where(*conditions)
+        .group_by(image.id, image.filename)
+    )
+    if after is not None:
+        query = query.having(tuple_(score, image.id) < tuple_(*after))
+    query = query.order_by(score.desc(), image.id.desc()).limit(limit + 1)
+    rows = [dict(row._mapping) for row in (await db.execute(query)).all()]
+    return rows[:limit], len(rows) > limit
 
 # User CRUD operations
 async def get_user_by_email(db: AsyncSession, email: str) -> Optional[models.User]:
@@ -210,6 +746,51 @@ async def get_projects_by_group_ids(db: AsyncSession, group_ids: List[str], skip
     )
     return result.scalars().all()
 
+def _restrict_to_groups(stmt, group_ids: Optional[List[str]]):
+    """Apply meta_group_id IN (...) unless group_ids is None (unrestricted)."""
+    if group_ids is None:
+        return stmt
+    return stmt.where(models.Project.meta_group_id.in_(group_ids))
+
+async def get_projects_for_groups(db: AsyncSession, group_ids: Optional[List[str]], skip: int = 0, limit: int = 100) -> List[models.Project]:
+    """
+    Get a page of projects whose meta_group_id is in group_ids.
+
+    Args:
+        db: Database session
+        group_ids: Groups the user belongs to, or None for all projects
+        skip: Number of records to skip
+        limit: Maximum number of records to return
+
+    Returns:
+        List of projects, ordered by creation time for stable pagination
+    """
+    if group_ids is not None and not group_ids:
+        return []
+    stmt = _restrict_to_groups(select(models.Project), group_ids)
+    result = await db.execute(
+        stmt.order_by(models.Project.created_at, models.Project.id)
+        .offset(skip)
+        .limit(limit)
+    )
+    return result.scalars().all()
+
+async def count_projects_for_groups(db: AsyncSession, group_ids: Optional[List[str]]) -> int:
+    """Count projects whose meta_group_id is in group_ids (None = all projects)."""
+    if group_ids is not None and not group_ids:
+        return 0
+    stmt = _restrict_to_groups(select(func.count(models.Project.id)), group_ids)
+    result = await db.execute(stmt)
+    return result.scalar_one()
+
+async def get_project_group_ids(db: AsyncSession, group_ids: Optional[List[str]]) -> List[str]:
+    """Distinct meta_group_ids in use by projects, restricted to group_ids (None = all)."""
+    if group_ids is not None and not group_ids:
+        return []
+    stmt = _restrict_to_groups(select(models.Project.meta_group_id).distinct(), group_ids)
+    result = await db.execute(stmt.order_by(models.Project.meta_group_id))
+    return list(result.scalars().all())
+
 async def get_all_projects(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[models.Project]:
     """
     Get all projects in the database.
@@ -232,6 +813,8 @@ async def get_all_projects(db: AsyncSession, skip: int = 0, limit: int = 100) ->
 async def create_project(db: AsyncSession, project: schemas.ProjectCreate, created_by: Optional[str] = None) -> models.Project:
     db_project = models.Project(**project.model_dump())
     db.add(db_project)
+    await db.flush()
+    db.add(models.ProjectStats(project_id=db_project.id))
     await db.commit()
     await db.refresh(db_project)
     
@@ -264,42 +847,183 @@ async def get_image(db: AsyncSession, image_id: uuid.UUID) -> Optional[models.Da
     """
     return await get_data_instance(db, image_id)
 
-async def get_data_instances_for_project(db: AsyncSession, project_id: uuid.UUID, skip: int = 0, limit: int = 100, search_field: Optional[str] = None, search_value: Optional[str] = None) -> List[models.DataInstance]:
+def _apply_image_search(query, search_field: Optional[str], search_value: Optional[str]):
+    if not (search_field and search_value):
+        return query
+    search_value_lower = f"%{search_value.lower()}%"
+
+    if search_field == 'filename':
+        return query.where(models.DataInstance.filename.ilike(search_value_lower))
+    elif search_field == 'content_type':
+        return query.where(models.DataInstance.content_type.ilike(search_value_lower))
+    elif search_field == 'uploaded_by':
+        return query.where(models.DataInstance.uploaded_by_user_id.ilike(search_value_lower))
+    elif search_field == 'metadata':
+        # Search across all metadata values as text; on PostgreSQL this is
+        # served by the trigram index on (metadata::text)
+        return query.where(cast(models.DataInstance.metadata_json, Text).ilike(search_value_lower))
+    else:
+        # Search specific metadata key using JSON path
+        # This searches for the specific key in the metadata JSON
+        return query.where(models.DataInstance.metadata_json[search_field].as_string().ilike(search_value_lower))
+
+def _apply_image_filters(db: AsyncSession, query, filters: Optional[List[ImageFilter]]):
+    if not filters:
+        return query
+    return query.where(*compile_filters(filters, db.get_bind().dialect.name))
+
+def _apply_deleted_filter(query, include_deleted: bool, deleted_only: bool):
+    if deleted_only:
+        return query.where(models.DataInstance.deleted_at.isnot(None))
+    if not include_deleted:
+        return query.where(models.DataInstance.deleted_at.is_(None))
+    return query
+
+async def get_data_instances_for_project(db: AsyncSession, project_id: uuid.UUID, skip: int = 0, limit: int = 100, search_field: Optional[str] = None, search_value: Optional[str] = None, include_deleted: bool = True, filters: Optional[List[ImageFilter]] = None) -> List[models.DataInstance]:
     # First check if the project exists
     project = await get_project(db, project_id)
     if not project:
         return []
         
     query = select(models.DataInstance).where(models.DataInstance.project_id == project_id)
-    
-    if search_field and search_value:
-        search_value_lower = f"%{search_value.lower()}%"
-        
-        if search_field == 'filename':
-            query = query.where(models.DataInstance.filename.ilike(search_value_lower))
-        elif search_field == 'content_type':
-            query = query.where(models.DataInstance.content_type.ilike(search_value_lower))
-        elif search_field == 'uploaded_by':
-            query = query.where(models.DataInstance.uploaded_by_user_id.ilike(search_value_lower))
-        elif search_field == 'metadata':
-            # Search across all metadata values using JSON text search
-            # This uses PostgreSQL's jsonb operators
-            query = query.where(text("metadata::text ILIKE :search_value")).params(search_value=search_value_lower)
-        else:
-            # Search specific metadata key using JSON path
-            # This searches for the specific key in the metadata JSON
-            query = query.where(text("metadata ->> :key ILIKE :search_value")).params(key=search_field, search_value=search_value_lower)
-    
+    query = _apply_deleted_filter(query, include_deleted, deleted_only=False)
+    query = _apply_image_search(query, search_field, search_value)
+    query = _apply_image_filters(db, query, filters)
+    # Stable order so offset pages don't overlap
+    query = query.order_by(models.DataInstance.created_at, models.DataInstance.id)
     query = query.offset(skip).limit(limit)
     result = await db.execute(query)
     return result.scalars().all()
 
-async def get_deleted_images_for_project(db: AsyncSession, project_id: uuid.UUID, skip: int = 0, limit: int = 100) -> List[models.DataInstance]:
-    result = await db.execute(
+# Whitelisted sort keys for keyset listings; each is backed by a
+# (project_id, deleted_at, <key>, id) index.
+IMAGE_SORT_KEYS = {
+    "created_at": models.DataInstance.created_at,
+    "filename": models.DataInstance.filename,
+}
+
+def _project_image_query(
+    db: AsyncSession,
+    entity,
+    project_id: uuid.UUID,
+    *,
+    include_deleted: bool = False,
+    deleted_only: bool = False,
+    search_field: Optional[str] = None,
+    search_value: Optional[str] = None,
+    filters: Optional[List[ImageFilter]] = None,
+):
+    query = select(entity).where(models.DataInstance.project_id == project_id)
+    query = _apply_deleted_filter(query, include_deleted, deleted_only)
+    query = _apply_image_search(query, search_field, search_value)
+    return _apply_image_filters(db, query, filters)
+
+async def get_data_instances_page(
+    db: AsyncSession,
+    project_id: uuid.UUID,
+    *,
+    sort: str = "created_at",
+    descending: bool = False,
+    after: Optional[tuple] = None,
+    limit: int = 100,
+    include_deleted: bool = False,
+    deleted_only: bool = False,
+    search_field: Optional[str] = None,
+    search_value: Optional[str] = None,
+    filters: Optional[List[ImageFilter]] = None,
+) -> tuple:
+    """
+    Fetch one keyset page of a project's images ordered by (sort key, id).
+
+    `after` is the (sort value, id) of the last row of the previous page. Rows
+    are located with a row-value comparison instead of OFFSET, so each page
+    costs the same regardless of depth.
+
+    Returns:
+        (images, has_more)
+    """
+    sort_column = IMAGE_SORT_KEYS[sort]
+    id_column = models.DataInstance.id
+    query = _project_image_query(
+        db, models.DataInstance, project_id,
+        include_deleted=include_deleted, deleted_only=deleted_only,
+        search_field=search_field, search_value=search_value, filters=filters,
+    )
+    if after is not None:
+        key = tuple_(sort_column, id_column)
+        query = query.where(key < tuple_(*after) if descending else key > tuple_(*after))
+    if descending:
+        query = query.order_by(sort_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(sort_column, id_column)
+    # One extra row tells us whether another page exists
+    result = await db.execute(query.limit(limit + 1))
+    images = list(result.scalars().all())
+    return images[:limit], len(images) > limit
+
+async def get_data_instance_neighbors(
+    db: AsyncSession,
+    image: models.DataInstance,
+    *,
+    sort: str = "created_at",
+    descending: bool = False,
+    include_deleted: bool = False,
+    search_field: Optional[str] = None,
+    search_value: Optional[str] = None,
+    filters: Optional[List[ImageFilter]] = None,
+    with_position: bool = False,
+) -> Dict[str, Any]:
+    """
+    Locate an image within its project listing ordered by (sort key, id).
+
+    Previous/next are single-row seeks on the listing index. position is only
+    computed with with_position: it counts every row before the image, so its
+    cost grows with the position. It is the 1-based ordinal of the image, or
+    None when not requested or when the image itself is outside the listing
+    (e.g. a deleted image while deleted ones are excluded).
+    """
+    sort_column = IMAGE_SORT_KEYS[sort]
+    id_column = models.DataInstance.id
+    key = tuple_(sort_column, id_column)
+    current = tuple_(getattr(image, sort), image.id)
+
+    def scoped(entity):
+        return _project_image_query(
+            db, entity, image.project_id,
+            include_deleted=include_deleted, search_field=search_field, search_value=search_value, filters=filters,
+        )
+
+    # "Before" in display order is a smaller key ascending and a larger key descending
+    before, after = (key > current, key < current) if descending else (key < current, key > current)
+    forward = (sort_column.desc(), id_column.desc()) if descending else (sort_column.asc(), id_column.asc())
+    backward = (sort_column.asc(), id_column.asc()) if descending else (sort_column.desc(), id_column.desc())
+
+    previous_id = (await db.execute(scoped(id_column).where(before).order_by(*backward).limit(1))).scalar_one_or_none()
+    next_id = (await db.execute(scoped(id_column).where(after).order_by(*forward).limit(1))).scalar_one_or_none()
+
+    position = None
+    if with_position and (await db.execute(scoped(id_column).where(id_column == image.id))).scalar_one_or_none() is not None:
+        position = (await db.execute(scoped(func.count()).where(before))).scalar_one() + 1
+
+    # Unfiltered totals come from project_stats; filtered ones need a count
+    unfiltered = not filters and not (search_field and search_value)
+    stats = await db.get(models.ProjectStats, image.project_id) if unfiltered else None
+    if stats is not None:
+        total = stats.image_count + (stats.deleted_image_count if include_deleted else 0)
+    else:
+        total = (await db.execute(scoped(func.count()))).scalar_one()
+
+    return {"image_id": image.id, "previous_id": previous_id, "next_id": next_id, "position": position, "total": total}
+
+async def get_deleted_images_for_project(db: AsyncSession, project_id: uuid.UUID, skip: int = 0, limit: int = 100, filters: Optional[List[ImageFilter]] = None) -> List[models.DataInstance]:
+    query = (
         select(models.DataInstance)
         .where(models.DataInstance.project_id == project_id)
         .where(models.DataInstance.deleted_at.isnot(None))
-        .order_by(models.DataInstance.deleted_at.desc())
+    )
+    query = _apply_image_filters(db, query, filters)
+    result = await db.execute(
+        query.order_by(models.DataInstance.deleted_at.desc())
         .offset(skip).limit(limit)
     )
     return result.scalars().all()
@@ -362,6 +1086,7 @@ async def soft_delete_image(db: AsyncSession, image: models.DataInstance, *, act
                 pending_hard_delete_at=pending_dt
             )
         )
+        await _move_image_stats(db, image, -1)
     else:
         # Update reason if new (append or keep existing? Keep existing to preserve original justification)
         if not image.deletion_reason:
@@ -375,6 +1100,7 @@ async def soft_delete_image(db: AsyncSession, image: models.DataInstance, *, act
     return image
 
 async def restore_image(db: AsyncSession, image: models.DataInstance):
+    was_deleted = image.deleted_at is not None
     await db.execute(
         update(models.DataInstance)
         .where(models.DataInstance.id == image.id)
@@ -388,6 +1114,8 @@ async def restore_image(db: AsyncSession, image: models.DataInstance):
             storage_deleted=False
         )
     )
+    if was_deleted:
+        await _move_image_stats(db, image, 1)
     await db.flush()
     await db.refresh(image)
     return image
@@ -407,6 +1135,15 @@ async def mark_image_storage_deleted(db: AsyncSession, image: models.DataInstanc
     await db.refresh(image)
     return image
 
+async def set_data_instance_derivatives(db: AsyncSession, image_id: uuid.UUID, derivative_keys: Dict[str, str]) -> None:
+    """Record the object keys of pre-rendered thumbnail derivatives for an image."""
+    await db.execute(
+        update(models.DataInstance)
+        .where(models.DataInstance.id == image_id)
+        .values(derivative_keys=derivative_keys)
+    )
+    await db.flush()
+
 async def create_data_instance(db: AsyncSession, data_instance: schemas.DataInstanceCreate, created_by: Optional[str] = None) -> models.DataInstance:
     create_data = data_instance.model_dump()
     # Rename Pydantic field name to SQLAlchemy attribute name
@@ -414,6 +1151,8 @@ async def create_data_instance(db: AsyncSession, data_instance: schemas.DataInst
          create_data["metadata_json"] = create_data.pop("metadata_")
     db_data_instance = models.DataInstance(**create_data)
     db.add(db_data_instance)
+    await _bump_project_stats(db, data_instance.project_id, image_count=1, total_bytes=data_instance.size_bytes or 0)
+    await _bump_project_stat_count(db, data_instance.project_id, STAT_CONTENT_TYPE, data_instance.content_type or UNKNOWN_CONTENT_TYPE, 1)
     await db.commit()
     await db.refresh(db_data_instance)
     
@@ -468,6 +1207,12 @@ async def delete_image_class(db: AsyncSession, class_id: uuid.UUID, deleted_by:
     
     log_db_operation("DELETE", "image_classes", class_id, deleted_by or "system", {"name": db_image_class.name})
     
+    # Drop the class from the project's statistics
+    class_count = await db.get(models.ProjectStatCount, (db_image_class.project_id, STAT_CLASS, str(class_id)))
+    if class_count is not None:
+        await _bump_project_stats(db, db_image_class.project_id, classification_count=-class_count.count)
+        await db.delete(class_count)
+
     # Delete the class
     await db.execute(delete(models.ImageClass).where(models.ImageClass.id == class_id))
     await db.commit()
@@ -490,9 +1235,32 @@ async def get_classifications_for_image(db: AsyncSession, image_id: uuid.UUID) -
     )
     return result.scalars().all()
 
+async def get_classifications_for_images(db: AsyncSession, image_ids: List[uuid.UUID]):
+    """Classifications of many images in one query, with class names; ordered by image."""
+    if not image_ids:
+        return []
+    result = await db.execute(
+        select(
+            models.ImageClassification.id,
+            models.ImageClassification.image_id,
+            models.ImageClassification.class_id,
+            models.ImageClass.name.label("class_name"),
+            models.ImageClassification.created_by_id,
+            models.ImageClassification.created_at,
+        )
+        .join(models.ImageClass, models.ImageClass.id == models.ImageClassification.class_id)
+        .where(models.ImageClassification.image_id.in_(image_ids))
+        .order_by(models.ImageClassification.image_id, models.ImageClassification.created_at)
+    )
+    return result.all()
+
 async def create_image_classification(db: AsyncSession, classification: schemas.ImageClassificationCreate, created_by: Optional[str] = None) -> models.ImageClassification:
     db_classification = models.ImageClassification(**classification.model_dump())
     db.add(db_classification)
+    stat_state = await _get_image_stat_state(db, classification.image_id)
+    if stat_state and stat_state[1]:
+        await _bump_project_stats(db, stat_state[0], classification_count=1)
+        await _bump_project_stat_count(db, stat_state[0], STAT_CLASS, str(classification.class_id), 1)
     await db.commit()
     await db.refresh(db_classification)
     
@@ -514,6 +1282,11 @@ async def delete_image_classification(db: AsyncSession, classification_id: uuid.
     
     log_db_operation("DELETE", "image_classifications", classification_id, deleted_by or "system", {"image_id": str(db_classification.image_id), "class_id": str(db_classification.class_id)})
     
+    stat_state = await _get_image_stat_state(db, db_classification.image_id)
+    if stat_state and stat_state[1]:
+        await _bump_project_stats(db, stat_state[0], classification_count=-1)
+        await _bump_project_stat_count(db, stat_state[0], STAT_CLASS, str(db_classification.class_id), -1)
+
     # Delete the classification
     await db.execute(delete(models.ImageClassification).where(models.ImageClassification.id == classification_id))
     await db.commit()
@@ -537,9 +1310,32 @@ async def get_comments_for_image(db: AsyncSession, image_id: uuid.UUID) -> List[
     )
     return result.scalars().all()
 
+async def get_comments_for_images(db: AsyncSession, image_ids: List[uuid.UUID]):
+    """Comments of many images in one query, with author email/username; ordered by image then time."""
+    if not image_ids:
+        return []
+    result = await db.execute(
+        select(
+            models.ImageComment.id,
+            models.ImageComment.image_id,
+            models.ImageComment.text,
+            models.ImageComment.author_id,
+            models.User.email.label("author_email"),
+            models.User.username.label("author_username"),
+            models.ImageComment.created_at,
+        )
+        .outerjoin(models.User, models.User.id == models.ImageComment.author_id)
+        .where(models.ImageComment.image_id.in_(image_ids))
+        .order_by(models.ImageComment.image_id, models.ImageComment.created_at)
+    )
+    return result.all()
+
 async def create_comment(db: AsyncSession, comment: schemas.ImageCommentCreate, created_by: Optional[str] = None) -> models.ImageComment:
     db_comment = models.ImageComment(**comment.model_dump())
     db.add(db_comment)
+    stat_state = await _get_image_stat_state(db, comment.image_id)
+    if stat_state and stat_state[1]:
+        await _bump_project_stats(db, stat_state[0], comment_count=1)
     await db.commit()
     await db.refresh(db_comment)
     
@@ -580,6 +1376,10 @@ async def delete_comment(db: AsyncSession, comment_id: uuid.UUID, deleted_by: Op
     
     log_db_operation("DELETE", "image_comments", comment_id, deleted_by or "system", {"text_length": len(db_comment.text)})
     
+    stat_state = await _get_image_stat_state(db, db_comment.image_id)
+    if stat_state and stat_state[1]:
+        await _bump_project_stats(db, stat_state[0], comment_count=-1)
+
     # Delete the comment
     await db.execute(delete(models.ImageComment).where(models.ImageComment.id == comment_id))
     await db.commit()
@@ -690,10 +1490,31 @@ async def get_all_active_api_keys(db: AsyncSession) -> List[models.ApiKey]:
     )
     return result.scalars().all()
 
-async def create_api_key(db: AsyncSession, api_key: schemas.ApiKeyCreate, user_id: uuid.UUID, key_hash: str, created_by: Optional[str] = None) -> models.ApiKey:
+async def get_active_api_key_by_prefix(db: AsyncSession, key_prefix: str) -> Optional[models.ApiKey]:
+    """Get the active API key with the given public prefix (indexed single-row lookup)."""
+    result = await db.execute(
+        select(models.ApiKey)
+        .options(selectinload(models.ApiKey.user))
+        .where(models.ApiKey.key_prefix == key_prefix)
+        .where(models.ApiKey.is_active == True)
+    )
+    return result.scalars().first()
+
+async def get_active_legacy_api_keys(db: AsyncSession) -> List[models.ApiKey]:
+    """Get active API keys issued before key prefixes existed (key_prefix IS NULL)."""
+    result = await db.execute(
+        select(models.ApiKey)
+        .options(selectinload(models.ApiKey.user))
+        .where(models.ApiKey.key_prefix.is_(None))
+        .where(models.ApiKey.is_active == True)
+    )
+    return result.scalars().all()
+
+async def create_api_key(db: AsyncSession, api_key: schemas.ApiKeyCreate, user_id: uuid.UUID, key_hash: str, created_by: Optional[str] = None, key_prefix: Optional[str] = None) -> models.ApiKey:
     db_api_key = models.ApiKey(
         user_id=user_id,
         key_hash=key_hash,
+        key_prefix=key_prefix,
         name=api_key.name
     )
     db.add(db_api_key)
@@ -727,3 +1548,140 @@ async def deactivate_api_key(db: AsyncSession, api_key_id: uuid.UUID, deactivate
     
     log_db_operation("UPDATE", "api_keys", api_key_id, deactivated_by or "system", {"deactivated": True})
     return True
+
+# ProjectStats operations
+#
+# project_stats / project_stat_counts are updated with relative increments in
+# the same transaction as the change they describe, so reads are a primary-key
+# lookup instead of a scan over the project's images.
+STAT_CONTENT_TYPE = "content_type"
+STAT_CLASS = "class"
+UNKNOWN_CONTENT_TYPE = "unknown"
+
+def _dialect_insert(db: AsyncSession):
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    return dialect_insert
+
+async def _bump_project_stats(db: AsyncSession, project_id: uuid.UUID, **deltas: int) -> None:
+    values = {name: getattr(models.ProjectStats, name) + delta for name, delta in deltas.items() if delta}
+    if not values:
+        return
+    await db.execute(
+        update(models.ProjectStats)
+        .where(models.ProjectStats.project_id == project_id)
+        .values(**values, updated_at=func.now())
+    )
+
+async def _bump_project_stat_count(db: AsyncSession, project_id: uuid.UUID, dimension: str, key: str, delta: int) -> None:
+    if not delta:
+        return
+    table = models.ProjectStatCount.__table__
+    stmt = _dialect_insert(db)(table).values(project_id=project_id, dimension=dimension, key=key, count=delta)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.project_id, table.c.dimension, table.c.key],
+        set_={"count": table.c.count + stmt.excluded.count},
+    )
+    await db.execute(stmt)
+
+async def _get_image_stat_state(db: AsyncSession, image_id: uuid.UUID):
+    """Return (project_id, is_live) for an image, or None if it doesn't exist."""
+    result = await db.execute(
+        select(models.DataInstance.project_id, models.DataInstance.deleted_at)
+        .where(models.DataInstance.id == image_id)
+    )
+    row = result.first()
+    return (row.project_id, row.deleted_at is None) if row else None
+
+async def _move_image_stats(db: AsyncSession, image: models.DataInstance, sign: int) -> None:
+    """Count an image (with its comments and classifications) as live (+1) or deleted (-1)."""
+    comment_count = (await db.execute(
+        select(func.count()).select_from(models.ImageComment).where(models.ImageComment.image_id == image.id)
+    )).scalar_one()
+    class_rows = (await db.execute(
+        select(models.ImageClassification.class_id, func.count())
+        .where(models.ImageClassification.image_id == image.id)
+        .group_by(models.ImageClassification.class_id)
+    )).all()
+    await _bump_project_stats(
+        db,
+        image.project_id,
+        image_count=sign,
+        deleted_image_count=-sign,
+        total_bytes=sign * (image.size_bytes or 0),
+        comment_count=sign * comment_count,
+        classification_count=sign * sum(count for _, count in class_rows),
+    )
+    await _bump_project_stat_count(db, image.project_id, STAT_CONTENT_TYPE, image.content_type or UNKNOWN_CONTENT_TYPE, sign)
+    for class_id, count in class_rows:
+        await _bump_project_stat_count(db, image.project_id, STAT_CLASS, str(class_id), sign * count)
+
+async def refresh_project_stats(db: AsyncSession, project_id: uuid.UUID) -> None:
+    """Recompute a project's statistics from scratch (backfill / repair)."""
+    image = models.DataInstance
+    live = and_(image.project_id == project_id, image.deleted_at.is_(None))
+    image_count, total_bytes = (await db.execute(
+        select(func.count(), func.coalesce(func.sum(image.size_bytes), 0)).where(live)
+    )).one()
+    deleted_image_count = (await db.execute(
+        select(func.count()).select_from(image).where(image.project_id == project_id, image.deleted_at.isnot(None))
+    )).scalar_one()
+    comment_count = (await db.execute(
+        select(func.count()).select_from(models.ImageComment).join(image, image.id == models.ImageComment.image_id).where(live)
+    )).scalar_one()
+    class_rows = (await db.execute(
+        select(models.ImageClassification.class_id, func.count())
+        .join(image, image.id == models.ImageClassification.image_id)
+        .where(live)
+        .group_by(models.ImageClassification.class_id)
+    )).all()
+    content_type_rows = (await db.execute(
+        select(image.content_type, func.count()).where(live).group_by(image.content_type)
+    )).all()
+
+    values = dict(
+        image_count=image_count,
+        total_bytes=total_bytes,
+        comment_count=comment_count,
+        classification_count=sum(count for _, count in class_rows),
+        deleted_image_count=deleted_image_count,
+    )
+    stmt = _dialect_insert(db)(models.ProjectStats.__table__).values(project_id=project_id, **values)
+    await db.execute(stmt.on_conflict_do_update(index_elements=[models.ProjectStats.project_id], set_={**values, "updated_at": func.now()}))
+
+    await db.execute(delete(models.ProjectStatCount).where(models.ProjectStatCount.project_id == project_id))
+    breakdown = [(STAT_CLASS, str(class_id), count) for class_id, count in class_rows]
+    breakdown += [(STAT_CONTENT_TYPE, content_type or UNKNOWN_CONTENT_TYPE, count) for content_type, count in content_type_rows]
+    for dimension, key, count in breakdown:
+        await _bump_project_stat_count(db, project_id, dimension, key, count)
+    await db.flush()
+
+async def get_project_stats(db: AsyncSession, project_id: uuid.UUID) -> Optional[schemas.ProjectStats]:
+    """Read a project's statistics, computing them once for projects that predate the stats table."""
+    stats = await db.get(models.ProjectStats, project_id, populate_existing=True)
+    if stats is None:
+        if await get_project(db, project_id) is None:
+            return None
+        await refresh_project_stats(db, project_id)
+        await db.commit()
+        stats = await db.get(models.ProjectStats, project_id, populate_existing=True)
+    result = await db.execute(
+        select(models.ProjectStatCount.dimension, models.ProjectStatCount.key, models.ProjectStatCount.count)
+        .where(models.ProjectStatCount.project_id == project_id, models.ProjectStatCount.count > 0)
+    )
+    breakdown = {STAT_CONTENT_TYPE: {}, STAT_CLASS: {}}
+    for dimension, key, count in result.all():
+        breakdown.setdefault(dimension, {})[key] = count
+    return schemas.ProjectStats(
+        project_id=project_id,
+        image_count=stats.image_count,
+        total_bytes=stats.total_bytes,
+        comment_count=stats.comment_count,
+        classification_count=stats.classification_count,
+        deleted_image_count=stats.deleted_image_count,
+        content_type_counts=breakdown[STAT_CONTENT_TYPE],
+        class_counts=breakdown[STAT_CLASS],
+        updated_at=stats.updated_at,
+    )
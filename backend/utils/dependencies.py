@@ -1,18 +1,21 @@
 from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from typing import Optional, List
+from typing import Optional, List, Dict, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
+import asyncio
 import uuid
 import hashlib
 import hmac
 import secrets
+import time
 import logging
 from core.config import settings
 from core.schemas import User, UserCreate
 from core.database import get_db
-from core.group_auth_helper import is_user_in_group
+from core.group_auth_helper import is_user_in_group, get_groups_for_user
 import utils.crud as crud
 from core import models
+from middleware.body_cache import STREAMED_HMAC_ROUTE_RE
 
 logger = logging.getLogger(__name__)
 security = HTTPBearer(auto_error=False)
@@ -23,9 +26,9 @@ async def get_user_accessible_groups(
     user: User
 ) -> List[str]:
     """
-    Get all groups that a user has access to by checking membership for each project's group.
-    This implements the new approach of iterating through projects and checking if the user
-    is a member of each project's group.
+    Get the project groups a user has access to.
+    Resolves the user's groups in one (cached) lookup and intersects them with
+    the groups that projects actually use, in SQL.
     
     Args:
         db: Database session
@@ -34,18 +37,7 @@ async def get_user_accessible_groups(
     Returns:
         List of group IDs the user has access to
     """
-    # Get all projects
-    all_projects = await crud.get_all_projects(db)
-    
-    # Initialize empty list for accessible groups
-    groups = []
-    
-    # For each project, check if the user is a member of the project's group
-    for project in all_projects:
-        if is_user_in_group(user.email, project.meta_group_id) and project.meta_group_id not in groups:
-            groups.append(project.meta_group_id)
-    
-    return groups
+    return await crud.get_project_group_ids(db, get_groups_for_user(user.email))
 
 # Function to get accessible projects for a user
 async def get_accessible_projects_for_user(
@@ -55,9 +47,9 @@ async def get_accessible_projects_for_user(
     limit: int = 100
 ) -> List[models.Project]:
     """
-    Get all projects that a user has access to by checking membership for each project.
-    This implements the new approach of iterating through projects and checking if the user
-    is a member of each project's group.
+    Get a page of projects that a user has access to.
+    Filters with meta_group_id IN (user's groups) in SQL, so offset/limit apply
+    to accessible projects and cost scales with them rather than all projects.
     
     Args:
         db: Database session
@@ -68,18 +60,12 @@ async def get_accessible_projects_for_user(
     Returns:
         List of projects the user has access to
     """
-    # Get all projects
-    all_projects = await crud.get_all_projects(db, skip, limit)
-    
-    # Initialize empty list for accessible projects
-    accessible_projects = []
-    
-    # For each project, check if the user is a member of the project's group
-    for project in all_projects:
-        if is_user_in_group(user.email, project.meta_group_id):
-            accessible_projects.append(project)
-    
-    return accessible_projects
+    return await crud.get_projects_for_groups(db, get_groups_for_user(user.email), skip, limit)
+
+
+async def count_accessible_projects_for_user(db: AsyncSession, user: User) -> int:
+    """Total number of projects the user has access to (for pagination)."""
+    return await crud.count_projects_for_groups(db, get_groups_for_user(user.email))
 
 
 async def get_project_or_403(project_id: uuid.UUID, db: AsyncSession, current_user: User) -> models.Project:
@@ -135,9 +121,27 @@ async def get_image_or_403(image_id: uuid.UUID, db: AsyncSession, current_user:
     
     return db_image
 
+# In-process cache of recently verified API keys
+# Format: {sha256(raw_key): (user, api_key_id, timestamp)}
+_api_key_cache: Dict[str, Tuple[User, uuid.UUID, float]] = {}
+
+API_KEY_PREFIX_SEPARATOR = "."
+
+
 def generate_api_key() -> str:
-    """Generate a secure API key"""
-    return secrets.token_urlsafe(32)
+    """Generate a secure API key of the form '<key_prefix>.<secret>'.
+
+    The prefix is a public key id stored in an indexed column so the key can be
+    looked up with a single query instead of hashing against every active key.
+    """
+    return f"{secrets.token_hex(6)}{API_KEY_PREFIX_SEPARATOR}{secrets.token_urlsafe(32)}"
+
+def get_api_key_prefix(api_key: str) -> Optional[str]:
+    """Return the public prefix of an API key, or None for legacy (prefix-less) keys."""
+    if API_KEY_PREFIX_SEPARATOR not in api_key:
+        return None
+    prefix = api_key.split(API_KEY_PREFIX_SEPARATOR, 1)[0]
+    return prefix or None
 
 def hash_api_key(api_key: str) -> str:
     """Hash an API key for storage using secure PBKDF2"""
@@ -169,6 +173,43 @@ def verify_api_key(api_key: str, stored_hash: str) -> bool:
     except (ValueError, TypeError):
         return False
 
+def clear_api_key_cache(api_key_id: Optional[uuid.UUID] = None) -> None:
+    """
+    Evict verified API keys from the in-process cache.
+
+    Args:
+        api_key_id: Only evict entries for this key; clears everything when None
+    """
+    if api_key_id is None:
+        _api_key_cache.clear()
+        return
+    stale = [digest for digest, (_, key_id, _) in _api_key_cache.items() if key_id == api_key_id]
+    for digest in stale:
+        del _api_key_cache[digest]
+
+async def _find_api_key_record(db: AsyncSession, raw_key: str) -> Optional[models.ApiKey]:
+    """
+    Resolve a raw API key to its active database record.
+
+    Prefixed keys take one indexed query and one PBKDF2 verification. Legacy keys
+    (issued without a prefix) fall back to verifying against the remaining
+    prefix-less keys only, unless API_KEY_LEGACY_LOOKUP_ENABLED is off.
+    PBKDF2 runs in a worker thread so it does not block the event loop.
+    """
+    key_prefix = get_api_key_prefix(raw_key)
+    if key_prefix is not None:
+        record = await crud.get_active_api_key_by_prefix(db, key_prefix)
+        if record and await asyncio.to_thread(verify_api_key, raw_key, record.key_hash):
+            return record
+        return None
+
+    if not settings.API_KEY_LEGACY_LOOKUP_ENABLED:
+        return None
+    for record in await crud.get_active_legacy_api_keys(db):
+        if await asyncio.to_thread(verify_api_key, raw_key, record.key_hash):
+            return record
+    return None
+
 async def get_user_from_api_key(
     request: Request,
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
@@ -177,29 +218,38 @@ async def get_user_from_api_key(
     """Get user from API key if provided"""
     if not credentials:
         return None
-    
-    # Get all active API keys and verify against each one
-    # Note: This is less efficient but necessary with salted hashes
-    # In production, consider adding an index or prefix to optimize
-    all_api_keys = await crud.get_all_active_api_keys(db)
-    
-    for api_key_record in all_api_keys:
-        if verify_api_key(credentials.credentials, api_key_record.key_hash):
-            # Update last used timestamp
-            await crud.update_api_key_last_used(db, api_key_record.id)
-            
-            # Return the user associated with this API key
-            return User(
-                id=api_key_record.user.id,
-                email=api_key_record.user.email,
-                username=api_key_record.user.username,
-                is_active=api_key_record.user.is_active,
-                created_at=api_key_record.user.created_at,
-                updated_at=api_key_record.user.updated_at,
-                groups=[]  # Groups handled by auth system
-            )
-    
-    return None
+
+    raw_key = credentials.credentials
+    digest = hashlib.sha256(raw_key.encode('utf-8')).hexdigest()
+    current_time = time.time()
+
+    # Check cache first
+    cached = _api_key_cache.get(digest)
+    if cached is not None:
+        cached_user, _, cached_time = cached
+        if current_time - cached_time < settings.API_KEY_CACHE_TTL_SECONDS:
+            return cached_user.model_copy()
+        del _api_key_cache[digest]
+
+    api_key_record = await _find_api_key_record(db, raw_key)
+    if api_key_record is None:
+        return None
+
+    # Update last used timestamp (only on cache misses to avoid a write per request)
+    await crud.update_api_key_last_used(db, api_key_record.id)
+
+    # Return the user associated with this API key
+    user = User(
+        id=api_key_record.user.id,
+        email=api_key_record.user.email,
+        username=api_key_record.user.username,
+        is_active=api_key_record.user.is_active,
+        created_at=api_key_record.user.created_at,
+        updated_at=api_key_record.user.updated_at,
+        groups=[]  # Groups handled by auth system
+    )
+    _api_key_cache[digest] = (user, api_key_record.id, current_time)
+    return user.model_copy()
 
 async def get_current_user(
     request: Request,
@@ -248,6 +298,14 @@ async def get_current_user(
 def verify_hmac_signature(secret: str, body: bytes, timestamp: str, signature_header: str, skew_seconds: int = 300) -> bool:
     """Verify an HMAC SHA256 signature of the form 'sha256=hex'.
     Includes basic replay protection via timestamp skew check (UTC seconds epoch or ISO8601)."""
+    try:
+        mac = hmac.new(secret.encode('utf-8'), msg=(timestamp.encode('utf-8') + b'.' + body), digestmod=hashlib.sha256)
+        return verify_hmac_digest(mac.hexdigest(), timestamp, signature_header, skew_seconds=skew_seconds)
+    except Exception:
+        return False
+
+def verify_hmac_timestamp(timestamp: str, skew_seconds: int = 300) -> bool:
+    """Replay protection: the X-ML-Timestamp (UTC seconds epoch or ISO8601) must be within skew_seconds of now."""
     import time, datetime as _dt
     try:
         if timestamp.isdigit():
@@ -255,18 +313,22 @@ def verify_hmac_signature(secret: str, body: bytes, timestamp: str, signature_he
         else:
             # attempt parse iso8601
             ts = int(_dt.datetime.fromisoformat(timestamp.replace('Z','+00:00')).timestamp())
-        now = int(time.time())
-        if abs(now - ts) > skew_seconds:
-            return False
-        if not signature_header.startswith('sha256='):
-            return False
-        provided = signature_header.split('=',1)[1]
-        mac = hmac.new(secret.encode('utf-8'), msg=(timestamp.encode('utf-8') + b'.' + body), digestmod=hashlib.sha256)
-        expected = mac.hexdigest()
-        return hmac.compare_digest(provided, expected)
+        return abs(int(time.time()) - ts) <= skew_seconds
     except Exception:
         return False
 
+def hmac_digest_matches(expected_hex: str, signature_header: str) -> bool:
+    """Compare a 'sha256=hex' signature with an already computed digest, without a timestamp check."""
+    if not signature_header.startswith('sha256='):
+        return False
+    provided = signature_header.split('=',1)[1]
+    return hmac.compare_digest(provided, expected_hex)
+
+def verify_hmac_digest(expected_hex: str, timestamp: str, signature_header: str, skew_seconds: int = 300) -> bool:
+    """Check a 'sha256=hex' signature against an already computed digest of '<timestamp>.<body>'.
+    Used for bodies whose HMAC was computed incrementally while streaming."""
+    return verify_hmac_timestamp(timestamp, skew_seconds) and hmac_digest_matches(expected_hex, signature_header)
+
 def verify_hmac_signature_flexible(secret: str, body: bytes, timestamp: str, signature_header: str, skew_seconds: int = 300) -> bool:
     """Attempt HMAC verification using the raw body first; if that fails and body appears to be JSON,
     re-serialize the JSON with canonical formatting (sorted keys, consistent separators) and retry.
@@ -391,10 +453,20 @@ async def get_raw_body(request: Request) -> bytes:
     Get raw request body from cache.
     The BodyCacheMiddleware caches the body early in the request lifecycle.
     Used for HMAC verification - this is imported from ML analysis router.
+
+    Streamed /api-ml bodies (e.g. uploads) are not cached; once FastAPI has
+    consumed them the middleware's incremental HMAC is used instead and this
+    returns an empty body.
     """
     if hasattr(request.state, "cached_body"):
         return request.state.cached_body
-    # Fallback for non-cached requests (shouldn't happen for POST/PATCH/PUT)
+    if STREAMED_HMAC_ROUTE_RE.search(request.url.path):
+        # The route streams and verifies its own body; reading it here would buffer it all
+        return b""
+    body_mac = getattr(request.state, "body_hmac", None)
+    if body_mac is not None and body_mac.hexdigest is not None:
+        return b""
+    # Body not read yet (or not a POST/PATCH/PUT): read it; this also completes any streamed HMAC
     return await request.body()
 
 
@@ -442,6 +514,10 @@ async def require_hmac_auth(
     if not settings.ML_PIPELINE_REQUIRE_HMAC:
         return current_user
 
+    if STREAMED_HMAC_ROUTE_RE.search(request.url.path):
+        # Verified by the route itself once the streamed body has been read, before it commits
+        return current_user
+
     # HMAC is required from this point onward
     if not settings.ML_CALLBACK_HMAC_SECRET:
         logger.error("HMAC authentication required but ML_CALLBACK_HMAC_SECRET not configured")
@@ -454,14 +530,24 @@ async def require_hmac_auth(
     signature = request.headers.get("X-ML-Signature", "")
     timestamp = request.headers.get("X-ML-Timestamp", "0")
 
-    # Verify signature
-    if not verify_hmac_signature_flexible(
-        settings.ML_CALLBACK_HMAC_SECRET,
-        body_bytes,
-        timestamp,
-        signature,
-        skew_seconds=settings.ML_HMAC_TIMESTAMP_SKEW_SECONDS,
-    ):
+    # Verify signature; streamed bodies carry an incrementally computed digest instead of bytes
+    body_mac = getattr(request.state, "body_hmac", None)
+    if body_mac is not None and body_mac.hexdigest is not None and not hasattr(request.state, "cached_body"):
+        verified = verify_hmac_digest(
+            body_mac.hexdigest,
+            timestamp,
+            signature,
+            skew_seconds=settings.ML_HMAC_TIMESTAMP_SKEW_SECONDS,
+        )
+    else:
+        verified = verify_hmac_signature_flexible(
+            settings.ML_CALLBACK_HMAC_SECRET,
+            body_bytes,
+            timestamp,
+            signature,
+            skew_seconds=settings.ML_HMAC_TIMESTAMP_SKEW_SECONDS,
+        )
+    if not verified:
         logger.warning("HMAC signature verification failed", extra={
             "user": current_user.email,
             "path": request.url.path,
@@ -0,0 +1,101 @@
+"""
+Thumbnail derivative pyramid.
+
+After an upload, a background task renders the image at each size in
+THUMBNAIL_DERIVATIVE_SIZES, stores the results next to the original in object
+storage and records their keys on the DataInstance. The thumbnail endpoint then
+serves the nearest pre-rendered size instead of decoding the original per request.
+Images without derivatives (older uploads, failed jobs) fall back to on-demand resizing.
+"""
+
+import io
+import logging
+import uuid
+from typing import Dict, Optional
+from core.config import settings
+from core.database import AsyncSessionLocal
+import utils.crud as crud
+from utils.boto3_client import download_file_from_s3, upload_file_to_s3, delete_file_from_s3
+from utils.compute_executor import get_compute_executor
+from utils.image_processing import make_derivatives, CONTENT_TYPE_BY_FORMAT
+
+logger = logging.getLogger(__name__)
+
+
+def derivative_object_key(project_id: uuid.UUID, image_id: uuid.UUID, size: int) -> str:
+    extension = settings.THUMBNAIL_DERIVATIVE_FORMAT.lower()
+    return f"{settings.THUMBNAIL_DERIVATIVE_PREFIX}/{project_id}/{image_id}/{size}.{extension}"
+
+
+def derivative_content_type() -> str:
+    return CONTENT_TYPE_BY_FORMAT.get(settings.THUMBNAIL_DERIVATIVE_FORMAT, 'image/jpeg')
+
+
+async def generate_image_derivatives(
+    project_id: uuid.UUID,
+    image_id: uuid.UUID,
+    object_storage_key: str,
+    session_factory=None,
+) -> Optional[Dict[str, str]]:
+    """
+    Render, store and record the derivative pyramid for one image.
+
+    Intended to run as a background task after the upload response is sent.
+    Failures are logged and leave derivative_keys unset so thumbnails keep
+    working through the on-demand path.
+
+    Returns:
+        Mapping of size (as string) -> object key, or None on failure
+    """
+    session_factory = session_factory or AsyncSessionLocal
+    log_extra = {"image_id": str(image_id), "project_id": str(project_id)}
+
+    image_data = await download_file_from_s3(settings.S3_BUCKET, object_storage_key)
+    if not image_data:
+        logger.warning("Skipping derivative generation: original not readable", extra=log_extra)
+        return None
+
+    try:
+        rendered = await get_compute_executor().run(
+            make_derivatives, image_data, settings.THUMBNAIL_DERIVATIVE_SIZE_LIST, settings.THUMBNAIL_DERIVATIVE_FORMAT
+        )
+    except Exception as e:
+        logger.warning("Derivative rendering failed", extra={**log_extra, "error": str(e), "error_type": type(e).__name__})
+        return None
+
+    content_type = derivative_content_type()
+    derivative_keys: Dict[str, str] = {}
+    for size, data in rendered.items():
+        key = derivative_object_key(project_id, image_id, size)
+        ok = await upload_file_to_s3(
+            bucket_name=settings.S3_BUCKET,
+            object_name=key,
+            file_data=io.BytesIO(data),
+            length=len(data),
+            content_type=content_type,
+        )
+        if not ok:
+            logger.warning("Derivative upload failed", extra={**log_extra, "size": size})
+            # Don't leave partial pyramids behind
+            for stored_key in derivative_keys.values():
+                await delete_file_from_s3(settings.S3_BUCKET, stored_key)
+            return None
+        derivative_keys[str(size)] = key
+
+    try:
+        async with session_factory() as db:
+            await crud.set_data_instance_derivatives(db, image_id, derivative_keys)
+            await db.commit()
+    except Exception as e:
+        logger.warning("Recording derivatives failed", extra={**log_extra, "error": str(e), "error_type": type(e).__name__})
+        await delete_image_derivatives(derivative_keys)
+        return None
+
+    logger.info("Stored thumbnail derivatives", extra={**log_extra, "sizes": sorted(rendered)})
+    return derivative_keys
+
+
+async def delete_image_derivatives(derivative_keys: Optional[Dict[str, str]]) -> None:
+    """Best-effort removal of an image's derivatives from object storage."""
+    for key in (derivative_keys or {}).values():
+        await delete_file_from_s3(settings.S3_BUCKET, key)
@@ -0,0 +1,117 @@
+"""
+In-process publish/subscribe used to push ML analysis changes over SSE.
+
+Publishers call ``get_event_bus().publish(topic, event)`` after their change is
+committed; each open event stream holds a Subscription to one or more topics
+("image:<id>", "project:<id>"). The EventBus interface is only publish and
+subscribe, so a PostgreSQL LISTEN/NOTIFY backed bus can replace
+InProcessEventBus when the API runs as several processes.
+"""
+
+import asyncio
+import threading
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Iterable, Optional, Set
+from core.config import settings
+
+
+def image_topic(image_id) -> str:
+    return f"image:{image_id}"
+
+
+def project_topic(project_id) -> str:
+    return f"project:{project_id}"
+
+
+class Subscription:
+    """A bounded event queue bound to the event loop of the subscriber."""
+
+    def __init__(self, topics: Iterable[str], max_queue: int):
+        self.topics = frozenset(topics)
+        self.loop = asyncio.get_running_loop()
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        # Set when events were dropped because the subscriber fell behind
+        self.overflowed = False
+
+    def deliver(self, event: Dict[str, Any]) -> None:
+        # Always runs on self.loop
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    async def get(self, timeout: float) -> Optional[Dict[str, Any]]:
+        """Next event, or None if nothing arrived within timeout seconds."""
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class EventBus:
+    """Interface for topic-based event fan-out."""
+
+    def publish(self, topic: str, event: Dict[str, Any]) -> int:
+        raise NotImplementedError
+
+    def subscribe(self, topics: Iterable[str]):
+        """Async context manager yielding a Subscription."""
+        raise NotImplementedError
+
+
+class InProcessEventBus(EventBus):
+    """Fan-out to subscribers in this process; safe to publish from any thread."""
+
+    def __init__(self, max_queue: int = 100):
+        self._max_queue = max_queue
+        self._subscribers: Dict[str, Set[Subscription]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def publish(self, topic: str, event: Dict[str, Any]) -> int:
+        """Queue event for every subscriber of topic; returns the number of subscribers."""
+        with self._lock:
+            subscribers = list(self._subscribers.get(topic, ()))
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, event)
+            except RuntimeError:
+                # Subscriber's loop has closed; it unsubscribes on its own way out
+                pass
+        return len(subscribers)
+
+    @asynccontextmanager
+    async def subscribe(self, topics: Iterable[str]) -> AsyncIterator[Subscription]:
+        subscription = Subscription(topics, self._max_queue)
+        with self._lock:
+            for topic in subscription.topics:
+                self._subscribers[topic].add(subscription)
+        try:
+            yield subscription
+        finally:
+            with self._lock:
+                for topic in subscription.topics:
+                    subscribers = self._subscribers.get(topic)
+                    if subscribers is not None:
+                        subscribers.discard(subscription)
+                        if not subscribers:
+                            del self._subscribers[topic]
+
+    def subscriber_count(self, topic: str) -> int:
+        with self._lock:
+            return len(self._subscribers.get(topic, ()))
+
+
+_event_bus: Optional[EventBus] = None
+_event_bus_lock = threading.Lock()
+
+
+def get_event_bus() -> EventBus:
+    """Get or create the global event bus (thread-safe)."""
+    global _event_bus
+    if _event_bus is None:
+        with _event_bus_lock:
+            # Double-check locking pattern
+            if _event_bus is None:
+                _event_bus = InProcessEventBus(max_queue=settings.ML_EVENTS_QUEUE_SIZE)
+    return _event_bus
@@ -0,0 +1,77 @@
+"""
+HTTP validator and Range helpers for endpoints that proxy object storage.
+"""
+
+import re
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Mapping, Optional
+
+_SINGLE_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def http_date(value: datetime) -> str:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def _opaque_tag(etag: str) -> str:
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def etag_matches(header_value: str, etag: Optional[str]) -> bool:
+    """Weak comparison of an If-None-Match / If-Range list against etag."""
+    if not etag:
+        return False
+    candidates = [c.strip() for c in header_value.split(",")]
+    if "*" in candidates:
+        return True
+    return _opaque_tag(etag) in {_opaque_tag(c) for c in candidates}
+
+
+def is_not_modified(headers: Mapping[str, str], etag: Optional[str], last_modified: Optional[datetime]) -> bool:
+    """
+    Evaluate If-None-Match / If-Modified-Since (RFC 9110 section 13.2.2).
+
+    If-Modified-Since is ignored when If-None-Match is present.
+    """
+    if_none_match = headers.get("if-none-match")
+    if if_none_match:
+        return etag_matches(if_none_match, etag)
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        # "-0000" zones parse as naive datetimes; HTTP dates are always UTC
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        if last_modified.tzinfo is None:
+            last_modified = last_modified.replace(tzinfo=timezone.utc)
+        # HTTP dates have one-second resolution
+        return last_modified.replace(microsecond=0) <= since
+    return False
+
+
+def requested_range(headers: Mapping[str, str], etag: Optional[str]) -> Optional[str]:
+    """
+    Return the Range header to forward to storage, or None to serve the full body.
+
+    Only a single byte range is supported; multi-range or malformed values fall
+    back to a full 200 response, which RFC 9110 permits. A stale If-Range also
+    means the full body.
+    """
+    range_header = headers.get("range")
+    if not range_header:
+        return None
+    match = _SINGLE_RANGE_RE.match(range_header.strip())
+    if not match or match.group(1) == match.group(2) == "":
+        return None
+    if match.group(1) and match.group(2) and int(match.group(1)) > int(match.group(2)):
+        return None
+    if_range = headers.get("if-range")
+    if if_range and not (etag and if_range.strip() == etag and not etag.startswith("W/")):
+        return None
+    return range_header.strip()
@@ -0,0 +1,200 @@
+"""
+Structured filters for image listings.
+
+Each ``filter`` query parameter is one predicate; multiple predicates are AND-ed:
+
+    meta.camera=canon          metadata key equals value
+    meta.label!=cat            metadata key present and not equal
+    meta.exposure>=0.5         range on a metadata key (>, >=, <, <=)
+    meta.taken<2026-01-01      ISO dates compare as strings
+    meta.notes~blurry          case-insensitive substring
+    meta.reviewed?             metadata key exists
+    filename~dog               column predicates on filename, content_type,
+    created_at>=2026-01-01     uploaded_by, created_at and size_bytes
+
+Values are read as JSON when they parse (numbers, true/false, null, "quoted
+strings") and as plain strings otherwise, and compare with their JSON type.
+
+On PostgreSQL, metadata predicates compile to JSONB containment (@>) and
+jsonpath (@?, @@) operators served by the GIN jsonb_path_ops index, and
+substring matches are prefiltered with ILIKE on metadata::text so the trigram
+index applies. Other backends (SQLite in development) use json_extract.
+"""
+
+import json
+import re
+from datetime import datetime
+from typing import Any, List, NamedTuple, Optional
+from sqlalchemy import Text, and_, cast, func, not_, type_coerce
+from sqlalchemy.dialects.postgresql import JSONB
+from core import models
+
+MAX_FILTERS = 20
+METADATA_PREFIX = "meta."
+
+_FILTER_RE = re.compile(r"^(?P<field>[^=<>!~?]+)(?P<op>>=|<=|!=|=|>|<|~|\?)(?P<value>.*)$", re.DOTALL)
+_METADATA_KEY_RE = re.compile(r'^[^"\\]+$')
+_RANGE_OPS = {">", ">=", "<", "<="}
+
+_COLUMN_FIELDS = {
+    "filename": models.DataInstance.filename,
+    "content_type": models.DataInstance.content_type,
+    "uploaded_by": models.DataInstance.uploaded_by_user_id,
+    "created_at": models.DataInstance.created_at,
+    "size_bytes": models.DataInstance.size_bytes,
+}
+_TEXT_COLUMNS = {"filename", "content_type", "uploaded_by"}
+
+
+class ImageFilter(NamedTuple):
+    field: str
+    op: str
+    value: Any = None
+
+    @property
+    def metadata_key(self) -> Optional[str]:
+        return self.field[len(METADATA_PREFIX):] if self.field.startswith(METADATA_PREFIX) else None
+
+
+def _parse_value(raw: str) -> Any:
+    try:
+        return json.loads(raw)
+    except ValueError:
+        return raw
+
+
+def parse_filter(raw: str) -> ImageFilter:
+    """
+    Parse one ``<field><op><value>`` expression.
+
+    Raises:
+        ValueError: if the expression, field, operator or value is not supported
+    """
+    match = _FILTER_RE.match(raw.strip())
+    if not match:
+        raise ValueError(f"Cannot parse filter '{raw}'")
+    field, op, raw_value = match.group("field").strip(), match.group("op"), match.group("value").strip()
+
+    if op == "?":
+        if raw_value:
+            raise ValueError(f"Existence filter '{raw}' takes no value")
+        value = None
+    elif field.startswith(METADATA_PREFIX) or field in _TEXT_COLUMNS:
+        value = raw_value if op == "~" else _parse_value(raw_value)
+    else:
+        value = raw_value
+
+    if field.startswith(METADATA_PREFIX):
+        key = field[len(METADATA_PREFIX):]
+        if not key or not _METADATA_KEY_RE.match(key):
+            raise ValueError(f"Invalid metadata key in filter '{raw}'")
+        if op in _RANGE_OPS and (isinstance(value, bool) or not isinstance(value, (int, float, str))):
+            raise ValueError(f"Range filter '{raw}' needs a number or string value")
+        return ImageFilter(field, op, value)
+
+    if field not in _COLUMN_FIELDS:
+        raise ValueError(f"Unknown filter field '{field}'")
+    if field in _TEXT_COLUMNS:
+        if op in _RANGE_OPS:
+            raise ValueError(f"Field '{field}' does not support '{op}'")
+        if op in ("=", "!=") and not isinstance(value, str):
+            value = raw_value
+    elif op == "~":
+        raise ValueError(f"Field '{field}' does not support '~'")
+    elif op != "?":
+        try:
+            value = datetime.fromisoformat(value) if field == "created_at" else int(value)
+        except ValueError:
+            raise ValueError(f"Invalid value for '{field}' in filter '{raw}'")
+    return ImageFilter(field, op, value)
+
+
+def parse_filters(raw_filters: Optional[List[str]]) -> List[ImageFilter]:
+    raw_filters = raw_filters or []
+    if len(raw_filters) > MAX_FILTERS:
+        raise ValueError(f"At most {MAX_FILTERS} filters are allowed")
+    return [parse_filter(raw) for raw in raw_filters]
+
+
+def _like_pattern(value: str) -> str:
+    escaped = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def _compare(expr, op: str, value):
+    if op == "=":
+        return expr == value
+    if op == "!=":
+        return expr != value
+    if op == ">":
+        return expr > value
+    if op == ">=":
+        return expr >= value
+    if op == "<":
+        return expr < value
+    return expr <= value
+
+
+def _compile_column(f: ImageFilter):
+    column = _COLUMN_FIELDS[f.field]
+    if f.op == "?":
+        return column.isnot(None)
+    if f.op == "~":
+        # filename ILIKE '%v%' is served by the filename trigram index on PostgreSQL
+        return column.ilike(_like_pattern(f.value), escape="\\")
+    return _compare(column, f.op, f.value)
+
+
+def _compile_metadata_postgres(f: ImageFilter):
+    metadata = type_coerce(models.DataInstance.metadata_json, JSONB)
+    path = f"$.{json.dumps(f.metadata_key)}"
+    if f.op == "=":
+        return metadata.contains({f.metadata_key: f.value})
+    if f.op == "!=":
+        return and_(metadata.path_exists(path), not_(metadata.contains({f.metadata_key: f.value})))
+    if f.op == "?":
+        return metadata.path_exists(path)
+    if f.op == "~":
+        pattern = _like_pattern(f.value)
+        return and_(
+            cast(models.DataInstance.metadata_json, Text).ilike(pattern, escape="\\"),
+            models.DataInstance.metadata_json[f.metadata_key].as_string().ilike(pattern, escape="\\"),
+        )
+    return metadata.path_match(f"{path} {f.op} {json.dumps(f.value)}")
+
+
+def _compile_metadata_generic(f: ImageFilter):
+    metadata = models.DataInstance.metadata_json
+    path = f'$."{f.metadata_key}"'
+    extracted = func.json_extract(metadata, path)
+    json_type = func.json_type(metadata, path)
+    if f.op == "?":
+        return json_type.isnot(None)
+    if f.op == "~":
+        return extracted.ilike(_like_pattern(f.value), escape="\\")
+    if f.value is None:
+        return json_type == "null" if f.op == "=" else and_(json_type.isnot(None), json_type != "null")
+    if isinstance(f.value, (dict, list)):
+        # json_extract returns containers as minified JSON text
+        return _compare(extracted, f.op, json.dumps(f.value, separators=(",", ":")))
+    if isinstance(f.value, bool):
+        type_guard = json_type.in_(["true", "false"])
+    elif isinstance(f.value, (int, float)):
+        type_guard = json_type.in_(["integer", "real"])
+    else:
+        type_guard = json_type == "text"
+    # Guard on the JSON type so e.g. "abc" never compares against a number
+    return and_(type_guard, _compare(extracted, f.op, f.value))
+
+
+def compile_filters(filters: List[ImageFilter], dialect_name: str) -> list:
+    """Compile parsed filters into SQL clauses for the given database dialect."""
+    clauses = []
+    for f in filters:
+        if f.metadata_key is None:
+            clauses.append(_compile_column(f))
+        elif dialect_name == "postgresql":
+            clauses.append(_compile_metadata_postgres(f))
+        else:
+            clauses.append(_compile_metadata_generic(f))
+    return clauses
@@ -0,0 +1,81 @@
+"""
+Pure image-processing helpers.
+
+Functions here run inside the compute executor (possibly in another process),
+so they take and return plain bytes and must stay importable at module level.
+"""
+
+import io
+from typing import Dict, Iterable, List, Tuple
+from PIL import Image
+
+CONTENT_TYPE_BY_FORMAT = {
+    'JPEG': 'image/jpeg',
+    'PNG': 'image/png',
+    'GIF': 'image/gif',
+    'WEBP': 'image/webp'
+}
+
+
+def make_thumbnail(image_data: bytes, width: int, height: int) -> Tuple[bytes, str]:
+    """
+    Resize an encoded image to fit within width x height, keeping aspect ratio.
+
+    Returns:
+        Tuple of (encoded thumbnail bytes, content type)
+    """
+    img = Image.open(io.BytesIO(image_data))
+    img_format = img.format or 'JPEG'  # Default to JPEG if format is unknown
+    # Let the JPEG decoder downscale while decoding instead of materialising full resolution
+    img.draft(img.mode, (width, height))
+    img.thumbnail((width, height))
+
+    output_buffer = io.BytesIO()
+    img.save(output_buffer, format=img_format)
+    return output_buffer.getvalue(), CONTENT_TYPE_BY_FORMAT.get(img_format, 'image/jpeg')
+
+
+def make_derivatives(image_data: bytes, sizes: List[int], img_format: str = 'WEBP') -> Dict[int, bytes]:
+    """
+    Render a pyramid of downscaled copies from one decode of the original.
+
+    Each derivative fits within size x size. Sizes at or above the original's
+    longest edge are skipped (no upscaling); if every size is skipped, a single
+    copy at the smallest requested size is still produced.
+
+    Returns:
+        Dict of size -> encoded bytes
+    """
+    sizes = sorted(set(sizes), reverse=True)
+    img = Image.open(io.BytesIO(image_data))
+    img.draft('RGB', (sizes[0], sizes[0]))
+    longest_edge = max(img.size)
+    wanted = [s for s in sizes if s < longest_edge] or [sizes[-1]]
+
+    if img_format == 'JPEG':
+        img = img.convert('RGB')
+    elif img.mode not in ('RGB', 'RGBA'):
+        has_alpha = img.mode in ('LA', 'PA') or 'transparency' in img.info
+        img = img.convert('RGBA' if has_alpha else 'RGB')
+
+    derivatives: Dict[int, bytes] = {}
+    current = img
+    # Downscale largest-first so each step resamples the previous (smaller) level
+    for size in wanted:
+        level = current.copy()
+        level.thumbnail((size, size))
+        output_buffer = io.BytesIO()
+        level.save(output_buffer, format=img_format)
+        derivatives[size] = output_buffer.getvalue()
+        current = level
+    return derivatives
+
+
+def snap_to_derivative(available: Iterable[int], width: int, height: int) -> int:
+    """Pick the smallest available size that covers width x height, else the largest."""
+    target = max(width, height)
+    available = sorted(available)
+    for size in available:
+        if size >= target:
+            return size
+    return available[-1]
@@ -0,0 +1,43 @@
+"""
+Opaque cursors for keyset-paginated listings.
+
+A cursor records the sort key and direction it was issued for plus the
+(sort value, id) of the last row returned, encoded as URL-safe base64 JSON.
+Clients treat it as opaque and pass it back unchanged to get the next page.
+"""
+
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Any, Tuple
+
+
+def encode_cursor(sort: str, descending: bool, value: Any, row_id: uuid.UUID) -> str:
+    if isinstance(value, datetime):
+        value = {"dt": value.isoformat()}
+    payload = {"s": sort, "d": descending, "v": value, "id": str(row_id)}
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str, descending: bool) -> Tuple[Any, uuid.UUID]:
+    """
+    Decode a cursor issued for the given sort key and direction.
+
+    Raises:
+        ValueError: if the cursor is malformed or was issued for a different ordering
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        value = payload["v"]
+        if isinstance(value, dict):
+            value = datetime.fromisoformat(value["dt"])
+        row_id = uuid.UUID(payload["id"])
+        cursor_sort, cursor_descending = payload["s"], payload["d"]
+    except (ValueError, TypeError, KeyError) as e:
+        raise ValueError("Malformed cursor") from e
+    if cursor_sort != sort or cursor_descending != descending:
+        raise ValueError("Cursor was issued for a different sort order")
+    return value, row_id
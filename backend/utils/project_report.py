@@ -0,0 +1,185 @@
+"""
+Server-side project report (GET /projects/{id}/report).
+
+Images are read in keyset batches of REPORT_BATCH_SIZE; each batch costs three
+set-based queries (images, comments with authors, classifications with class
+names) instead of two requests per image. Output is streamed as JSON or CSV
+batch by batch, and a completed report is cached under the project's cache
+generation so any change to the project invalidates it.
+"""
+
+import csv
+import io
+import json
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from core import models
+from core.config import settings
+import utils.crud as crud
+
+REPORT_FORMATS = {"json": "application/json", "csv": "text/csv; charset=utf-8"}
+CSV_HEADERS = [
+    "Image ID", "Filename", "Size (bytes)", "Content Type", "Upload Date", "Deleted",
+    "Comments Count", "Comments", "Classifications", "Custom Metadata",
+]
+# Leading characters that make spreadsheet applications evaluate a cell as a formula
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _json_default(value: Any):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return str(value)
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, default=_json_default, separators=(",", ":"))
+
+
+def _image_entry(image: models.DataInstance, comments: list, classifications: list) -> Dict[str, Any]:
+    return {
+        "id": image.id,
+        "filename": image.filename,
+        "size_bytes": image.size_bytes,
+        "content_type": image.content_type,
+        "uploaded_by_user_id": image.uploaded_by_user_id,
+        "created_at": image.created_at,
+        "deleted_at": image.deleted_at,
+        "metadata": image.metadata_json or {},
+        "comments": [
+            {
+                "id": c.id,
+                "text": c.text,
+                "author_id": c.author_id,
+                "author_email": c.author_email,
+                "author_username": c.author_username,
+                "created_at": c.created_at,
+            }
+            for c in comments
+        ],
+        "classifications": [
+            {
+                "id": c.id,
+                "class_id": c.class_id,
+                "class_name": c.class_name,
+                "created_by_id": c.created_by_id,
+                "created_at": c.created_at,
+            }
+            for c in classifications
+        ],
+    }
+
+
+async def iter_report_batches(db: AsyncSession, project_id: uuid.UUID, batch_size: Optional[int] = None) -> AsyncIterator[List[Dict[str, Any]]]:
+    """Yield report entries for every image of a project (deleted ones included), one batch at a time."""
+    batch_size = batch_size or settings.REPORT_BATCH_SIZE
+    after = None
+    while True:
+        images, has_more = await crud.get_data_instances_page(
+            db, project_id, include_deleted=True, after=after, limit=batch_size
+        )
+        if not images:
+            return
+        image_ids = [image.id for image in images]
+        comments = defaultdict(list)
+        for row in await crud.get_comments_for_images(db, image_ids):
+            comments[row.image_id].append(row)
+        classifications = defaultdict(list)
+        for row in await crud.get_classifications_for_images(db, image_ids):
+            classifications[row.image_id].append(row)
+        yield [_image_entry(image, comments[image.id], classifications[image.id]) for image in images]
+        if not has_more:
+            return
+        after = (images[-1].created_at, images[-1].id)
+
+
+async def stream_report_json(db: AsyncSession, project: models.Project) -> AsyncIterator[bytes]:
+    stats = await crud.get_project_stats(db, project.id)
+    header = {
+        "project": {
+            "id": project.id,
+            "name": project.name,
+            "description": project.description,
+            "meta_group_id": project.meta_group_id,
+            "created_at": project.created_at,
+        },
+        "stats": stats.model_dump(mode="json") if stats else None,
+        "generated_at": datetime.now().astimezone(),
+    }
+    # Emit the header object without its closing brace, then the images array
+    yield (_dumps(header)[:-1] + ',"images":[').encode("utf-8")
+    first = True
+    async for batch in iter_report_batches(db, project.id):
+        body = ",".join(_dumps(entry) for entry in batch)
+        yield (body if first else "," + body).encode("utf-8")
+        first = False
+    yield b"]}"
+
+
+def _csv_safe(value: Any) -> str:
+    if value is None:
+        return ""
+    text = value.isoformat() if isinstance(value, datetime) else str(value)
+    if text.startswith(_FORMULA_PREFIXES) or text.lower().startswith(("cmd|", "dde|")):
+        return "'" + text
+    return text
+
+
+def _csv_row(entry: Dict[str, Any]) -> List[str]:
+    comments = " | ".join(
+        f"{c['author_email'] or c['author_username'] or 'unknown'}: {c['text']}" for c in entry["comments"]
+    )
+    classifications = "; ".join(c["class_name"] for c in entry["classifications"])
+    return [
+        _csv_safe(v) for v in (
+            entry["id"],
+            entry["filename"],
+            entry["size_bytes"],
+            entry["content_type"],
+            entry["created_at"],
+            "Yes" if entry["deleted_at"] else "No",
+            len(entry["comments"]),
+            comments,
+            classifications,
+            _dumps(entry["metadata"]) if entry["metadata"] else "",
+        )
+    ]
+
+
+async def stream_report_csv(db: AsyncSession, project: models.Project) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_HEADERS)
+    yield buffer.getvalue().encode("utf-8")
+    async for batch in iter_report_batches(db, project.id):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(_csv_row(entry) for entry in batch)
+        yield buffer.getvalue().encode("utf-8")
+
+
+def stream_report(db: AsyncSession, project: models.Project, report_format: str) -> AsyncIterator[bytes]:
+    if report_format == "csv":
+        return stream_report_csv(db, project)
+    return stream_report_json(db, project)
+
+
+async def cache_while_streaming(chunks: AsyncIterator[bytes], cache, pinned_key: str, expire: float) -> AsyncIterator[bytes]:
+    """Pass chunks through, caching the complete body if it fits in REPORT_CACHE_MAX_BYTES."""
+    parts: Optional[List[bytes]] = []
+    size = 0
+    async for chunk in chunks:
+        if parts is not None:
+            size += len(chunk)
+            if size > settings.REPORT_CACHE_MAX_BYTES:
+                parts = None
+            else:
+                parts.append(chunk)
+        yield chunk
+    if parts is not None:
+        cache.set_pinned(pinned_key, b"".join(parts), expire=expire)
@@ -3,7 +3,7 @@ Serialization utilities for converting database models to API schemas.
 Centralizes metadata serialization logic to avoid repetition.
 """
 
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 from core import schemas, models
 
 
@@ -59,6 +59,35 @@ def to_data_instance_schema(db_image: models.DataInstance) -> schemas.DataInstan
     )
 
 
+def to_ml_analysis_summary_schema(
+    db_analysis: models.MLAnalysis, annotation_summary: Optional[Dict[str, Any]] = None
+) -> schemas.MLAnalysis:
+    """
+    Convert an MLAnalysis model to its list representation.
+    Annotations are left out so listings never load them; annotation_summary
+    (from crud.get_ml_annotation_summaries) stands in for them.
+    """
+    return schemas.MLAnalysis(
+        id=db_analysis.id,
+        image_id=db_analysis.image_id,
+        model_name=db_analysis.model_name,
+        model_version=db_analysis.model_version,
+        status=db_analysis.status,
+        error_message=db_analysis.error_message,
+        parameters=db_analysis.parameters,
+        provenance=db_analysis.provenance,
+        requested_by_id=db_analysis.requested_by_id,
+        external_job_id=db_analysis.external_job_id,
+        priority=db_analysis.priority,
+        created_at=db_analysis.created_at,
+        started_at=db_analysis.started_at,
+        completed_at=db_analysis.completed_at,
+        updated_at=db_analysis.updated_at,
+        annotations=[],
+        annotation_summary=annotation_summary,
+    )
+
+
 def normalize_metadata_dict(metadata_: Any) -> Dict[str, Any]:
     """
     Normalize metadata from various formats to a dictionary.
@@ -20,8 +20,7 @@ function ImageView() {
 
   // State variables
   const [image, setImage] = useState(null);
-  const [projectImages, setProjectImages] = useState([]);
-  const [currentImageIndex, setCurrentImageIndex] = useState(-1);
+  const [neighbors, setNeighbors] = useState({ previous_id: null, next_id: null });
   const [classes, setClasses] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
@@ -121,40 +120,33 @@ function ImageView() {
     }
   }, [imageId, projectId]);
 
-  // Load project images for navigation
-  const loadProjectImages = useCallback(async () => {
+  // Load the previous/next image ids for navigation. The server seeks them in
+  // the gallery's default order (newest first), so the project's image list
+  // is never downloaded just to move one step.
+  const loadNeighbors = useCallback(async () => {
     try {
-      console.log('Fetching images for project:', projectId);
-      const response = await fetch(`/api/projects/${projectId}/images?include_deleted=true`);
+      const params = new URLSearchParams({
+        sort: 'created_at',
+        order: 'desc',
+        include_deleted: skipDeletedImages ? 'false' : 'true',
+      });
+      const response = await fetch(`/api/images/${imageId}/neighbors?${params}`);
 
       if (!response.ok) {
         throw new Error(`HTTP error! Status: ${response.status}`);
       }
 
-      const images = await response.json();
-
-      if (!Array.isArray(images)) {
-        console.error('Server response is not an array:', images);
-        throw new Error('Invalid server response: expected an array of images');
-      }
-
-      // Sort images by date (newest first) to match the gallery default sorting
-      // Use spread operator to avoid mutating the original array
-      const sortedImages = [...images].sort((a, b) => {
-        return new Date(b.created_at || '1970-01-01') - new Date(a.created_at || '1970-01-01');
+      const data = await response.json();
+      setNeighbors({
+        previous_id: data?.previous_id || null,
+        next_id: data?.next_id || null,
       });
 
-      setProjectImages(sortedImages);
-
-      // Find the index of the current image in the sorted array
-      const index = sortedImages.findIndex(img => img.id === imageId);
-      setCurrentImageIndex(index);
-
     } catch (error) {
-      console.error('Error loading project images:', error);
-      setError('Failed to load project images for navigation. Please try again later.');
+      console.error('Error loading image neighbors:', error);
+      setNeighbors({ previous_id: null, next_id: null });
     }
-  }, [projectId, imageId]);
+  }, [imageId, skipDeletedImages]);
 
   // Save skip deleted preference to localStorage
   useEffect(() => {
@@ -209,49 +201,32 @@ function ImageView() {
       });
     
     loadImageData();
-    loadProjectImages();
     loadClasses();
-  }, [imageId, projectId, loadImageData, loadProjectImages, loadClasses]);
-
-  // Navigate to previous image with transition
-  const navigateToPreviousImage = useCallback(() => {
-    let targetIndex = currentImageIndex - 1;
-
-    // Skip deleted images if option is enabled
-    if (skipDeletedImages) {
-      while (targetIndex >= 0 && projectImages[targetIndex]?.deleted_at) {
-        targetIndex--;
-      }
-    }
+  }, [imageId, projectId, loadImageData, loadClasses]);
 
-    if (targetIndex >= 0) {
-      setIsTransitioning(true);
-      setTimeout(() => {
-        const prevImage = projectImages[targetIndex];
-        navigate(`/view/${prevImage.id}?project=${projectId}`);
-      }, 300);
+  // Neighbors also depend on whether deleted images are skipped
+  useEffect(() => {
+    if (imageId && projectId) {
+      loadNeighbors();
     }
-  }, [currentImageIndex, projectImages, navigate, projectId, skipDeletedImages]);
+  }, [imageId, projectId, loadNeighbors]);
 
-  // Navigate to next image with transition
-  const navigateToNextImage = useCallback(() => {
-    let targetIndex = currentImageIndex + 1;
+  // Navigate to a neighboring image with transition
+  const navigateToImage = useCallback((targetId) => {
+    if (!targetId) return;
+    setIsTransitioning(true);
+    setTimeout(() => {
+      navigate(`/view/${targetId}?project=${projectId}`);
+    }, 300);
+  }, [navigate, projectId]);
 
-    // Skip deleted images if option is enabled
-    if (skipDeletedImages) {
-      while (targetIndex < projectImages.length && projectImages[targetIndex]?.deleted_at) {
-        targetIndex++;
-      }
-    }
+  const navigateToPreviousImage = useCallback(() => {
+    navigateToImage(neighbors.previous_id);
+  }, [navigateToImage, neighbors.previous_id]);
 
-    if (targetIndex < projectImages.length) {
-      setIsTransitioning(true);
-      setTimeout(() => {
-        const nextImage = projectImages[targetIndex];
-        navigate(`/view/${nextImage.id}?project=${projectId}`);
-      }, 300);
-    }
-  }, [currentImageIndex, projectImages, navigate, projectId, skipDeletedImages]);
+  const navigateToNextImage = useCallback(() => {
+    navigateToImage(neighbors.next_id);
+  }, [navigateToImage, neighbors.next_id]);
 
   // Reset transition state when image changes (but keep ML settings)
   useEffect(() => {
@@ -330,7 +305,7 @@ function ImageView() {
     return () => {
       document.removeEventListener('keydown', handleKeyDown);
     };
-  }, [currentImageIndex, projectImages.length, navigateToNextImage, navigateToPreviousImage]);
+  }, [navigateToNextImage, navigateToPreviousImage]);
 
   return (
     <div className="App" style={{ maxWidth: '100%', padding: '0' }}>
@@ -432,11 +407,11 @@ function ImageView() {
                 isTransitioning={isTransitioning}
                 projectId={projectId}
                 setImage={setImage}
-                refreshProjectImages={loadProjectImages}
+                refreshProjectImages={loadNeighbors}
                 navigateToPreviousImage={navigateToPreviousImage}
                 navigateToNextImage={navigateToNextImage}
-                currentImageIndex={currentImageIndex}
-                projectImages={projectImages}
+                hasPrevious={Boolean(neighbors.previous_id)}
+                hasNext={Boolean(neighbors.next_id)}
                 selectedAnalysis={selectedAnalysis}
                 annotations={selectedAnnotations}
                 overlayOptions={overlayOptions}
@@ -449,7 +424,7 @@ function ImageView() {
             projectId={projectId}
             image={image}
             setImage={setImage}
-            refreshProjectImages={loadProjectImages}
+            refreshProjectImages={loadNeighbors}
           />
 
           {/* Navigation settings */}
@@ -14,8 +14,8 @@ function ImageDisplay({
   refreshProjectImages,
   navigateToPreviousImage,
   navigateToNextImage,
-  currentImageIndex,
-  projectImages,
+  hasPrevious,
+  hasNext,
   selectedAnalysis,
   annotations,
   overlayOptions
@@ -338,7 +338,7 @@ function ImageDisplay({
           <button
             className="btn btn-secondary btn-small control-btn"
             onClick={navigateToPreviousImage}
-            disabled={currentImageIndex <= 0}
+            disabled={!hasPrevious}
           >
             ← Prev
           </button>
@@ -347,7 +347,7 @@ function ImageDisplay({
           <button
             className="btn btn-secondary btn-small control-btn"
             onClick={navigateToNextImage}
-            disabled={currentImageIndex >= (projectImages?.length || 0) - 1 || currentImageIndex === -1}
+            disabled={!hasNext}
           >
             Next →
           </button>
@@ -21,8 +21,8 @@ describe('ImageDisplay Component - Basic Tests', () => {
     refreshProjectImages: jest.fn(),
     navigateToPreviousImage: jest.fn(),
     navigateToNextImage: jest.fn(),
-    currentImageIndex: 0,
-    projectImages: [mockImage],
+    hasPrevious: false,
+    hasNext: false,
     selectedAnalysis: null,
     annotations: [],
     overlayOptions: {
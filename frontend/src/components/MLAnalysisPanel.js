@@ -1,4 +1,4 @@
-import React, { useEffect, useState, useCallback } from 'react';
+import React, { useEffect, useState, useCallback, useRef } from 'react';
 
 /**
  * MLAnalysisPanel
@@ -83,19 +83,49 @@ export default function MLAnalysisPanel({ imageId, onSelect, onAnalysesLoaded, a
     }
   }, []);
 
-  // Poll while there are non-terminal analyses
+  const active = analyses.some(a => ['queued','processing'].includes(a.status));
+  // Latest list/selection for the event handler, so updates do not reopen the stream
+  const analysesRef = useRef(analyses);
+  const selectedRef = useRef(selected);
+  analysesRef.current = analyses;
+  selectedRef.current = selected;
+
+  // While analyses are running, follow server-sent status/annotation events.
+  // Falls back to polling where EventSource is unavailable.
   useEffect(() => {
-    const active = analyses.some(a => ['queued','processing'].includes(a.status));
-    if (!active) return;
-    const t = setInterval(() => {
-      fetchAnalyses();
-      if (selected) {
-        // Refresh annotations for selected analysis if still selected
-        selectAnalysis(selected);
+    if (!active || !imageId) return;
+    if (typeof window.EventSource === 'undefined') {
+      const t = setInterval(() => {
+        fetchAnalyses();
+        if (selectedRef.current) {
+          // Refresh annotations for selected analysis if still selected
+          selectAnalysis(selectedRef.current);
+        }
+      }, 8000); // 8s cadence
+      return () => clearInterval(t);
+    }
+    const source = new window.EventSource(`/api/images/${imageId}/analyses/events`);
+    source.addEventListener('analysis', (msg) => {
+      let evt;
+      try { evt = JSON.parse(msg.data); } catch (_) { return; }
+      const known = analysesRef.current.some(a => a.id === evt.analysis_id);
+      if (!known) {
+        fetchAnalyses();
+        return;
+      }
+      setAnalyses(prev => prev.map(a => a.id === evt.analysis_id
+        ? { ...a, status: evt.status, error_message: evt.error_message }
+        : a));
+      // Only the selected analysis' annotations are reloaded, and only when they changed
+      const finished = !['queued','processing'].includes(evt.status);
+      if (evt.analysis_id === selectedRef.current && (evt.annotation_count !== null || finished)) {
+        selectAnalysis(evt.analysis_id);
       }
-    }, 8000); // 8s cadence
-    return () => clearInterval(t);
-  }, [analyses, fetchAnalyses, selected, selectAnalysis]);
+    });
+    // Events were dropped for this client: reload once
+    source.addEventListener('resync', () => fetchAnalyses());
+    return () => source.close();
+  }, [active, imageId, fetchAnalyses, selectAnalysis]);
 
   useEffect(() => { fetchAnalyses(); }, [fetchAnalyses]);
 
@@ -150,6 +180,9 @@ export default function MLAnalysisPanel({ imageId, onSelect, onAnalysesLoaded, a
               <span style={{ fontSize: 12, display: 'flex', flexDirection: 'column' }}>
                 <span><strong>{a.model_name}</strong> <span style={{ opacity: 0.7 }}>v{a.model_version}</span></span>
                 <span style={{ fontSize: 10, opacity: 0.6 }}>{a.status}</span>
+                {a.annotation_summary && a.annotation_summary.total > 0 && (
+                  <span style={{ fontSize: 10, opacity: 0.6 }}>{formatSummary(a.annotation_summary)}</span>
+                )}
               </span>
               <StatusBadge status={a.status} />
             </li>
@@ -219,3 +252,9 @@ function StatusBadge({ status }) {
   const bg = colorMap[status] || '#444';
   return <span style={{ background: bg, color: 'white', borderRadius: 4, padding: '2px 6px', fontSize: 11, textTransform: 'uppercase' }}>{status}</span>;
 }
+
+function formatSummary(summary) {
+  const classes = (summary.top_classes || []).slice(0, 3).map(c => `${c.class_name} ×${c.count}`).join(', ');
+  const best = summary.max_confidence != null ? ` · max ${(summary.max_confidence * 100).toFixed(0)}%` : '';
+  return `${summary.total} annotations${classes ? `: ${classes}` : ''}${best}`;
+}
@@ -39,40 +39,19 @@ function ProjectReport() {
         const projectData = await projectResponse.json();
         setProject(projectData);
 
-        // Load all images with full metadata and comments
-        const imagesResponse = await fetch(`/api/projects/${id}/images?include_deleted=true`);
-        if (!imagesResponse.ok) {
-          throw new Error('Failed to fetch images');
+        // Load all images with comments and classifications in one server-side report
+        const reportResponse = await fetch(`/api/projects/${id}/report?format=json`);
+        if (!reportResponse.ok) {
+          throw new Error('Failed to fetch project report');
         }
-        const imagesData = await imagesResponse.json();
-
-        // Load detailed data for each image (comments, full metadata)
-        const detailedImages = await Promise.all(
-          imagesData.map(async (image) => {
-            try {
-              // Get comments
-              const commentsResponse = await fetch(`/api/images/${image.id}/comments`);
-              const comments = commentsResponse.ok ? await commentsResponse.json() : [];
-
-              // Get classifications
-              const classificationsResponse = await fetch(`/api/images/${image.id}/classifications`);
-              const classifications = classificationsResponse.ok ? await classificationsResponse.json() : [];
-
-              return {
-                ...image,
-                comments,
-                classifications
-              };
-            } catch (error) {
-              console.error(`Failed to load details for image ${image.id}:`, error);
-              return {
-                ...image,
-                comments: [],
-                classifications: []
-              };
-            }
-          })
-        );
+        const report = await reportResponse.json();
+        const detailedImages = report.images.map(image => ({
+          ...image,
+          comments: image.comments.map(comment => ({
+            ...comment,
+            author: { email: comment.author_email, username: comment.author_username }
+          }))
+        }));
 
         setImages(detailedImages);
 
@@ -4,16 +4,16 @@
 This script is intended as an operational tool to clean up
 stuck or obsolete ML analysis jobs that are still in "queued"
 (or other source) status. It uses the regular API-key routes
-and the existing /analyses/{id}/status endpoint, not the
-/api-ml HMAC pipeline paths.
+and the /projects/{id}/analyses:bulk-status endpoint, not the
+/api-ml HMAC pipeline paths, so the whole cleanup is one request
+(plus one for the dry-run preview) however large the project is.
 """
 
 import os
 import sys
 import argparse
 import uuid
-from datetime import datetime, timedelta
-from typing import List, Dict, Any
+from typing import Dict, Any
 
 from pathlib import Path
 
@@ -96,44 +96,12 @@ def get_api_url(api_base: str, path: str) -> str:
     return f"{api_base.rstrip('/')}/{prefix}/{path}"
 
 
-def list_project_images(session: requests.Session, api_base: str, project_id: str, limit: int = 1000) -> List[Dict[str, Any]]:
-    images: List[Dict[str, Any]] = []
-    skip = 0
-    page_size = min(limit, 100)
-
-    while len(images) < limit:
-        url = get_api_url(api_base, f"projects/{project_id}/images")
-        params = {"skip": skip, "limit": page_size}
-        resp = session.get(url, params=params)
-        resp.raise_for_status()
-        batch = resp.json()
-        if not batch:
-            break
-        images.extend(batch)
-        if len(batch) < page_size:
-            break
-        skip += page_size
-
-    return images[:limit]
-
-
-def list_image_analyses(session: requests.Session, api_base: str, image_id: str) -> List[Dict[str, Any]]:
-    url = get_api_url(api_base, f"images/{image_id}/analyses")
-    resp = session.get(url)
+def bulk_status(session: requests.Session, api_base: str, project_id: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    url = get_api_url(api_base, f"projects/{project_id}/analyses:bulk-status")
+    resp = session.post(url, json=payload)
     resp.raise_for_status()
-    data = resp.json()
-    # API returns {"analyses": [...], "total": N}
-    return data.get("analyses", [])
-
-
-def parse_iso(ts: str | None) -> datetime | None:
-    if not ts:
-        return None
-    # Pydantic / FastAPI usually emit ISO 8601 with timezone
-    try:
-        return datetime.fromisoformat(ts.replace("Z", "+00:00"))
-    except Exception:
-        return None
+    # API returns {"matched": N, "analyses": [...], ...}
+    return resp.json()
 
 
 def main() -> int:
@@ -161,8 +129,9 @@ def main() -> int:
     status_to = args.status_to.lower()
 
     valid_transitions = {
-        "queued": {"processing", "canceled"},
-        "processing": {"completed", "failed", "canceled"},
+        "queued": {"canceled"},
+        "processing": {"queued", "canceled"},
+        "failed": {"queued"},
     }
     allowed = valid_transitions.get(status_from, set())
     if status_to not in allowed:
@@ -172,55 +141,33 @@ def main() -> int:
         )
         return 1
 
-    older_than_cutoff: datetime | None = None
-    if args.older_than_seconds is not None:
-        older_than_cutoff = datetime.utcnow() - timedelta(seconds=args.older_than_seconds)
-
     print("[ml-queue-clear] Configuration:")
     print(f"  Project ID:   {args.project_id}")
     print(f"  API base:     {api_base}")
     print(f"  Status from:  {status_from}")
     print(f"  Status to:    {status_to}")
     print(f"  Limit:        {args.limit}")
-    if older_than_cutoff:
-        print(f"  Older than:   {older_than_cutoff.isoformat()} (UTC)")
+    if args.older_than_seconds is not None:
+        print(f"  Older than:   {args.older_than_seconds}s")
     print(f"  Dry run:      {args.dry_run}")
     print("")
 
     session = build_session(api_key)
+    payload = {
+        "status_from": status_from,
+        "status_to": status_to,
+        "limit": args.limit,
+        "older_than_seconds": args.older_than_seconds,
+    }
 
-    # Step 1: list project images
-    print("[ml-queue-clear] Fetching project images...")
-    images = list_project_images(session, api_base, args.project_id, limit=1000)
-    print(f"[ml-queue-clear] Found {len(images)} images in project")
-
-    candidates: List[Dict[str, Any]] = []
-
-    # Step 2: collect candidate analyses
-    for img in images:
-        image_id = img.get("id")
-        if not image_id:
-            continue
-        analyses = list_image_analyses(session, api_base, image_id)
-        for a in analyses:
-            if len(candidates) >= args.limit:
-                break
-            if (a.get("status") or "").lower() != status_from:
-                continue
-            created_at = parse_iso(a.get("created_at"))
-            updated_at = parse_iso(a.get("updated_at"))
-            reference_ts = updated_at or created_at
-            if older_than_cutoff and reference_ts and reference_ts > older_than_cutoff:
-                continue
-            a["_image_id"] = image_id
-            candidates.append(a)
-        if len(candidates) >= args.limit:
-            break
+    # Step 1: preview the analyses the server would change
+    preview = bulk_status(session, api_base, args.project_id, {**payload, "dry_run": True})
+    candidates = preview.get("analyses", [])
 
     print(f"[ml-queue-clear] Candidate analyses to change: {len(candidates)}")
     for a in candidates:
         print(
-            f"  - analysis_id={a.get('id')} image_id={a.get('_image_id')} "
+            f"  - analysis_id={a.get('id')} image_id={a.get('image_id')} "
             f"status={a.get('status')} created_at={a.get('created_at')} updated_at={a.get('updated_at')}"
         )
 
@@ -232,37 +179,20 @@ def main() -> int:
         print("[ml-queue-clear] Dry-run complete. No updates sent.")
         return 0
 
-    # Step 3: perform updates
-    updated = 0
-    failed = 0
+    # Step 2: apply. Analyses that changed since the preview are skipped by the server.
+    try:
+        result = bulk_status(session, api_base, args.project_id, {**payload, "dry_run": False})
+    except requests.RequestException as exc:  # pragma: no cover - operational logging
+        print(f"[ml-queue-clear] Bulk status update failed: {exc}", file=sys.stderr)
+        return 1
 
-    for a in candidates:
-        analysis_id = a.get("id")
-        url = get_api_url(api_base, f"analyses/{analysis_id}/status")
-        payload = {"status": status_to}
-        try:
-            resp = session.patch(url, json=payload)
-            if resp.ok:
-                updated += 1
-                print(f"[ml-queue-clear] Updated {analysis_id}: {status_from}->{status_to}")
-            else:
-                failed += 1
-                print(
-                    f"[ml-queue-clear] Failed to update {analysis_id}: "
-                    f"{resp.status_code} {resp.text}",
-                    file=sys.stderr,
-                )
-        except Exception as exc:  # pragma: no cover - operational logging
-            failed += 1
-            print(
-                f"[ml-queue-clear] Exception updating {analysis_id}: {exc}",
-                file=sys.stderr,
-            )
+    for a in result.get("analyses", []):
+        print(f"[ml-queue-clear] Updated {a.get('id')}: {status_from}->{a.get('status')}")
 
     print("")
-    print(f"[ml-queue-clear] Done. Updated={updated}, Failed={failed}, Total candidates={len(candidates)}")
+    print(f"[ml-queue-clear] Done. Updated={result.get('matched', 0)}, Total candidates={len(candidates)}")
 
-    return 0 if failed == 0 else 1
+    return 0
 
 
 if __name__ == "__main__":
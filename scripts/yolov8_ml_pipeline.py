@@ -157,19 +157,19 @@ class YOLOv8Pipeline:
         print(f"X Found {len(images)} images")
         return images
 
-    def get_image_analyses(self, image_id: str) -> List[Dict[str, Any]]:
-        """Fetch existing analyses for an image"""
-        url = self._get_api_url(f"images/{image_id}/analyses")
+    def get_pending_images(self, project_id: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Fetch images without a completed yolo_v8 analysis, in one request"""
+        print(f"X Fetching images without a completed analysis from project {project_id}")
 
-        try:
-            response = self.session.get(url)
-            response.raise_for_status()
-            data = response.json()
-            # API returns {"analyses": [...], "total": N}
-            return data.get('analyses', [])
-        except Exception as e:
-            print(f"  X  Failed to fetch analyses for image {image_id}: {e}")
-            return []
+        url = self._get_api_url(f"projects/{project_id}/images:pending-analysis")
+        params = {'model': 'yolo_v8', 'status': 'completed', 'limit': limit}
+
+        response = self.session.get(url, params=params)
+        response.raise_for_status()
+
+        images = response.json()['items']
+        print(f"X Found {len(images)} images to process")
+        return images
 
     def download_image(self, image_id: str) -> tuple[np.ndarray, Dict[str, Any]]:
         """Download image from API and return as numpy array"""
@@ -496,38 +496,17 @@ class YOLOv8Pipeline:
         self.load_model(model_size)
         model_version = f"yolov8_{model_size}"
 
-        # Get project images
-        images = self.get_project_images(project_id, limit)
-
-        if not images:
-            print("X  No images found in project")
-            return
-
-        # Filter images if skip_existing is enabled
-        images_to_process = []
-        skipped_count = 0
-
+        # Get project images; with skip_existing the server leaves out images that
+        # already have a completed analysis
         if skip_existing:
-            print(f"X Checking for existing analyses...")
-            for image in images:
-                analyses = self.get_image_analyses(image['id'])
-                # Only skip if there's at least one completed analysis
-                completed_analyses = [a for a in analyses if a.get('status') == 'completed']
-                if completed_analyses:
-                    print(f"  X  Skipping {image['id']} (has {len(completed_analyses)} completed analysis/analyses)")
-                    skipped_count += 1
-                else:
-                    if analyses:
-                        non_completed = [a.get('status') for a in analyses]
-                        print(f"  → Including {image['id']} (has analyses but none completed: {non_completed})")
-                    images_to_process.append(image)
-            print(f"X Filtered {len(images)} images → {len(images_to_process)} to process ({skipped_count} skipped)\n")
+            images = self.get_pending_images(project_id, limit)
         else:
-            images_to_process = images
+            images = self.get_project_images(project_id, limit)
 
-        if not images_to_process:
-            print("X  No images to process (all have existing analyses)")
+        if not images:
+            print("X  No images to process" if skip_existing else "X  No images found in project")
             return
+        images_to_process = images
 
         # Process each image
         success_count = 0
@@ -544,9 +523,6 @@ class YOLOv8Pipeline:
         print(f"Pipeline Complete!")
         print(f"{'='*60}")
         print(f"Total Images: {len(images)}")
-        if skip_existing:
-            print(f"Skipped (existing): {skipped_count}")
-            print(f"Processed: {len(images_to_process)}")
         print(f"Successful: {success_count}")
         print(f"Failed: {len(images_to_process) - success_count}")
 